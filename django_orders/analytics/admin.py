@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from products import format_money
+from .models import DailyRollup
+
+
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "status", "payment_type", "orders_count", "revenue_display")
+    list_filter = ("status", "payment_type")
+    date_hierarchy = "date"
+
+    @admin.display(description="Выручка", ordering="revenue")
+    def revenue_display(self, obj) -> str:
+        return format_money(obj.revenue)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(DailyRollup, DailyRollupAdmin)
@@ -0,0 +1,49 @@
+import datetime
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class RollupFilter(BaseFilterBackend):
+    """
+    Filters rollup rows by the `date_from`, `date_to`, `status` and
+    `payment_type` query parameters.
+    """
+
+    date_lookups: dict[str, str] = {"date_from": "date__gte", "date_to": "date__lte"}
+    exact_lookups: tuple[str, ...] = ("status", "payment_type")
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Applies the filters present in the request to the queryset.
+
+        :param request: The current request.
+        :param queryset: The queryset to filter.
+        :param view: The view being requested.
+        :return: The filtered queryset.
+        """
+        conditions = {}
+        for param, lookup in self.date_lookups.items():
+            value = request.query_params.get(param)
+            if value is not None:
+                conditions[lookup] = self.parse_date(param, value)
+        for param in self.exact_lookups:
+            value = request.query_params.get(param)
+            if value is not None:
+                conditions[param] = value
+        return queryset.filter(**conditions)
+
+    @staticmethod
+    def parse_date(param: str, value: str) -> datetime.date:
+        """
+        Converts a query parameter value in ISO format into a date.
+
+        :param param: The name of the query parameter.
+        :param value: The raw query parameter value.
+        :return: The parsed date.
+        :raises ValidationError: If the value is not an ISO date.
+        """
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({param: "Введите дату в формате ГГГГ-ММ-ДД."})
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from analytics.services import compact_rollups
+
+
+class Command(BaseCommand):
+    help = "Applies the recorded order changes to the daily order rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of changes applied per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        compacted = compact_rollups(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Applied {compacted} rollup changes."))
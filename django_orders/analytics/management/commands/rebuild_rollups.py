@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from analytics.services import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily order rollups from the orders and payments tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_rollups(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} rollup rows."))
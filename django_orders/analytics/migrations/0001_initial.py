@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:54
+
+import django.db.models.deletion
+import products.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orders', '0005_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRollupState',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup_state', serialize=False, to='orders.order')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('payment_type', models.CharField(blank=True, max_length=25)),
+                ('revenue', products.fields.MoneyField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус')),
+                ('payment_type', models.CharField(blank=True, max_length=25, verbose_name='Тип оплаты')),
+                ('orders_count', models.IntegerField(default=0, verbose_name='Количество заказов')),
+                ('revenue', products.fields.MoneyField(default=0, verbose_name='Выручка')),
+            ],
+            options={
+                'verbose_name': 'Дневной итог',
+                'verbose_name_plural': 'Дневные итоги',
+                'ordering': ['date', 'status', 'payment_type'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'status', 'payment_type'), name='daily_rollup_key')],
+            },
+        ),
+    ]
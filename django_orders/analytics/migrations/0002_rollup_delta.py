@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 18:02
+
+import products.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('payment_type', models.CharField(blank=True, max_length=25)),
+                ('orders_count', models.IntegerField(default=0)),
+                ('revenue', products.fields.MoneyField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,94 @@
+from django.db import models
+
+from orders.models import Order
+from products import MoneyField
+
+
+class DailyRollup(models.Model):
+    """
+    Represents the number and revenue of orders created on a day, grouped
+    by order status and payment type.
+
+    Rows are maintained incrementally as orders and payments change, so
+    reports never aggregate the transactional tables. Changes are first
+    recorded as `RollupDelta` rows and folded in by `compact_rollups`, so
+    the rows lag behind the orders by the compaction interval.
+
+    Attributes:
+    - date: The day the orders were created.
+    - status: The current status of the orders.
+    - payment_type: The payment type of the orders, empty if unpaid.
+    - orders_count: The number of orders.
+    - revenue: The sum of the order totals in minor units.
+    """
+
+    date = models.DateField(verbose_name="Дата")
+    status = models.CharField(max_length=20, verbose_name="Статус")
+    payment_type = models.CharField(
+        max_length=25, blank=True, verbose_name="Тип оплаты"
+    )
+    orders_count = models.IntegerField(default=0, verbose_name="Количество заказов")
+    revenue = MoneyField(default=0, verbose_name="Выручка")
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.status} / {self.payment_type or '-'}"
+
+    class Meta:
+        verbose_name = "Дневной итог"
+        verbose_name_plural = "Дневные итоги"
+        ordering = ["date", "status", "payment_type"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "status", "payment_type"], name="daily_rollup_key"
+            ),
+        ]
+
+
+class RollupDelta(models.Model):
+    """
+    Represents a change of a rollup row that was not applied yet.
+
+    Order and payment transactions only append deltas, so concurrent
+    orders of the same day do not wait for each other on one rollup row.
+
+    Attributes:
+    - date: The day of the rollup row.
+    - status: The order status of the rollup row.
+    - payment_type: The payment type of the rollup row.
+    - orders_count: The change in the number of orders.
+    - revenue: The change in revenue in minor units.
+    """
+
+    date = models.DateField()
+    status = models.CharField(max_length=20)
+    payment_type = models.CharField(max_length=25, blank=True)
+    orders_count = models.IntegerField(default=0)
+    revenue = MoneyField(default=0)
+
+
+class OrderRollupState(models.Model):
+    """
+    Represents the rollup row an order currently contributes to.
+
+    Keeping the last applied state per order lets a change be applied as
+    a delta: the old contribution is subtracted and the new one added.
+
+    Attributes:
+    - order: The order.
+    - date: The day the order was created.
+    - status: The order status that was applied.
+    - payment_type: The payment type that was applied.
+    - revenue: The order total that was applied, in minor units.
+    """
+
+    order = models.OneToOneField(
+        Order, on_delete=models.CASCADE, primary_key=True, related_name="rollup_state"
+    )
+    date = models.DateField()
+    status = models.CharField(max_length=20)
+    payment_type = models.CharField(max_length=25, blank=True)
+    revenue = MoneyField(default=0)
+
+    @property
+    def key(self) -> tuple:
+        return self.date, self.status, self.payment_type
@@ -0,0 +1,7 @@
+from rest_framework.routers import SimpleRouter
+
+from .views import DailyRollupViewSet
+
+router = SimpleRouter()
+
+router.register("api/v1/analytics/daily", DailyRollupViewSet)
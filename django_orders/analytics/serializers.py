@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from products.serializers import MoneyField
+from .models import DailyRollup
+
+
+class DailyRollupSerializer(serializers.ModelSerializer):
+    revenue = MoneyField(read_only=True)
+
+    class Meta:
+        model = DailyRollup
+        fields = ["date", "status", "payment_type", "orders_count", "revenue"]
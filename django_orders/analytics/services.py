@@ -0,0 +1,298 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from orders.models import Order
+from payments.models import Payment
+from .models import DailyRollup, OrderRollupState, RollupDelta
+
+_retained = ContextVar("retain_rollups", default=False)
+
+
+@contextmanager
+def retain_rollups():
+    """
+    Keeps the contribution of orders deleted inside the block in the
+    rollups. Used when orders are moved out of the live tables, e.g. to
+    the archive, rather than cancelled.
+    """
+    token = _retained.set(True)
+    try:
+        yield
+    finally:
+        _retained.reset(token)
+
+
+def add_to_rollup(key: tuple, orders_count: int, revenue: int) -> None:
+    """
+    Adds a delta to the rollup row with the given key, creating the row
+    if it does not exist yet.
+
+    :param key: The `(date, status, payment_type)` of the row.
+    :param orders_count: The change in the number of orders.
+    :param revenue: The change in revenue in minor units.
+    :return: None
+    """
+    date, status, payment_type = key
+    rows = DailyRollup.objects.filter(date=date, status=status, payment_type=payment_type)
+    delta = {
+        "orders_count": F("orders_count") + orders_count,
+        "revenue": F("revenue") + revenue,
+    }
+    if rows.update(**delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(
+                date=date,
+                status=status,
+                payment_type=payment_type,
+                orders_count=orders_count,
+                revenue=revenue,
+            )
+    except IntegrityError:
+        # Created concurrently by another transaction.
+        rows.update(**delta)
+
+
+def record_deltas(*deltas: tuple[tuple, int, int]) -> None:
+    """
+    Appends changes of rollup rows, to be applied by `compact_rollups`.
+
+    :param deltas: The `(key, orders_count, revenue)` of every change,
+     where the key is the `(date, status, payment_type)` of the row.
+    :return: None
+    """
+    RollupDelta.objects.bulk_create(
+        RollupDelta(
+            date=date,
+            status=status,
+            payment_type=payment_type,
+            orders_count=orders_count,
+            revenue=revenue,
+        )
+        for (date, status, payment_type), orders_count, revenue in deltas
+    )
+
+
+@transaction.atomic
+def record_order_state(order: Order, payment_type: str | None = None) -> None:
+    """
+    Moves the contribution of an order to the rollup row matching its
+    current state.
+
+    :param order: The order whose state changed.
+    :param payment_type: The new payment type of the order. Keeps the
+     previously applied payment type if not given.
+    :return: None
+    """
+    state = OrderRollupState.objects.select_for_update().filter(order=order).first()
+    if payment_type is None:
+        payment_type = state.payment_type if state else ""
+    key = (timezone.localdate(order.create_dt), order.status, payment_type)
+    revenue = order.total_cost
+    if state is None:
+        record_deltas((key, 1, revenue))
+        OrderRollupState.objects.create(
+            order=order,
+            date=key[0],
+            status=key[1],
+            payment_type=key[2],
+            revenue=revenue,
+        )
+        return
+    if state.key == key and state.revenue == revenue:
+        return
+    if state.key == key:
+        record_deltas((key, 0, revenue - state.revenue))
+    else:
+        record_deltas((state.key, -1, -state.revenue), (key, 1, revenue))
+    state.date, state.status, state.payment_type = key
+    state.revenue = revenue
+    state.save()
+
+
+@transaction.atomic
+def forget_order_state(order: Order) -> None:
+    """
+    Subtracts the contribution of an order from the rollups and drops
+    its state.
+
+    :param order: The order being removed.
+    :return: None
+    """
+    if _retained.get():
+        return
+    state = OrderRollupState.objects.select_for_update().filter(order=order).first()
+    if state is None:
+        return
+    record_deltas((state.key, -1, -state.revenue))
+    state.delete()
+
+
+def compact_rollups(batch_size: int = 1000) -> int:
+    """
+    Applies the recorded deltas to the rollup rows and removes them.
+    Meant to run periodically, e.g. every minute from cron.
+
+    Every batch is applied in its own transaction. Deltas locked by a
+    concurrent compaction are skipped, so several may run at once.
+
+    :param batch_size: The number of deltas applied per transaction.
+    :return: The number of deltas applied.
+    """
+    compacted = 0
+    while True:
+        with transaction.atomic():
+            deltas = list(
+                RollupDelta.objects.select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", "date", "status", "payment_type", "orders_count", "revenue")[
+                    :batch_size
+                ]
+            )
+            totals = {}
+            for _, date, status, payment_type, orders_count, revenue in deltas:
+                key = (date, status, payment_type)
+                count_sum, revenue_sum = totals.get(key, (0, 0))
+                totals[key] = (count_sum + orders_count, revenue_sum + revenue)
+            for key, (orders_count, revenue) in totals.items():
+                if orders_count or revenue:
+                    add_to_rollup(key, orders_count, revenue)
+            RollupDelta.objects.filter(id__in=[delta[0] for delta in deltas]).delete()
+        compacted += len(deltas)
+        if len(deltas) < batch_size:
+            return compacted
+
+
+def counted_payments(model: type = Payment) -> QuerySet:
+    """
+    Returns the payments that give an order its payment type, latest
+    first: an order takes the type of its latest payment that was not
+    voided. The same rule is used when rollups are kept incrementally
+    and when they are rebuilt.
+
+    :param model: The payment model, `Payment` or an archived payment.
+    :return: The non-voided payments.
+    """
+    return model.objects.exclude(status=Payment.STATUS_CHOICES["VOIDED"]).order_by("-id")
+
+
+def current_payment_type(order_id: int) -> str:
+    """
+    Returns the payment type of an order.
+
+    :param order_id: The order ID.
+    :return: The type of its latest non-voided payment, or an empty
+     string if there is none.
+    """
+    return (
+        counted_payments()
+        .filter(order_id=order_id)
+        .values_list("payment_type", flat=True)
+        .first()
+        or ""
+    )
+
+
+def payment_type_of(payment: Payment) -> str:
+    """
+    Returns the payment type a payment contributes to its order.
+
+    :param payment: The payment.
+    :return: The payment type, or an empty string for voided payments.
+    """
+    if payment.status == Payment.STATUS_CHOICES["VOIDED"]:
+        return ""
+    return payment.payment_type
+
+
+@transaction.atomic
+def rebuild_rollups(batch_size: int = 2000) -> int:
+    """
+    Rebuilds the per-order states and the rollup table from the orders
+    and payments tables. Archived orders are counted too when the
+    archive app is installed. Pending deltas are dropped, the rebuilt
+    rows already include them.
+
+    :param batch_size: The number of states inserted per query.
+    :return: The number of rollup rows created.
+    """
+    OrderRollupState.objects.all().delete()
+    RollupDelta.objects.all().delete()
+    DailyRollup.objects.all().delete()
+    latest_payment_type = Subquery(
+        counted_payments().filter(order=OuterRef("pk")).values("payment_type")[:1]
+    )
+    orders = Order.objects.annotate(
+        day=TruncDate("create_dt"),
+        current_payment_type=Coalesce(latest_payment_type, Value("")),
+    ).values_list("pk", "day", "status", "current_payment_type", "total_cost")
+    states = (
+        OrderRollupState(
+            order_id=pk,
+            date=day,
+            status=status,
+            payment_type=payment_type,
+            revenue=revenue,
+        )
+        for pk, day, status, payment_type, revenue in orders.iterator(chunk_size=batch_size)
+    )
+    OrderRollupState.objects.bulk_create(states, batch_size=batch_size)
+    totals = (
+        OrderRollupState.objects.values("date", "status", "payment_type")
+        .annotate(orders_count=Count("pk"), revenue_sum=Sum("revenue"))
+        .order_by()
+    )
+    merged = {}
+    for rows in (totals, archived_totals()):
+        for row in rows:
+            key = (row["date"], row["status"], row["payment_type"])
+            orders_count, revenue = merged.get(key, (0, 0))
+            merged[key] = (orders_count + row["orders_count"], revenue + row["revenue_sum"])
+    rollups = DailyRollup.objects.bulk_create(
+        (
+            DailyRollup(
+                date=date,
+                status=status,
+                payment_type=payment_type,
+                orders_count=orders_count,
+                revenue=revenue,
+            )
+            for (date, status, payment_type), (orders_count, revenue) in merged.items()
+        ),
+        batch_size=batch_size,
+    )
+    return len(rollups)
+
+
+def archived_totals():
+    """
+    Aggregates archived orders by rollup key.
+
+    :return: An iterable of dicts shaped like the live totals in
+     `rebuild_rollups`.
+    """
+    if not apps.is_installed("archive"):
+        return ()
+    from archive.models import ArchivedOrder, ArchivedPayment
+
+    latest_payment_type = Subquery(
+        counted_payments(ArchivedPayment)
+        .filter(order=OuterRef("pk"))
+        .values("payment_type")[:1]
+    )
+    return (
+        ArchivedOrder.objects.annotate(
+            date=TruncDate("create_dt"),
+            payment_type=Coalesce(latest_payment_type, Value("")),
+        )
+        .values("date", "status", "payment_type")
+        .annotate(orders_count=Count("pk"), revenue_sum=Sum("total_cost"))
+        .order_by()
+    )
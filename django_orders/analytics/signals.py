@@ -0,0 +1,79 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from orders.models import Order
+from orders.signals import order_totals_updated
+from payments.models import Payment
+from .services import (
+    current_payment_type,
+    forget_order_state,
+    payment_type_of,
+    record_order_state,
+)
+
+
+def apply_order_state(order: Order) -> None:
+    """
+    Records the state of an order unless its status and total are the
+    ones this instance last recorded, so that saves changing other
+    fields, such as the payment date, run no rollup queries.
+
+    :param order: The saved order.
+    :return: None
+    """
+    state = (order.status, order.total_cost)
+    if getattr(order, "_rollup_state", None) == state:
+        return
+    record_order_state(order)
+    order._rollup_state = state
+
+
+@receiver(post_save, sender=Order, dispatch_uid="analytics_order_saved")
+def order_saved(sender, instance: Order, raw: bool = False, **kwargs) -> None:
+    """
+    Applies the new state of a saved order to the rollups.
+    """
+    if raw:
+        return
+    apply_order_state(instance)
+
+
+@receiver(order_totals_updated, sender=Order, dispatch_uid="analytics_order_totals")
+def order_totals_recomputed(sender, orders: list[Order], **kwargs) -> None:
+    """
+    Applies the recomputed totals of orders to the rollups. The totals
+    are written with a bulk update, which sends no `post_save`.
+    """
+    for order in orders:
+        apply_order_state(order)
+
+
+@receiver(pre_delete, sender=Order, dispatch_uid="analytics_order_deleted")
+def order_deleted(sender, instance: Order, **kwargs) -> None:
+    """
+    Removes the contribution of a deleted order from the rollups.
+    """
+    forget_order_state(instance)
+
+
+@receiver(post_save, sender=Payment, dispatch_uid="analytics_payment_saved")
+def payment_saved(
+    sender, instance: Payment, created: bool = False, raw: bool = False, **kwargs
+) -> None:
+    """
+    Applies the payment type of the order of a saved payment to the
+    rollups: the type of its latest non-voided payment, as in
+    `rebuild_rollups`. Saves that change neither the type nor whether
+    the payment is voided are skipped.
+    """
+    if raw or instance.order_id is None:
+        return
+    payment_type = payment_type_of(instance)
+    if not created and getattr(instance, "_rollup_payment_type", None) == payment_type:
+        return
+    instance._rollup_payment_type = payment_type
+    if not (created and payment_type):
+        # Voiding or changing an older payment may change the type of
+        # the order; a new payment is always the latest one.
+        payment_type = current_payment_type(instance.order_id)
+    record_order_state(instance.order, payment_type=payment_type)
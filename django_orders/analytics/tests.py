@@ -0,0 +1,129 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from products.models import Product
+from .models import DailyRollup, OrderRollupState, RollupDelta
+from .services import compact_rollups
+
+
+def rollup_rows() -> set[tuple]:
+    """
+    Returns the non-empty rollup rows as comparable tuples, after
+    applying the pending deltas.
+    """
+    compact_rollups()
+    return set(
+        DailyRollup.objects.exclude(orders_count=0).values_list(
+            "date", "status", "payment_type", "orders_count", "revenue"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestDailyRollup:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture, monkeypatch, django_capture_on_commit_callbacks):
+        """Load products and skip the simulated payment delay."""
+        load_fixture("products")
+        self.on_commit = django_capture_on_commit_callbacks
+        monkeypatch.setattr("payments.models.time.sleep", lambda seconds: None)
+        self.product: Product = Product.objects.get(pk=1)
+        self.today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+
+    def create_order(self, quantity: int = 2) -> Order:
+        order: Order = Order.objects.create()
+        with self.on_commit(execute=True):
+            OrderItem.objects.create(order=order, product=self.product, quantity=quantity)
+        return order
+
+    def test_order_creation_counted(self):
+        """Test that a new order is added to the pending row of its day."""
+        order = self.create_order()
+        assert rollup_rows() == {
+            (self.today, order.STATUS_CHOICES["PENDING"], "", 1, order.total_cost)
+        }
+
+    def test_payment_moves_order(self):
+        """Test that paying an order moves it to the paid row of its payment type."""
+        order = self.create_order()
+        Payment.objects.create(order=order, payment_type="PayPal")
+        assert rollup_rows() == {
+            (self.today, order.STATUS_CHOICES["PAID"], "PayPal", 1, order.total_cost)
+        }
+
+    def test_order_deletion_subtracted(self):
+        """Test that deleting an order removes it from the rollups."""
+        order = self.create_order()
+        order.delete()
+        assert rollup_rows() == set()
+
+    def test_orders_only_append_deltas(self):
+        """Test that orders leave the rollup rows to the compaction."""
+        order = self.create_order()
+        Payment.objects.create(order=order, payment_type="PayPal")
+        assert not DailyRollup.objects.exists()
+        pending = RollupDelta.objects.count()
+        assert compact_rollups(batch_size=2) == pending
+        assert not RollupDelta.objects.exists()
+        assert rollup_rows() == {
+            (self.today, order.STATUS_CHOICES["PAID"], "PayPal", 1, order.total_cost)
+        }
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuilding the rollups gives the incrementally kept rows."""
+        paid = self.create_order(quantity=3)
+        self.create_order(quantity=1)
+        Payment.objects.create(order=paid)
+        incremental = rollup_rows()
+        call_command("rebuild_rollups")
+        assert rollup_rows() == incremental
+        assert OrderRollupState.objects.count() == 2
+
+    def test_voided_payment_type_matches_rebuild(self):
+        """Test that voiding the latest payment gives the order its previous type."""
+        order = self.create_order()
+        first = Payment(order=order, payment_type="Cash")
+        first.save(process=False)
+        latest = Payment(order=order, payment_type="PayPal")
+        latest.save(process=False)
+        latest.void()
+        latest.save(process=False)
+        order.refresh_from_db()
+        incremental = rollup_rows()
+        assert incremental == {
+            (self.today, order.STATUS_CHOICES["PENDING"], "Cash", 1, order.total_cost)
+        }
+        call_command("rebuild_rollups")
+        assert rollup_rows() == incremental
+
+    def test_unchanged_state_skips_rollups(self, django_assert_num_queries):
+        """Test that saves changing neither status nor total leave the rollups alone."""
+        order = Order.objects.get(pk=self.create_order().pk)
+        order.update_payment_date()
+        with django_assert_num_queries(1):
+            order.update_confirm_date()
+        assert rollup_rows() == {
+            (self.today, order.STATUS_CHOICES["PENDING"], "", 1, order.total_cost)
+        }
+
+    def test_rollup_endpoint(self, admin_budget_client):
+        """Test the analytics endpoint serves rows filtered by status."""
+        order = self.create_order()
+        call_command("compact_rollups", stdout=io.StringIO())
+        response = admin_budget_client.get(
+            "/api/v1/analytics/daily/", {"status": order.STATUS_CHOICES["PENDING"]}
+        )
+        assert response.status_code == 200
+        [row] = response.json()["results"]
+        assert row["orders_count"] == 1
+        assert row["revenue"] == "400.00"
+
+    def test_rollup_endpoint_requires_admin(self, client):
+        """Test that the analytics endpoint is not public."""
+        response = client.get("/api/v1/analytics/daily/")
+        assert response.status_code == 403
@@ -0,0 +1,21 @@
+from rest_framework.mixins import ListModelMixin
+from rest_framework.permissions import IsAdminUser
+from rest_framework.viewsets import GenericViewSet
+
+from services.db_router import ReplicaReadMixin
+
+from .filters import RollupFilter
+from .models import DailyRollup
+from .serializers import DailyRollupSerializer
+
+
+class DailyRollupViewSet(ReplicaReadMixin, ListModelMixin, GenericViewSet):
+    """
+    Read-only report of orders and revenue per day, status and payment
+    type, served from the rollup table.
+    """
+
+    queryset = DailyRollup.objects.all()
+    serializer_class = DailyRollupSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [RollupFilter]
@@ -0,0 +1,45 @@
+from django.contrib import admin
+
+from products import format_money
+from .models import ArchivedOrder, ArchivedOrderItem, ArchivedPayment
+
+
+class ReadOnlyInline(admin.TabularInline):
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderItemInline(ReadOnlyInline):
+    model = ArchivedOrderItem
+
+
+class ArchivedPaymentInline(ReadOnlyInline):
+    model = ArchivedPayment
+
+
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "total_cost_display", "create_dt", "confirm_dt")
+    inlines = (ArchivedOrderItemInline, ArchivedPaymentInline)
+    show_full_result_count = False
+
+    @admin.display(description="Итоговая сумма", ordering="total_cost")
+    def total_cost_display(self, obj) -> str:
+        return format_money(obj.total_cost)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(ArchivedOrder, ArchivedOrderAdmin)
@@ -0,0 +1,33 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from archive.services import archive_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves confirmed orders older than the retention window, with their "
+        "items and payments, into the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.ORDER_ARCHIVE_RETENTION_DAYS,
+            help="Archive orders confirmed more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of orders moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        closed_before = timezone.now() - datetime.timedelta(days=options["retention_days"])
+        archived = archive_orders(closed_before, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} orders."))
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:00
+
+import django.db.models.deletion
+import products.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0005_product_sales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_cost', products.fields.MoneyField(verbose_name='Итоговая сумма')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус')),
+                ('create_dt', models.DateTimeField(verbose_name='Дата создания')),
+                ('payment_dt', models.DateTimeField(null=True, verbose_name='Дата оплаты')),
+                ('confirm_dt', models.DateTimeField(null=True, verbose_name='Время подтверждения')),
+                ('archive_dt', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивный заказ',
+                'verbose_name_plural': 'Архивные заказы',
+                'indexes': [models.Index(fields=['create_dt'], name='archived_order_create_dt_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('unit_price', products.fields.MoneyField(verbose_name='Цена за единицу')),
+                ('line_total', products.fields.MoneyField(verbose_name='Сумма позиции')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='archive.archivedorder')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_items', to='products.product')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('cost', products.fields.MoneyField(verbose_name='Сумма')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус')),
+                ('payment_type', models.CharField(max_length=25, verbose_name='Тип оплаты')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='archive.archivedorder', verbose_name='Заказ')),
+            ],
+            options={
+                'verbose_name': 'Архивный платеж',
+                'verbose_name_plural': 'Архивные платежи',
+            },
+        ),
+    ]
@@ -0,0 +1,109 @@
+from django.db import models
+
+from orders.models import Order
+from products import MoneyField
+from products.models import Product
+
+
+class ArchivedOrder(models.Model):
+    """
+    Represents a closed order moved out of the orders table.
+
+    The primary key is the ID the order had before archiving.
+
+    Attributes:
+    - total_cost: The total cost of the order in minor units.
+    - status: The status of the order when it was archived.
+    - create_dt: The date and time the order was created.
+    - payment_dt: The date and time the order was paid.
+    - confirm_dt: The date and time the order was confirmed.
+    - archive_dt: The date and time the order was archived.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    total_cost = MoneyField(verbose_name="Итоговая сумма")
+    status = models.CharField(max_length=20, verbose_name="Статус")
+    create_dt = models.DateTimeField(verbose_name="Дата создания")
+    payment_dt = models.DateTimeField(null=True, verbose_name="Дата оплаты")
+    confirm_dt = models.DateTimeField(null=True, verbose_name="Время подтверждения")
+    archive_dt = models.DateTimeField(auto_now_add=True, verbose_name="Дата архивации")
+
+    def __str__(self) -> str:
+        return f"Архивный заказ № {self.id} в статусе {self.status}."
+
+    def as_order(self) -> Order:
+        """
+        Builds a read-only `Order` instance with the archived data, for
+        code that looks orders up by ID.
+
+        :return: An unsaved order with the archived field values.
+        """
+        order = Order(
+            id=self.id,
+            total_cost=self.total_cost,
+            status=self.status,
+            create_dt=self.create_dt,
+            payment_dt=self.payment_dt,
+            confirm_dt=self.confirm_dt,
+        )
+        order._state.adding = False
+        order.is_archived = True
+        return order
+
+    class Meta:
+        verbose_name = "Архивный заказ"
+        verbose_name_plural = "Архивные заказы"
+        indexes = [
+            models.Index(fields=["create_dt"], name="archived_order_create_dt_idx"),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    Represents an item of an archived order.
+
+    Attributes:
+    - order: The archived order.
+    - product: The product included in the order.
+    - quantity: The quantity of the product in the order.
+    - unit_price: The price of the product in minor units.
+    - line_total: The unit price multiplied by the quantity.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="items"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.PROTECT, related_name="archived_items"
+    )
+    quantity = models.PositiveIntegerField()
+    unit_price = MoneyField(verbose_name="Цена за единицу")
+    line_total = MoneyField(verbose_name="Сумма позиции")
+
+
+class ArchivedPayment(models.Model):
+    """
+    Represents a payment of an archived order.
+
+    Attributes:
+    - order: The archived order.
+    - cost: The payment amount in minor units.
+    - status: The status of the payment.
+    - payment_type: The method used for the payment.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="payments",
+        verbose_name="Заказ",
+    )
+    cost = MoneyField(verbose_name="Сумма")
+    status = models.CharField(max_length=20, verbose_name="Статус")
+    payment_type = models.CharField(max_length=25, verbose_name="Тип оплаты")
+
+    class Meta:
+        verbose_name = "Архивный платеж"
+        verbose_name_plural = "Архивные платежи"
@@ -0,0 +1,109 @@
+import datetime
+
+from django.db import connection, transaction
+
+from analytics.services import retain_rollups
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from .models import ArchivedOrder, ArchivedOrderItem, ArchivedPayment
+
+
+def archivable_orders(closed_before: datetime.datetime):
+    """
+    Returns the confirmed orders that were closed before the given moment.
+
+    :param closed_before: The end of the retention window.
+    :return: A QuerySet of orders ordered by ID.
+    """
+    return Order.objects.filter(
+        status=Order.STATUS_CHOICES["CONFIRMED"], confirm_dt__lt=closed_before
+    ).order_by("pk")
+
+
+def archive_orders(closed_before: datetime.datetime, batch_size: int = 500) -> int:
+    """
+    Moves closed orders with their items and payments into the archive
+    tables, one batch per transaction.
+
+    Daily rollups keep counting archived orders.
+
+    :param closed_before: Orders confirmed before this moment are moved.
+    :param batch_size: The number of orders moved per transaction.
+    :return: The number of archived orders.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            orders = archivable_orders(closed_before)
+            if connection.features.has_select_for_update_skip_locked:
+                orders = orders.select_for_update(skip_locked=True)
+            batch = list(orders[:batch_size])
+            if not batch:
+                return archived
+            archive_batch(batch)
+        archived += len(batch)
+
+
+def archive_batch(orders: list[Order]) -> None:
+    """
+    Copies a batch of orders into the archive tables and deletes them
+    from the live tables. Must be called inside a transaction.
+
+    :param orders: The orders to archive.
+    :return: None
+    """
+    order_ids = [order.pk for order in orders]
+    ArchivedOrder.objects.bulk_create(
+        ArchivedOrder(
+            id=order.pk,
+            total_cost=order.total_cost,
+            status=order.status,
+            create_dt=order.create_dt,
+            payment_dt=order.payment_dt,
+            confirm_dt=order.confirm_dt,
+        )
+        for order in orders
+    )
+    items = OrderItem.objects.filter(order_id__in=order_ids)
+    ArchivedOrderItem.objects.bulk_create(
+        ArchivedOrderItem(
+            id=item.pk,
+            order_id=item.order_id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            unit_price=item.unit_price,
+            line_total=item.line_total,
+        )
+        for item in items
+    )
+    payments = Payment.objects.filter(order_id__in=order_ids)
+    ArchivedPayment.objects.bulk_create(
+        ArchivedPayment(
+            id=payment.pk,
+            order_id=payment.order_id,
+            cost=payment.cost,
+            status=payment.status,
+            payment_type=payment.payment_type,
+        )
+        for payment in payments
+    )
+    with retain_rollups():
+        payments.delete()
+        Order.objects.filter(pk__in=order_ids).delete()
+
+
+def find_order(pk) -> Order | None:
+    """
+    Looks an order up by ID in the live table and then in the archive.
+
+    Archived orders are returned as read-only `Order` instances with
+    `is_archived` set.
+
+    :param pk: The order ID.
+    :return: The order, or None if it does not exist.
+    """
+    order = Order.objects.filter(pk=pk).first()
+    if order is not None:
+        return order
+    archived = ArchivedOrder.objects.filter(pk=pk).first()
+    return archived.as_order() if archived else None
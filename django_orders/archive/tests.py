@@ -0,0 +1,119 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics.models import DailyRollup
+from analytics.services import compact_rollups, rebuild_rollups
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from products.models import Product, ProductSales
+from .models import ArchivedOrder, ArchivedOrderItem, ArchivedPayment
+from .services import archive_orders, find_order
+
+
+def rollup_rows() -> set[tuple]:
+    """
+    Returns the non-empty rollup rows as comparable tuples, after
+    applying the pending deltas.
+    """
+    compact_rollups()
+    return set(
+        DailyRollup.objects.exclude(orders_count=0).values_list(
+            "date", "status", "payment_type", "orders_count", "revenue"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestArchiveOrders:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture, monkeypatch, django_capture_on_commit_callbacks):
+        """Load products and skip the simulated payment delay."""
+        load_fixture("products")
+        self.on_commit = django_capture_on_commit_callbacks
+        monkeypatch.setattr("payments.models.time.sleep", lambda seconds: None)
+        self.product: Product = Product.objects.get(pk=1)
+        self.now = timezone.now()
+
+    def create_order(self, confirmed_days_ago: int | None = None) -> Order:
+        order: Order = Order.objects.create()
+        with self.on_commit(execute=True):
+            OrderItem.objects.create(order=order, product=self.product, quantity=2)
+        Payment.objects.create(order=order, payment_type="PayPal")
+        if confirmed_days_ago is not None:
+            order.refresh_from_db()
+            order.status = Order.STATUS_CHOICES["CONFIRMED"]
+            order.confirm_dt = self.now - datetime.timedelta(days=confirmed_days_ago)
+            order.save()
+        return order
+
+    def test_old_confirmed_orders_moved(self):
+        """Test that only old confirmed orders are moved with their items and payments."""
+        old = self.create_order(confirmed_days_ago=400)
+        recent = self.create_order(confirmed_days_ago=10)
+        pending = self.create_order()
+        cutoff = self.now - datetime.timedelta(days=365)
+
+        assert archive_orders(cutoff, batch_size=1) == 1
+
+        assert set(Order.objects.values_list("pk", flat=True)) == {recent.pk, pending.pk}
+        archived = ArchivedOrder.objects.get(pk=old.pk)
+        assert archived.total_cost == old.total_cost
+        assert archived.confirm_dt == old.confirm_dt
+        assert ArchivedOrderItem.objects.filter(order=archived).count() == 1
+        assert ArchivedPayment.objects.get(order=archived).payment_type == "PayPal"
+        assert not Payment.objects.filter(order_id=old.pk).exists()
+
+    def test_rollups_retained(self):
+        """Test that archiving does not change the rollups, also after a rebuild."""
+        self.create_order(confirmed_days_ago=400)
+        self.create_order()
+        before = rollup_rows()
+
+        archive_orders(self.now - datetime.timedelta(days=365))
+
+        assert rollup_rows() == before
+        rebuild_rollups()
+        assert rollup_rows() == before
+
+    def test_repair_sales_counters_counts_archive(self):
+        """Test that repairing the sales counters keeps archived sales."""
+        self.create_order(confirmed_days_ago=400)
+        self.create_order(confirmed_days_ago=10)
+        archive_orders(self.now - datetime.timedelta(days=365))
+
+        call_command("repair_sales_counters", stdout=io.StringIO())
+
+        sales = ProductSales.objects.get(product=self.product)
+        assert sales.quantity == 4
+        assert sales.revenue == 2 * Order.objects.get().total_cost
+
+    def test_find_order_reads_archive(self):
+        """Test that archived orders are still found by ID."""
+        old = self.create_order(confirmed_days_ago=400)
+        archive_orders(self.now - datetime.timedelta(days=365))
+
+        order = find_order(old.pk)
+        assert order.is_archived
+        assert order.total_cost == old.total_cost
+        assert find_order(old.pk + 100) is None
+
+    def test_admin_shows_archived_order(self, admin_client):
+        """Test that the order admin page keeps working for archived orders."""
+        old = self.create_order(confirmed_days_ago=400)
+        archive_orders(self.now - datetime.timedelta(days=365))
+
+        response = admin_client.get(reverse("admin:orders_order_change", args=[old.pk]))
+        assert response.status_code == 200
+        assert str(old.pk) in response.content.decode()
+
+    def test_command(self):
+        """Test that the management command uses the retention window."""
+        self.create_order(confirmed_days_ago=40)
+        call_command("archive_orders", "--retention-days", "30")
+        assert ArchivedOrder.objects.count() == 1
+        assert not Order.objects.exists()
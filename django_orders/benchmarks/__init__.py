@@ -0,0 +1,142 @@
+"""
+Performance benchmarks for the project.
+
+Benchmarks are plain scripts run from the directory with `manage.py`,
+e.g. `python -m benchmarks.money_serialization`. They are not collected
+by pytest and run against a throwaway test database.
+"""
+
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import django
+
+from django_orders import settings_module
+
+
+def setup_django() -> None:
+    """
+    Configures Django for a standalone benchmark script.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module())
+    django.setup()
+
+
+@contextmanager
+def test_database(name: str | None = None) -> Iterator[None]:
+    """
+    Creates a throwaway test database for the duration of the block.
+
+    :param name: The name of the test database. SQLite uses an in-memory
+     database by default, pass a file name to share it between threads.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Runs a function several times and returns the fastest run.
+
+    :param func: The function to time.
+    :param repeat: The number of runs.
+    :return: The fastest run time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values.
+
+    :param values: The measured values.
+    :param q: The percentile, from 0 to 100.
+    :return: The value below which `q` percent of the values fall.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """
+    Calls a function repeatedly and summarizes its latency and the
+    number of queries it runs.
+
+    :param func: The function to measure.
+    :param repeat: The number of calls.
+    :return: The runs, throughput, p50/p99 latency in milliseconds and
+     the maximum number of queries per call.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        queries = max(queries, len(captured))
+    return {
+        "runs": repeat,
+        "throughput_per_s": round(repeat / sum(timings), 2),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "queries": queries,
+    }
+
+
+def save_results(path: Path, results: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists the benchmarks that regressed against a baseline.
+
+    A benchmark regresses when its p50 latency grows by more than the
+    tolerance or when it runs more queries.
+
+    :param current: The benchmark results of this run.
+    :param baseline: The saved benchmark results to compare with.
+    :param tolerance: The allowed relative latency growth, e.g. 0.2.
+    :return: One line per regression.
+    """
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 {base['p50_ms']} ms -> {result['p50_ms']} ms"
+            )
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: queries {base['queries']} -> {result['queries']}"
+            )
+    return regressions
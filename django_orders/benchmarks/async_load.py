@@ -0,0 +1,121 @@
+"""
+Load test of payment creation through the WSGI and the ASGI handler.
+
+The sync endpoint (`/api/v1/pay/`) blocks its worker for the whole
+simulated processing, so a pool of WSGI workers completes at most one
+payment per worker at a time. The async endpoint (`/api/v2/pay/`)
+accepts the payment and processes it on the event loop, so a single
+ASGI worker keeps hundreds of payments in flight.
+
+Both handlers run in-process: WSGI workers are simulated by a thread
+pool, the ASGI worker by one event loop. Processing takes a fixed
+`--delay` instead of a random one:
+
+    python -m benchmarks.async_load --payments 200 --wsgi-workers 4
+
+For a deployment-level comparison run the same scenario with an HTTP
+load tool against `gunicorn django_orders.wsgi` and
+`uvicorn django_orders.asgi:application`.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from benchmarks import percentile, setup_django, test_database
+
+
+def summarize(label: str, latencies: list[float], elapsed: float) -> None:
+    print(
+        f"{label:<6} {len(latencies) / elapsed:>8.1f} payments/s  "
+        f"total {elapsed:>6.2f}s  "
+        f"request p50 {percentile(latencies, 50) * 1000:>8.1f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:>8.1f} ms"
+    )
+
+
+def run_wsgi(order_ids: list[int], workers: int) -> None:
+    from django.test import Client
+
+    def pay(order_id: int) -> float:
+        started = time.perf_counter()
+        response = Client().post(
+            "/api/v1/pay/",
+            {"order": order_id, "payment_type": "PayPal"},
+            content_type="application/json",
+        )
+        assert response.status_code == 201, response.content
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(pay, order_ids))
+    summarize("WSGI", latencies, time.perf_counter() - started)
+
+
+def run_asgi(order_ids: list[int]) -> None:
+    from django.test import AsyncClient
+
+    from payments.processing import wait_for_processing
+
+    async def pay(client: AsyncClient, order_id: int) -> float:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v2/pay/",
+            {"order": order_id, "payment_type": "PayPal"},
+            content_type="application/json",
+        )
+        assert response.status_code == 202, response.content
+        return time.perf_counter() - started
+
+    async def scenario() -> None:
+        client = AsyncClient()
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(pay(client, order_id) for order_id in order_ids))
+        await wait_for_processing()
+        summarize("ASGI", latencies, time.perf_counter() - started)
+
+    asyncio.run(scenario())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares payment throughput under WSGI and ASGI.")
+    parser.add_argument("--payments", type=int, default=200, help="Payments per handler.")
+    parser.add_argument("--wsgi-workers", type=int, default=4, help="Simulated WSGI workers.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Processing time in seconds.")
+    options = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    from benchmarks.hot_paths import create_orders, create_products
+    from payments.models import Payment
+
+    if connection.vendor == "sqlite":
+        # Concurrent writers wait for the lock instead of failing.
+        connection.settings_dict["OPTIONS"].update(transaction_mode="IMMEDIATE", timeout=60)
+    # The debug toolbar middleware is sync-only and would serialize the
+    # async requests.
+    middleware = [path for path in settings.MIDDLEWARE if "debug_toolbar" not in path]
+    # Every payment comes from the same client; limits it never hits.
+    rates = {scope: "1000000000/s" for scope in settings.THROTTLE_RATES}
+    with tempfile.TemporaryDirectory() as directory, test_database(
+        str(Path(directory) / "load.sqlite3")
+    ), override_settings(MIDDLEWARE=middleware, THROTTLE_RATES=rates), mock.patch.object(
+        Payment, "processing_time", staticmethod(lambda: options.delay)
+    ):
+        products = create_products(10)
+        wsgi_orders = [order.pk for order in create_orders(options.payments, products)]
+        asgi_orders = [order.pk for order in create_orders(options.payments, products)]
+        run_wsgi(wsgi_orders, options.wsgi_workers)
+        run_asgi(asgi_orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmarks of the order, payment and product hot paths through the
+full request stack:
+
+- order creation with 1 to 1000 items;
+- payment creation with the processing delay stubbed out;
+- product list pages;
+- admin order confirmation with the webhook stubbed out.
+
+Every benchmark reports throughput, p50/p99 latency and the number of
+queries per request. Results are written as JSON, by default to the
+temporary directory so that runs leave the source tree clean, and can be
+compared with a saved baseline:
+
+    python -m benchmarks.hot_paths --save-baseline
+    python -m benchmarks.hot_paths --baseline benchmarks/baseline.json
+
+The run exits with status 1 when a benchmark regressed against the
+baseline. Run it with `DEBUG=False` or `DJANGO_PROFILE=production`: the
+debug toolbar otherwise dominates the timings.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from benchmarks import compare_results, measure, save_results, setup_django, test_database
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = Path(tempfile.gettempdir()) / "hot_paths_results.json"
+ORDER_SIZES: tuple[int, ...] = (1, 10, 100, 1000)
+PAGE_SIZES: tuple[int, ...] = (10, 100)
+PRODUCTS: int = 1000
+
+
+def create_products(count: int) -> list:
+    from products.models import Product
+
+    return Product.objects.bulk_create(
+        Product(
+            name=f"benchmark_{number}",
+            picture="uploads/benchmark.jpg",
+            image_width=1,
+            image_height=1,
+            content="benchmark",
+            price=10_000 + number,
+        )
+        for number in range(count)
+    )
+
+
+def create_orders(count: int, products: list, **fields) -> list:
+    """
+    Bulk-creates orders with one item each.
+
+    :param count: The number of orders to create.
+    :param products: The products to put in the orders.
+    :param fields: Field values of the orders.
+    :return: The created orders.
+    """
+    from orders.models import Order, OrderItem
+
+    product = products[0]
+    orders = Order.objects.bulk_create(
+        Order(total_cost=product.price, **fields) for _ in range(count)
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(
+            order=order,
+            product=product,
+            quantity=1,
+            unit_price=product.price,
+            line_total=product.price,
+        )
+        for order in orders
+    )
+    return orders
+
+
+def bench_order_creation(client, products: list, repeat: int) -> dict:
+    results = {}
+    for size in ORDER_SIZES:
+        payload = {
+            "orderitem": [
+                {"product": products[number % len(products)].pk, "quantity": 1}
+                for number in range(size)
+            ]
+        }
+
+        def create_order():
+            response = client.post("/api/v1/orders/", payload, content_type="application/json")
+            assert response.status_code == 201, response.content
+
+        results[f"order_create[{size}]"] = measure(create_order, repeat)
+    return results
+
+
+def bench_payment_creation(client, products: list, repeat: int) -> dict:
+    orders = iter(create_orders(repeat, products))
+
+    def create_payment():
+        order = next(orders)
+        response = client.post(
+            "/api/v1/pay/",
+            {"order": order.pk, "payment_type": "PayPal"},
+            content_type="application/json",
+        )
+        assert response.status_code == 201, response.content
+
+    with mock.patch("payments.models.time.sleep"):
+        return {"payment_create": measure(create_payment, repeat)}
+
+
+def bench_product_list(client, repeat: int) -> dict:
+    results = {}
+    for page_size in PAGE_SIZES:
+
+        def list_products():
+            response = client.get("/api/v1/products/", {"page_size": page_size})
+            assert response.status_code == 200, response.content
+
+        results[f"product_list[{page_size}]"] = measure(list_products, repeat)
+    return results
+
+
+def bench_admin_confirmation(client, products: list, repeat: int) -> dict:
+    from django.utils import timezone
+
+    from orders.models import Order
+
+    orders = iter(
+        create_orders(
+            repeat,
+            products,
+            status=Order.STATUS_CHOICES["PAID"],
+            payment_dt=timezone.now(),
+        )
+    )
+
+    def confirm_order():
+        order = next(orders)
+        response = client.get(
+            f"/admin/orders/order/{order.pk}/approve/", HTTP_REFERER="/admin/"
+        )
+        assert response.status_code == 302, response.content
+
+    with mock.patch("orders.admin.OrderAdmin.request_to_external", return_value=True):
+        return {"admin_confirm": measure(confirm_order, repeat)}
+
+
+def run(repeat: int) -> dict:
+    """
+    Runs all benchmarks against a throwaway database.
+
+    :param repeat: The number of requests per benchmark.
+    :return: The results keyed by benchmark name.
+    """
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    results = {}
+    with test_database():
+        products = create_products(PRODUCTS)
+        client = Client()
+        admin_client = Client()
+        admin_client.force_login(
+            get_user_model().objects.create_superuser("benchmark", password="benchmark")
+        )
+        results.update(bench_order_creation(client, products, repeat))
+        results.update(bench_payment_creation(client, products, repeat))
+        results.update(bench_product_list(client, repeat))
+        results.update(bench_admin_confirmation(admin_client, products, repeat))
+    return results
+
+
+def environment() -> dict:
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the order, payment and product hot paths.")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests per benchmark.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=RESULTS_PATH,
+        help=f"Where to write the results, {RESULTS_PATH} by default.",
+    )
+    parser.add_argument("--baseline", type=Path, help="Results to compare with.")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Also write the results to benchmarks/baseline.json.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative p50 growth against the baseline.",
+    )
+    options = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    if settings.DEBUG:
+        print("Warning: DEBUG is on, timings include the debug toolbar.", file=sys.stderr)
+    # Requests still pass the rate limit checks, with limits they never hit.
+    settings.THROTTLE_RATES = {scope: "1000000000/s" for scope in settings.THROTTLE_RATES}
+    results = run(options.repeat)
+    report = {"environment": environment(), "results": results}
+    save_results(options.output, report)
+    if options.save_baseline:
+        save_results(BENCHMARKS_DIR / "baseline.json", report)
+
+    print(f"{'benchmark':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<22}{result['throughput_per_s']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['queries']:>9}"
+        )
+
+    if options.baseline is None:
+        return 0
+    baseline = json.loads(options.baseline.read_text())["results"]
+    regressions = compare_results(results, baseline, options.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
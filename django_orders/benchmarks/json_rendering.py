@@ -0,0 +1,67 @@
+"""
+Micro-benchmark of the API JSON renderers and parsers.
+
+Renders large `OrderSerializer` and `ProductSerializer` payloads with
+DRF's `JSONRenderer` and with `FastJSONRenderer`, then parses them back
+with the matching parsers. The fast classes use orjson when it is
+installed and the stdlib otherwise, the backend is printed first:
+
+    python -m benchmarks.json_rendering --orders 10000 --products 10000
+"""
+
+import argparse
+import io
+
+from benchmarks import best_of, setup_django, test_database
+
+
+def compare(label: str, data) -> None:
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from services.fast_json import FastJSONParser, FastJSONRenderer
+
+    drf_render = best_of(lambda: JSONRenderer().render(data))
+    fast_render = best_of(lambda: FastJSONRenderer().render(data))
+    body = JSONRenderer().render(data)
+    assert FastJSONParser().parse(io.BytesIO(FastJSONRenderer().render(data))) == (
+        JSONParser().parse(io.BytesIO(body))
+    )
+    drf_parse = best_of(lambda: JSONParser().parse(io.BytesIO(body)))
+    fast_parse = best_of(lambda: FastJSONParser().parse(io.BytesIO(body)))
+    print(
+        f"{label:<22} {len(body) / 1024:>8.0f} KiB  "
+        f"render {drf_render * 1000:>7.1f} -> {fast_render * 1000:>7.1f} ms  "
+        f"parse {drf_parse * 1000:>7.1f} -> {fast_parse * 1000:>7.1f} ms"
+    )
+
+
+def run(orders: int, products: int) -> None:
+    from benchmarks.hot_paths import create_orders, create_products
+    from orders.models import Order
+    from orders.serializers import OrderSerializer
+    from products.serializers import ProductSerializer
+    from services import fast_json
+
+    print(f"Fast backend: {'orjson' if fast_json.orjson else 'stdlib json'}")
+    with test_database():
+        catalog = create_products(products)
+        create_orders(orders, catalog)
+        product_data = ProductSerializer(catalog, many=True).data
+        order_data = OrderSerializer(Order.objects.prefetch_related("orderitem"), many=True).data
+    compare(f"ProductSerializer x{products}", product_data)
+    compare(f"OrderSerializer x{orders}", order_data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares the JSON renderers and parsers.")
+    parser.add_argument("--orders", type=int, default=10_000, help="Orders in the payload.")
+    parser.add_argument("--products", type=int, default=10_000, help="Products in the payload.")
+    options = parser.parse_args()
+
+    setup_django()
+    run(options.orders, options.products)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for serializing orders with amounts in minor units.
+
+Compares the integer money field with the previous `DecimalField`
+representation and times `OrderSerializer` on 10k orders:
+
+    python -m benchmarks.money_serialization
+"""
+
+import random
+from decimal import Decimal
+
+from benchmarks import best_of, setup_django, test_database
+
+ORDERS: int = 10_000
+
+
+def create_orders(count: int) -> None:
+    """
+    Bulk-creates orders with one item each.
+
+    :param count: The number of orders to create.
+    """
+    from orders.models import Order, OrderItem
+    from products.models import Product
+
+    [product] = Product.objects.bulk_create(
+        [
+            Product(
+                name="benchmark",
+                picture="uploads/benchmark.jpg",
+                image_width=1,
+                image_height=1,
+                content="benchmark",
+                price=12345,
+            )
+        ]
+    )
+    orders = Order.objects.bulk_create(
+        Order(total_cost=random.randint(1, 10_000_000)) for _ in range(count)
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(
+            order=order,
+            product=product,
+            quantity=1,
+            unit_price=order.total_cost,
+            line_total=order.total_cost,
+        )
+        for order in orders
+    )
+
+
+def run() -> None:
+    from rest_framework import serializers
+
+    from orders.models import Order
+    from orders.serializers import OrderSerializer
+    from products.serializers import MoneyField
+
+    values = [random.randint(1, 10_000_000) for _ in range(ORDERS)]
+    decimals = [Decimal(value).scaleb(-2) for value in values]
+    decimal_field = serializers.DecimalField(max_digits=25, decimal_places=2)
+    money_field = MoneyField()
+
+    decimal_time = best_of(lambda: [decimal_field.to_representation(v) for v in decimals])
+    money_time = best_of(lambda: [money_field.to_representation(v) for v in values])
+    print(f"DecimalField.to_representation x{ORDERS}: {decimal_time * 1000:.1f} ms")
+    print(f"MoneyField.to_representation   x{ORDERS}: {money_time * 1000:.1f} ms")
+
+    with test_database():
+        create_orders(ORDERS)
+        orders = list(Order.objects.prefetch_related("orderitem"))
+        serializer_time = best_of(lambda: OrderSerializer(orders, many=True).data)
+    print(f"OrderSerializer x{ORDERS}: {serializer_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    setup_django()
+    run()
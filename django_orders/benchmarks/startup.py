@@ -0,0 +1,118 @@
+"""
+Cold start of a worker per settings profile.
+
+Every run starts a fresh interpreter, like a new server worker, and
+measures:
+
+- import: importing `django_orders.wsgi`, i.e. configuring Django,
+  loading the apps and building the middleware chain;
+- first request: the first request served, which also loads the URL
+  configuration and the views;
+- request: the median latency of the following requests;
+- middleware: the part of that latency spent outside the view.
+
+The request goes to `/metrics/`, which needs no database, so only the
+framework overhead is measured:
+
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+PROFILES = ("development", "production")
+PATH = "/metrics/"
+
+
+def request_environ() -> dict:
+    environ = {"PATH_INFO": PATH, "REQUEST_METHOD": "GET", "REMOTE_ADDR": "127.0.0.1"}
+    setup_testing_defaults(environ)
+    return environ
+
+
+def serve(application) -> float:
+    started = time.perf_counter()
+    response = application(request_environ(), lambda status, headers: None)
+    b"".join(response)
+    response.close()
+    return time.perf_counter() - started
+
+
+def measure_worker(requests: int) -> dict:
+    """
+    Measures the current interpreter as a freshly started worker.
+    """
+    started = time.perf_counter()
+    import django_orders.wsgi
+
+    imported = time.perf_counter() - started
+    application = django_orders.wsgi.application
+    first_request = serve(application)
+    request = statistics.median(serve(application) for _ in range(requests))
+
+    from django.test import RequestFactory
+
+    from services.metrics import metrics_view
+
+    view_request = RequestFactory().get(PATH, REMOTE_ADDR="127.0.0.1")
+    view = []
+    for _ in range(requests):
+        view_started = time.perf_counter()
+        metrics_view(view_request)
+        view.append(time.perf_counter() - view_started)
+    return {
+        "import_ms": imported * 1000,
+        "first_request_ms": first_request * 1000,
+        "request_ms": request * 1000,
+        "middleware_ms": (request - statistics.median(view)) * 1000,
+        "modules": len(sys.modules),
+    }
+
+
+def run_profile(profile: str, runs: int, requests: int) -> dict:
+    env = {**os.environ, "DJANGO_PROFILE": profile, "ALLOWED_HOSTS": "*"}
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    results = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", "--worker", "--requests", str(requests)],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    return {key: statistics.median(result[key] for result in results) for key in results[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures worker cold start per settings profile.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per profile.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per interpreter.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.worker:
+        print(json.dumps(measure_worker(options.requests)))
+        return
+    for profile in PROFILES:
+        result = run_profile(profile, options.runs, options.requests)
+        print(
+            f"{profile:<12} import {result['import_ms']:>7.1f} ms  "
+            f"first request {result['first_request_ms']:>7.1f} ms  "
+            f"request {result['request_ms']:>6.3f} ms  "
+            f"middleware {result['middleware_ms']:>6.3f} ms  "
+            f"modules {result['modules']:>5.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of the rate limiting overhead per request.
+
+Times a token take from the in-memory and the SQLite bucket stores, for
+one busy client and for many clients, and a full `TokenBucketThrottle`
+check of a DRF request:
+
+    python -m benchmarks.throttling --takes 100000 --clients 10000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+
+def per_take(func, takes: int) -> float:
+    """
+    Calls a function repeatedly.
+
+    :param func: The function, called with the number of the call.
+    :param takes: The number of calls.
+    :return: The mean time of a call in microseconds.
+    """
+    started = time.perf_counter()
+    for number in range(takes):
+        func(number)
+    return (time.perf_counter() - started) / takes * 1_000_000
+
+
+def run(takes: int, clients: int) -> None:
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+
+    from services.throttling import MemoryBucketStore, SQLiteBucketStore, TokenBucketThrottle
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            "memory": MemoryBucketStore(),
+            "sqlite": SQLiteBucketStore(str(Path(directory) / "throttle.sqlite3")),
+        }
+        for name, store in stores.items():
+            # A huge rate, so the busy client is never refused.
+            one = per_take(lambda number: store.take("client", 10, 1e9), takes)
+            many = per_take(lambda number: store.take(str(number % clients), 10, 1e9), takes)
+            print(f"{name:<8} one client {one:>7.2f} us  {clients} clients {many:>7.2f} us")
+
+    class View:
+        throttle_scope = "orders"
+
+    request = Request(RequestFactory().post("/api/v1/orders/"))
+    request.user = None
+    throttle, view = TokenBucketThrottle(), View()
+    check = per_take(lambda number: throttle.allow_request(request, view), takes)
+    print(f"TokenBucketThrottle.allow_request {check:>7.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures the rate limiting overhead.")
+    parser.add_argument("--takes", type=int, default=100_000, help="Tokens taken per case.")
+    parser.add_argument("--clients", type=int, default=10_000, help="Distinct clients.")
+    options = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    # The throttle check uses the configured store; a limit it never hits.
+    settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, "orders": "1000000000/s"}
+    run(options.takes, options.clients)
+
+
+if __name__ == "__main__":
+    main()
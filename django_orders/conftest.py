@@ -9,8 +9,92 @@ from django.core.files import File
 from django.core.files.storage import default_storage
 from django.core.management import call_command
 
+from services.lru_cache import registered_caches
+from services.throttling import bucket_store
+from services.query_budget import Budget, BudgetedClient, QueryBudget
+
 _not_existing: int = 9999
 
+# Budgets of the API endpoints and admin actions, keyed by method and URL
+# name. Requests sent through `budget_client` and `admin_budget_client`
+# fail when they exceed them.
+ENDPOINT_BUDGETS: dict[tuple[str, str], Budget] = {
+    ("GET", "product-list"): Budget(max_queries=2, max_seconds=0.5),
+    ("GET", "product-top"): Budget(max_queries=1, max_seconds=0.5),
+    ("POST", "order-list"): Budget(max_queries=13, max_seconds=1.0),
+    ("POST", "order-create-async"): Budget(max_queries=13, max_seconds=1.0),
+    ("GET", "export-orders"): Budget(max_queries=5, max_seconds=1.0),
+    ("POST", "payment-list"): Budget(max_queries=19, max_seconds=1.0),
+    ("POST", "payment-create-async"): Budget(max_queries=8, max_seconds=1.0),
+    ("GET", "payment-status"): Budget(max_queries=2, max_seconds=0.5),
+    ("GET", "export-payments"): Budget(max_queries=4, max_seconds=1.0),
+    ("GET", "metrics"): Budget(max_queries=1, max_seconds=0.5),
+    ("GET", "dailyrollup-list"): Budget(max_queries=5, max_seconds=0.5),
+    ("GET", "admin:approve"): Budget(max_queries=16, max_seconds=1.0),
+    ("GET", "admin:orders_order_changelist"): Budget(max_queries=5, max_seconds=1.0),
+    ("GET", "admin:payments_payment_changelist"): Budget(max_queries=5, max_seconds=1.0),
+}
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, max_seconds=None): fail the test when its body "
+        "runs more queries or takes longer than the budget.",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """
+    Checks the body of tests marked with `query_budget` against the
+    budget. Fixture setup is not counted.
+    """
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with QueryBudget(*marker.args, label=item.nodeid, **marker.kwargs):
+        return (yield)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Empties the in-process caches: rolled back rows and rows created with
+    `bulk_create` send no signal that would invalidate them. Rate limit
+    buckets are emptied too, so tests do not share limits.
+    """
+    for cache in registered_caches.values():
+        cache.clear()
+    bucket_store().clear()
+
+
+@pytest.fixture(autouse=True)
+def catalog_snapshot_root(settings, tmp_path):
+    """
+    Keeps catalog snapshots out of the source tree and off unless a test
+    turns publishing on.
+    """
+    settings.CATALOG_SNAPSHOT_ROOT = tmp_path / "catalog"
+    settings.CATALOG_SNAPSHOT_AUTOPUBLISH = False
+
+
+@pytest.fixture
+def budget_client(client) -> BudgetedClient:
+    """
+    A test client that checks every request against `ENDPOINT_BUDGETS`.
+    """
+    return BudgetedClient(client, ENDPOINT_BUDGETS)
+
+
+@pytest.fixture
+def admin_budget_client(admin_client) -> BudgetedClient:
+    """
+    An admin test client that checks every request against
+    `ENDPOINT_BUDGETS`.
+    """
+    return BudgetedClient(admin_client, ENDPOINT_BUDGETS)
+
 
 @pytest.fixture(scope="class")
 def create_mock_image():
@@ -0,0 +1,10 @@
+import os
+
+
+def settings_module() -> str:
+    """
+    Returns the settings module of the profile selected by the
+    `DJANGO_PROFILE` environment variable: `development` by default or
+    `production`.
+    """
+    return f"django_orders.settings.{os.environ.get('DJANGO_PROFILE', 'development')}"
@@ -0,0 +1,30 @@
+"""
+Connection settings of the databases. Imported by the settings module,
+so it must not depend on configured Django.
+"""
+
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+
+
+def connection_settings(
+    config: dict, conn_max_age: int | None, health_checks: bool, pool: dict | None = None
+) -> dict:
+    """
+    Applies the connection management settings to a database config.
+
+    :param config: The database config parsed from a URL.
+    :param conn_max_age: Seconds a connection is reused for. 0 closes it
+     at the end of each request, None keeps it open indefinitely.
+    :param health_checks: Whether a reused connection is checked first.
+    :param pool: Options of the psycopg connection pool, e.g. `min_size`
+     and `max_size`. Applies to PostgreSQL only; pooled connections are
+     returned to the pool at the end of each request.
+    :return: The updated config.
+    """
+    config["CONN_MAX_AGE"] = conn_max_age
+    config["CONN_HEALTH_CHECKS"] = health_checks
+    if pool is not None and config["ENGINE"] == POSTGRESQL_ENGINE:
+        # Django refuses persistent connections on top of a pool.
+        config["CONN_MAX_AGE"] = 0
+        config.setdefault("OPTIONS", {})["pool"] = dict(pool)
+    return config
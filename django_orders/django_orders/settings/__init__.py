@@ -0,0 +1,5 @@
+"""
+Settings profiles. `base` holds the settings shared by every profile,
+`development` adds debugging tools and `production` serves requests with
+the required apps and middleware only.
+"""
@@ -0,0 +1,236 @@
+"""
+Django settings for django_orders project shared by all profiles.
+
+Generated by 'django-admin startproject' using Django 5.1.2.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+from pathlib import Path
+
+import environ
+
+from ..database import connection_settings
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+environ.Env.read_env(BASE_DIR / "django_orders" / ".env")
+env = environ.Env()
+
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env.str("SECRET_KEY")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env.bool("DEBUG", default=False)
+
+ALLOWED_HOSTS: list[str] | list = env.list("ALLOWED_HOSTS", default=[])
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "products",
+    "orders",
+    "payments",
+    "analytics",
+    "archive",
+]
+
+MIDDLEWARE = [
+    "services.middleware.TracingMiddleware",
+    "services.middleware.MetricsMiddleware",
+    "services.middleware.PrimaryPinningMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "django_orders.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "django_orders.wsgi.application"
+
+
+# Database
+# Connections are kept open between requests for DB_CONN_MAX_AGE seconds
+# (0 closes them after every request) and checked before reuse. With
+# DB_POOL=True PostgreSQL connections are taken from a psycopg pool instead.
+DB_CONNECTION = {
+    "conn_max_age": env.int("DB_CONN_MAX_AGE", default=60),
+    "health_checks": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+    "pool": {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+        "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+        "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+    }
+    if env.bool("DB_POOL", default=False)
+    else None,
+}
+DATABASES = {"default": connection_settings(env.db("DB_URL"), **DB_CONNECTION)}
+
+# Read replicas, a comma-separated list of database URLs. Catalog, export
+# and analytics reads go to them; everything else uses the primary.
+DATABASE_REPLICAS: list[str] = []
+for number, url in enumerate(env.list("DB_REPLICA_URLS", default=[]), start=1):
+    DATABASES[f"replica{number}"] = {
+        **connection_settings(env.db_url_config(url), **DB_CONNECTION),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+DATABASE_ROUTERS = ["services.db_router.ReplicaRouter"]
+
+# DRF settings
+# The fast JSON classes use orjson when it is installed. DRF's
+# `JSONRenderer` and `JSONParser` restore the stock behaviour.
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "PAGE_SIZE": 10,
+    "DEFAULT_RENDERER_CLASSES": [
+        "services.fast_json.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "services.fast_json.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Password validation
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+LANGUAGE_CODE = "ru-RU"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+FIXTURE_DIRS = [BASE_DIR / "fixtures/"]
+
+# Static files
+STATIC_ROOT = BASE_DIR / "file_storage/static"
+STATIC_URL = "/static/"
+
+# Files managing
+FILE_UPLOAD_TEMP_DIR = BASE_DIR / "file_storage/tmp_media"
+MEDIA_ROOT = BASE_DIR / "file_storage/media"
+MEDIA_URL = "/media/"
+
+# Uploads are named by content hash and served as immutable. MEDIA_SERVING
+# is "django", "x-accel-redirect" (nginx, internal location
+# MEDIA_ACCEL_PREFIX) or "x-sendfile" (Apache, lighttpd).
+STORAGES = {
+    "default": {"BACKEND": "services.storage.ContentHashedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_SERVING = env.str("MEDIA_SERVING", default="django")
+MEDIA_ACCEL_PREFIX = env.str("MEDIA_ACCEL_PREFIX", default="/protected-media/")
+
+# Default primary key field type
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Configs to sevice layer
+SEND_ORDER_DATA_URL = "https://webhook.site/36693e00-8f59-4f7b-9a85-1d1e7ddde4d4"
+
+# Confirmed orders older than this are moved to the archive tables
+ORDER_ARCHIVE_RETENTION_DAYS = env.int("ORDER_ARCHIVE_RETENTION_DAYS", default=365)
+
+# In-process cache of product names and prices used by order creation.
+# Other workers may price orders with a changed price until the TTL ends.
+PRODUCT_CACHE_SIZE = env.int("PRODUCT_CACHE_SIZE", default=10_000)
+PRODUCT_CACHE_TTL = env.float("PRODUCT_CACHE_TTL", default=60.0)
+
+# Static catalog snapshot, republished after product changes. Served by
+# the web server from CATALOG_SNAPSHOT_ROOT at CATALOG_SNAPSHOT_URL and by
+# Django in DEBUG; CATALOG_SNAPSHOT_KEEP versioned copies are kept.
+CATALOG_SNAPSHOT_ROOT = BASE_DIR / "file_storage" / "catalog"
+CATALOG_SNAPSHOT_URL = "/catalog/"
+CATALOG_SNAPSHOT_KEEP = env.int("CATALOG_SNAPSHOT_KEEP", default=5)
+CATALOG_SNAPSHOT_AUTOPUBLISH = env.bool("CATALOG_SNAPSHOT_AUTOPUBLISH", default=True)
+# Seconds between a product change and the publication that includes it.
+CATALOG_SNAPSHOT_DELAY = env.float("CATALOG_SNAPSHOT_DELAY", default=2.0)
+
+# Token bucket rate limits of the write endpoints per client, in the DRF
+# format ("30/min" allows bursts of 30); an empty rate disables a limit.
+# THROTTLE_STORE is "memory" or the path of a SQLite file shared by the
+# workers of the host.
+THROTTLE_RATES = {
+    "orders": env.str("THROTTLE_ORDERS_RATE", default="60/min"),
+    "payments": env.str("THROTTLE_PAYMENTS_RATE", default="30/min"),
+}
+THROTTLE_STORE = env.str("THROTTLE_STORE", default="memory")
+
+# Tracing: share of requests whose traces are logged as JSON lines by the
+# "tracing" logger, 0 turns it off.
+TRACING_SAMPLE_RATE = env.float("TRACING_SAMPLE_RATE", default=0.0)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {"request_id": {"()": "django_orders.tracing.RequestIDFilter"}},
+    "formatters": {"json": {"()": "django_orders.tracing.JSONFormatter"}},
+    "handlers": {
+        "tracing": {
+            "class": "logging.StreamHandler",
+            "filters": ["request_id"],
+            "formatter": "json",
+        },
+    },
+    "loggers": {
+        "tracing": {"handlers": ["tracing"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Request metrics: share of sampled requests and clients allowed to scrape /metrics/
+METRICS_SAMPLE_RATE = env.float("METRICS_SAMPLE_RATE", default=1.0)
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+# If set, scrapers must send `Authorization: Bearer <token>` and the
+# addresses above are not checked.
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
@@ -0,0 +1,23 @@
+"""
+Settings for local development: debug mode with the debug toolbar.
+"""
+
+from .base import *  # noqa: F403
+from .base import INSTALLED_APPS, MIDDLEWARE, env
+
+DEBUG = env.bool("DEBUG", default=True)
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+    "localhost",
+]
+
+if DEBUG:
+    INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+    # After the middleware that must see every request, before the rest.
+    position = MIDDLEWARE.index("django.middleware.security.SecurityMiddleware")
+    MIDDLEWARE = [
+        *MIDDLEWARE[:position],
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+        *MIDDLEWARE[position:],
+    ]
@@ -0,0 +1,35 @@
+"""
+Settings for production. Debugging tools are never loaded, so a new
+worker starts and serves its first request faster.
+"""
+
+from .base import *  # noqa: F403
+from .base import BASE_DIR, MIDDLEWARE, REST_FRAMEWORK, DATABASE_REPLICAS, env
+
+DEBUG = False
+
+ALLOWED_HOSTS = env.list("ALLOWED_HOSTS")
+
+# Clients get JSON only; the browsable API renders HTML templates.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["services.fast_json.FastJSONRenderer"],
+}
+
+# The web server sends media files, see `services.media`.
+MEDIA_SERVING = env.str("MEDIA_SERVING", default="x-accel-redirect")
+
+# Behind the local proxy every client has a local address, so /metrics/
+# is only served to scrapers sending `METRICS_TOKEN`.
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=[])
+
+# Workers share the rate limit buckets.
+THROTTLE_STORE = env.str(
+    "THROTTLE_STORE", default=str(BASE_DIR / "file_storage" / "throttle.sqlite3")
+)
+
+# Pinning reads to the primary matters only with read replicas.
+if not DATABASE_REPLICAS:
+    MIDDLEWARE = [
+        path for path in MIDDLEWARE if path != "services.middleware.PrimaryPinningMiddleware"
+    ]
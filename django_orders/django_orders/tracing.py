@@ -0,0 +1,179 @@
+"""
+Lightweight tracing of sampled requests.
+
+`services.middleware.TracingMiddleware` starts a trace with a request ID
+for a share of the requests (`TRACING_SAMPLE_RATE`). Blocks wrapped in
+`span()` and functions decorated with `traced()` record their timing in
+the current trace, which is logged as one JSON line when the response is
+ready. Outside a sampled request a traced function costs one context
+variable lookup.
+
+Used by the models and the logging config, so it must not depend on
+configured Django or on the `services` package.
+"""
+
+import functools
+import inspect
+import itertools
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Spans beyond this are counted but not kept, so a request running a
+# query per row does not grow its trace without bound.
+MAX_SPANS: int = 1000
+
+
+class Trace:
+    """
+    The spans recorded while a request is handled.
+
+    Attributes:
+    - request_id: The ID tying the trace and the logs of the request.
+    - spans: The finished spans in the order they ended.
+    - dropped: The number of spans over `MAX_SPANS`.
+    """
+
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: list[dict] = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, span: dict) -> None:
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def elapsed_ms(self, since: float | None = None) -> float:
+        return round((time.perf_counter() - (since or self.started)) * 1000, 3)
+
+    def to_dict(self, **fields) -> dict:
+        """
+        Returns the trace as a log record payload.
+
+        :param fields: Extra fields, e.g. the route and the status.
+        :return: The request ID, the fields, the duration and the spans.
+        """
+        return {
+            "request_id": self.request_id,
+            **fields,
+            "duration_ms": self.elapsed_ms(),
+            "spans": self.spans,
+            "dropped_spans": self.dropped,
+        }
+
+
+current_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_current_span: ContextVar[int | None] = ContextVar("span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """
+    Records the duration of a block in the current trace, if any.
+
+    :param name: The name of the span, e.g. `payment.save`.
+    :param attributes: Extra fields of the span.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    span_id = trace.next_id()
+    parent = _current_span.get()
+    token = _current_span.set(span_id)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        record = {
+            "id": span_id,
+            "parent": parent,
+            "name": name,
+            "start_ms": round((started - trace.started) * 1000, 3),
+            "duration_ms": trace.elapsed_ms(started),
+            **attributes,
+        }
+        if error is not None:
+            record["error"] = error
+        trace.add(record)
+
+
+def traced(name: str):
+    """
+    Records every call of the decorated function or coroutine function
+    as a span.
+
+    :param name: The name of the span.
+    :return: The decorator.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RequestIDFilter(logging.Filter):
+    """
+    Adds the ID of the traced request, if any, to log records as
+    `request_id`.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = current_trace.get()
+        record.request_id = trace.request_id if trace is not None else None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats log records as JSON lines. The fields passed in the `trace`
+    extra are merged into the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            data["request_id"] = record.request_id
+        data.update(getattr(record, "trace", {}))
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
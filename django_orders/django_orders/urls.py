@@ -18,15 +18,27 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
-from debug_toolbar.toolbar import debug_toolbar_urls
+
+from products.views import catalog_snapshot
+from services.media import serve_media
+from services.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("products.urls")),
     path("", include("orders.urls")),
     path("", include("payments.urls")),
-] + debug_toolbar_urls()
+    path("", include("analytics.urls")),
+    path("metrics/", metrics_view, name="metrics"),
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name="media"),
+]
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
+    urlpatterns += debug_toolbar_urls()
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        path(f"{settings.CATALOG_SNAPSHOT_URL.strip('/')}/<str:name>", catalog_snapshot),
+    ]
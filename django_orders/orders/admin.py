@@ -1,26 +1,73 @@
+from django.apps import apps
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import admin, messages
 from django.utils.html import format_html
 
 from .models import Order
+from products import format_money
 from services import OrderAdminRequest
+from services.paginators import EstimatedCountPaginator
+
+
+class StatusFilter(admin.SimpleListFilter):
+    """
+    Filters by the statuses known to the model instead of the distinct
+    values of the column, which would scan the whole table.
+    """
+
+    title = "Статус"
+    parameter_name = "status"
+    statuses: dict[str, str] = Order.STATUS_CHOICES
+
+    def lookups(self, request, model_admin):
+        return [(status, status) for status in self.statuses.values()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(status=self.value())
+        return queryset
 
 
 class OrderAdmin(admin.ModelAdmin):
     """
     Admin class for managing Orders in the admin interface.
     Adds custom behavior for handling order confirmations.
+
+    The changelist stays fast on large tables: filters use indexed
+    columns and the paginator estimates the number of rows instead of
+    counting them.
     """
 
+    list_display = ("id", "status", "total_cost_display", "create_dt", "payment_dt", "confirm_dt")
+    list_filter = (StatusFilter, ("create_dt", admin.DateFieldListFilter))
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    fields = (
+        "total_cost_display",
+        "status",
+        "create_dt",
+        "payment_dt",
+        "confirm_dt",
+        "custom_button",
+    )
     readonly_fields = (
-        "total_cost",
+        "total_cost_display",
         "status",
         "create_dt",
         "confirm_dt",
         "custom_button",
     )
 
+    @admin.display(description="Итоговая сумма", ordering="total_cost")
+    def total_cost_display(self, obj) -> str:
+        """
+        Shows the total in major units instead of the stored minor units.
+        """
+        return format_money(obj.total_cost)
+
     def has_add_permission(self, request):
         return False
 
@@ -30,6 +77,18 @@ class OrderAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return False
 
+    def get_object(self, request, object_id, from_field=None):
+        """
+        Falls back to the archive for orders that were moved out of the
+        live table, so old order links keep working.
+        """
+        obj = super().get_object(request, object_id, from_field)
+        if obj is None and apps.is_installed("archive") and str(object_id).isdigit():
+            from archive.services import find_order
+
+            obj = find_order(object_id)
+        return obj
+
     def get_urls(self):
         """
         Adds custom URLs to handle button actions for approving orders.
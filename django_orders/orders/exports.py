@@ -0,0 +1,113 @@
+import datetime
+from typing import Iterable
+
+from django.db.models import Prefetch, QuerySet
+
+from products import format_money
+from services.exports import BaseExporter
+from .models import Order, OrderItem
+
+
+def isoformat(value: datetime.datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+class OrderExporter(BaseExporter):
+    """
+    Exports orders created in a date range together with their items.
+
+    CSV has one row per item with the order columns repeated. NDJSON has
+    one record per order with a nested list of items.
+    """
+
+    csv_header = [
+        "order_id",
+        "status",
+        "create_dt",
+        "payment_dt",
+        "confirm_dt",
+        "total_cost",
+        "product_id",
+        "quantity",
+        "unit_price",
+        "line_total",
+    ]
+
+    def __init__(
+        self,
+        export_format: str,
+        created_from: datetime.datetime | None = None,
+        created_to: datetime.datetime | None = None,
+        after_id: int | None = None,
+        chunk_size: int = 2000,
+    ) -> None:
+        """
+        Initializes the exporter.
+
+        :param export_format: "csv" or "ndjson".
+        :param created_from: Inclusive lower bound of the creation time.
+        :param created_to: Exclusive upper bound of the creation time.
+        :param after_id: Export only orders with a greater ID, to resume
+         an interrupted export.
+        :param chunk_size: The number of orders fetched per round trip.
+        """
+        super().__init__(export_format, chunk_size)
+        self.created_from = created_from
+        self.created_to = created_to
+        self.after_id = after_id
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Builds the queryset of orders ordered by ID, with the items of each
+        chunk fetched by a single prefetch query.
+        """
+        orders = Order.objects.order_by("pk")
+        if self.created_from:
+            orders = orders.filter(create_dt__gte=self.created_from)
+        if self.created_to:
+            orders = orders.filter(create_dt__lt=self.created_to)
+        if self.after_id:
+            orders = orders.filter(pk__gt=self.after_id)
+        items = OrderItem.objects.order_by("pk").only(
+            "order_id", "product_id", "quantity", "unit_price", "line_total"
+        )
+        return orders.prefetch_related(Prefetch("orderitem", queryset=items))
+
+    def to_record(self, order: Order) -> dict:
+        return {
+            "id": order.pk,
+            "status": order.status,
+            "create_dt": isoformat(order.create_dt),
+            "payment_dt": isoformat(order.payment_dt),
+            "confirm_dt": isoformat(order.confirm_dt),
+            "total_cost": format_money(order.total_cost),
+            "items": [
+                {
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "unit_price": format_money(item.unit_price),
+                    "line_total": format_money(item.line_total),
+                }
+                for item in order.orderitem.all()
+            ],
+        }
+
+    def to_csv_rows(self, order: Order) -> Iterable[list]:
+        head = [
+            order.pk,
+            order.status,
+            isoformat(order.create_dt),
+            isoformat(order.payment_dt),
+            isoformat(order.confirm_dt),
+            format_money(order.total_cost),
+        ]
+        items = order.orderitem.all()
+        if not items:
+            yield head + [None, None, None, None]
+        for item in items:
+            yield head + [
+                item.product_id,
+                item.quantity,
+                format_money(item.unit_price),
+                format_money(item.line_total),
+            ]
@@ -0,0 +1,231 @@
+"""
+Generation of synthetic products, orders, items and payments for scale
+testing.
+
+Every chunk draws from its own random generator seeded with the global
+seed and the chunk number, so a run is reproducible regardless of how
+chunks are spread across worker processes. Only the assigned IDs may
+differ between runs with several workers.
+"""
+
+import bisect
+import datetime
+import itertools
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from payments.models import Payment
+from products.models import Product
+from .models import Order, OrderItem
+
+STATUS_WEIGHTS: dict[str, int] = {
+    Order.STATUS_CHOICES["PENDING"]: 15,
+    Order.STATUS_CHOICES["PAID"]: 25,
+    Order.STATUS_CHOICES["CONFIRMED"]: 60,
+}
+PAYMENT_TYPE_WEIGHTS: dict[str, int] = {
+    "Bank Transfer": 40,
+    "Credit Card": 35,
+    "PayPal": 25,
+}
+# Share of orders with a failed payment attempt.
+FAILED_PAYMENT_SHARE: float = 0.05
+MAX_ITEMS_PER_ORDER: int = 50
+MEAN_ITEMS_PER_ORDER: float = 2.5
+
+
+@dataclass(frozen=True)
+class OrderChunk:
+    """
+    A unit of order generation work.
+
+    Attributes:
+    - seed: The global seed of the run.
+    - number: The number of the chunk within the run.
+    - size: The number of orders to generate.
+    - days: The orders are spread over this many days before `now`.
+    - now: The end of the generated period.
+    """
+
+    seed: int
+    number: int
+    size: int
+    days: int
+    now: datetime.datetime
+
+
+@contextmanager
+def preserved_create_dt():
+    """
+    Lets bulk_create store the generated creation dates instead of the
+    current time set by `auto_now_add`.
+    """
+    field = Order._meta.get_field("create_dt")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def generate_products(count: int, seed: int, chunk_size: int) -> int:
+    """
+    Bulk-creates products with log-normally distributed prices.
+
+    :param count: The number of products to create.
+    :param seed: The seed of the run.
+    :param chunk_size: The number of products inserted per query.
+    :return: The number of created products.
+    """
+    rng = random.Random(f"{seed}:products")
+    products = (
+        Product(
+            name=f"Товар {number}",
+            picture="uploads/load_data.jpg",
+            image_width=600,
+            image_height=600,
+            content=f"Сгенерированный товар № {number}",
+            # Median price around 1500 with a long tail of expensive products.
+            price=max(int(rng.lognormvariate(7.3, 1.0) * 100), 100),
+        )
+        for number in range(count)
+    )
+    created = 0
+    for batch in iter(lambda: list(itertools.islice(products, chunk_size)), []):
+        Product.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+class Catalog:
+    """
+    The products orders are drawn from. Popularity follows a Zipf-like
+    distribution: a few products get most of the sales.
+    """
+
+    def __init__(self) -> None:
+        rows = list(Product.objects.order_by("id").values_list("id", "price"))
+        self.ids = [pk for pk, _ in rows]
+        self.prices = [price for _, price in rows]
+        self.cum_weights = list(
+            itertools.accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(rows)))
+        )
+
+    def pick(self, rng: random.Random) -> int:
+        """
+        Returns the index of a product drawn by popularity.
+        """
+        return bisect.bisect(self.cum_weights, rng.random() * self.cum_weights[-1])
+
+
+_catalogs: dict[tuple, Catalog] = {}
+
+
+def get_catalog(chunk: OrderChunk) -> Catalog:
+    """
+    Loads the catalog once per run and process.
+    """
+    key = (chunk.seed, chunk.now)
+    if key not in _catalogs:
+        _catalogs.clear()
+        _catalogs[key] = Catalog()
+    return _catalogs[key]
+
+
+def generate_order_chunk(chunk: OrderChunk) -> tuple[int, int, int]:
+    """
+    Bulk-creates a chunk of orders with their items and payments in one
+    transaction. Signals are not sent, so derived tables must be rebuilt
+    afterwards.
+
+    :param chunk: The chunk to generate.
+    :return: The number of created orders, items and payments.
+    """
+    catalog = get_catalog(chunk)
+    if not catalog.ids:
+        return 0, 0, 0
+    rng = random.Random(f"{chunk.seed}:orders:{chunk.number}")
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    payment_types, payment_weights = zip(*PAYMENT_TYPE_WEIGHTS.items())
+
+    orders, order_items, order_payments = [], [], []
+    for _ in range(chunk.size):
+        created = chunk.now - datetime.timedelta(seconds=rng.uniform(0, chunk.days * 86400))
+        status = rng.choices(statuses, status_weights)[0]
+        quantities: dict[int, int] = {}
+        items_count = min(
+            1 + int(rng.expovariate(1 / (MEAN_ITEMS_PER_ORDER - 1))), MAX_ITEMS_PER_ORDER
+        )
+        for _ in range(items_count):
+            index = catalog.pick(rng)
+            quantities[index] = quantities.get(index, 0) + rng.choice((1, 1, 1, 2, 3))
+        items = [
+            OrderItem(
+                product_id=catalog.ids[index],
+                quantity=quantity,
+                unit_price=catalog.prices[index],
+                line_total=catalog.prices[index] * quantity,
+            )
+            for index, quantity in quantities.items()
+        ]
+        order = Order(
+            total_cost=sum(item.line_total for item in items),
+            status=status,
+            create_dt=created,
+        )
+        payments = []
+        if rng.random() < FAILED_PAYMENT_SHARE:
+            payments.append(
+                Payment(
+                    cost=order.total_cost,
+                    status=Payment.STATUS_CHOICES["FAILED"],
+                    payment_type=rng.choices(payment_types, payment_weights)[0],
+                )
+            )
+        if status != Order.STATUS_CHOICES["PENDING"]:
+            order.payment_dt = created + datetime.timedelta(minutes=rng.uniform(1, 120))
+            payments.append(
+                Payment(
+                    cost=order.total_cost,
+                    status=Payment.STATUS_CHOICES["COMPLETED"],
+                    payment_type=rng.choices(payment_types, payment_weights)[0],
+                )
+            )
+        if status == Order.STATUS_CHOICES["CONFIRMED"]:
+            order.confirm_dt = order.payment_dt + datetime.timedelta(hours=rng.uniform(1, 48))
+        orders.append(order)
+        order_items.append(items)
+        order_payments.append(payments)
+
+    with transaction.atomic(), preserved_create_dt():
+        Order.objects.bulk_create(orders)
+        for order, items, payments in zip(orders, order_items, order_payments):
+            for item in itertools.chain(items, payments):
+                item.order = order
+        items = list(itertools.chain.from_iterable(order_items))
+        payments = list(itertools.chain.from_iterable(order_payments))
+        OrderItem.objects.bulk_create(items)
+        Payment.objects.bulk_create(payments)
+    return len(orders), len(items), len(payments)
+
+
+def order_chunks(
+    count: int, chunk_size: int, seed: int, days: int, now: datetime.datetime
+) -> list[OrderChunk]:
+    """
+    Splits the orders to generate into chunks.
+
+    :param count: The total number of orders.
+    :param chunk_size: The number of orders per chunk.
+    :param seed: The seed of the run.
+    :param days: The orders are spread over this many days.
+    :param now: The end of the generated period.
+    :return: The chunks in order.
+    """
+    return [
+        OrderChunk(seed, number, min(chunk_size, count - start), days, now)
+        for number, start in enumerate(range(0, count, chunk_size))
+    ]
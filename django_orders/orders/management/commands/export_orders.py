@@ -0,0 +1,103 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.exports import OrderExporter
+from services.exports import EXPORT_FORMATS, day_bounds
+
+
+def parse_date(value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams orders with their items as CSV or NDJSON. Orders are read "
+        "in chunks with a server-side cursor and written incrementally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=sorted(EXPORT_FORMATS),
+            default="csv",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--date-from",
+            type=parse_date,
+            help="First day of order creation to export (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=parse_date,
+            help="Last day of order creation to export, inclusive (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            help="Export only orders with a greater ID, to resume an export.",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to. Defaults to stdout.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of orders fetched per round trip.",
+        )
+        parser.add_argument(
+            "--report-every",
+            type=int,
+            default=100_000,
+            help="Report throughput after this many lines. 0 disables progress.",
+        )
+
+    def handle(self, *args, **options):
+        created_from, created_to = day_bounds(options["date_from"], options["date_to"])
+        exporter = OrderExporter(
+            options["format"],
+            created_from=created_from,
+            created_to=created_to,
+            after_id=options["after_id"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as stream:
+                self.export(exporter, stream.write, options["report_every"])
+        else:
+            self.export(
+                exporter,
+                lambda line: self.stdout.write(line, ending=""),
+                options["report_every"],
+            )
+
+    def export(self, exporter: OrderExporter, write, report_every: int) -> int:
+        """
+        Writes the export line by line and reports throughput to stderr.
+
+        :param exporter: The exporter producing the lines.
+        :param write: A callable writing one line to the output.
+        :param report_every: Report after this many lines, 0 to disable.
+        :return: The number of lines written.
+        """
+        started = time.perf_counter()
+        written = 0
+        for line in exporter.iter_lines():
+            write(line)
+            written += 1
+            if report_every and written % report_every == 0:
+                self.report(written, started)
+        self.report(written, started)
+        return written
+
+    def report(self, written: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        rate = written / elapsed if elapsed else 0
+        self.stderr.write(f"{written} lines in {elapsed:.1f} s ({rate:,.0f} lines/s)")
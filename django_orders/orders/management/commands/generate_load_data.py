@@ -0,0 +1,118 @@
+import multiprocessing
+import time
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from orders.load_data import generate_order_chunk, generate_products, order_chunks
+from services.db_connections import close_pools
+
+
+def init_worker() -> None:
+    """
+    Prepares a worker process: configures Django when the process was
+    spawned and drops connections inherited from the parent.
+    """
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates synthetic products, orders, order items and payments "
+        "with realistic distributions for scale testing, then rebuilds the "
+        "analytics rollups and product sales counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=10_000,
+            help="Number of products to create.",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=100_000,
+            help="Number of orders to create.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread order creation dates over this many past days.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generators. Equal seeds give equal data.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of orders created per transaction.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes creating orders. Ignored on SQLite.",
+        )
+        parser.add_argument(
+            "--skip-derived",
+            action="store_true",
+            help="Do not rebuild the rollups and sales counters afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be positive.")
+        workers = options["workers"]
+        if workers > 1 and connection.vendor == "sqlite":
+            self.stderr.write("SQLite allows a single writer, using one worker.")
+            workers = 1
+
+        started = time.perf_counter()
+        products = generate_products(
+            options["products"], options["seed"], options["chunk_size"]
+        )
+        self.stdout.write(f"Created {products} products.")
+
+        chunks = order_chunks(
+            options["orders"],
+            options["chunk_size"],
+            options["seed"],
+            options["days"],
+            timezone.now(),
+        )
+        totals = [0, 0, 0]
+        if workers == 1:
+            results = map(generate_order_chunk, chunks)
+            self.report(results, totals)
+        else:
+            # Forked workers must not inherit open connections or pools.
+            close_pools()
+            with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+                self.report(pool.imap_unordered(generate_order_chunk, chunks), totals)
+        orders, items, payments = totals
+        self.stdout.write(
+            f"Created {orders} orders with {items} items and {payments} payments "
+            f"in {time.perf_counter() - started:.1f}s."
+        )
+
+        if not options["skip_derived"]:
+            call_command("rebuild_rollups", stdout=self.stdout)
+            call_command("repair_sales_counters", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Load data generated."))
+
+    def report(self, results, totals: list[int]) -> None:
+        for result in results:
+            for index, count in enumerate(result):
+                totals[index] += count
+            self.stderr.write(f"{totals[0]} orders created")
@@ -0,0 +1,51 @@
+from django.db import migrations, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_price_snapshot(apps, schema_editor):
+    """
+    Fills `unit_price` and `line_total` of existing order items in batches,
+    each in its own transaction.
+
+    The unit price is the product price that was valid when the order was
+    created, or the current product price if there is no history for it.
+    """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    ProductPriceHistory = apps.get_model("products", "ProductPriceHistory")
+    historical_price = Subquery(
+        ProductPriceHistory.objects.filter(
+            product=OuterRef("product_id"), valid_from__lte=OuterRef("order__create_dt")
+        )
+        .order_by("-valid_from")
+        .values("price")[:1]
+    )
+    pending = OrderItem.objects.filter(unit_price__isnull=True).annotate(
+        snapshot_price=Coalesce(historical_price, F("product__price"))
+    )
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(pending.filter(pk__gt=last_id).order_by("pk")[:BATCH_SIZE])
+            if not batch:
+                break
+            for item in batch:
+                item.unit_price = item.snapshot_price
+                item.line_total = item.snapshot_price * item.quantity
+            OrderItem.objects.bulk_update(batch, ["unit_price", "line_total"])
+        last_id = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('orders', '0002_orderitem_price_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_price_snapshot, migrations.RunPython.noop),
+    ]
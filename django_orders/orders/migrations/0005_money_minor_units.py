@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+import products.fields
+
+
+def to_minor(field_name: str) -> Cast:
+    return Cast(Round(F(field_name) * 100), BigIntegerField())
+
+
+def to_major(field_name: str) -> ExpressionWrapper:
+    # Multiplied by a decimal, as SQLite divides integers by integers
+    # with truncation.
+    return ExpressionWrapper(
+        F(field_name) * Value(Decimal("0.01")),
+        output_field=DecimalField(max_digits=25, decimal_places=2),
+    )
+
+
+def convert_to_minor_units(apps, schema_editor):
+    """
+    Copies amounts in major units into the new minor-unit columns.
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Order.objects.update(total_cost_minor=to_minor("total_cost"))
+    OrderItem.objects.update(
+        unit_price_minor=to_minor("unit_price"),
+        line_total_minor=to_minor("line_total"),
+    )
+
+
+def convert_to_major_units(apps, schema_editor):
+    """
+    Copies amounts in minor units back into the decimal columns.
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Order.objects.update(total_cost=to_major("total_cost_minor"))
+    OrderItem.objects.update(
+        unit_price=to_major("unit_price_minor"),
+        line_total=to_major("line_total_minor"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_alter_orderitem_price_snapshot'),
+        ('products', '0004_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_cost_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='line_total_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        # Nullable while converting, so that reversing the migration can
+        # add the columns back before filling them.
+        migrations.AlterField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True, verbose_name='Цена за единицу'),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True, verbose_name='Сумма позиции'),
+        ),
+        migrations.RunPython(convert_to_minor_units, convert_to_major_units),
+        migrations.RemoveField(
+            model_name='order',
+            name='total_cost',
+        ),
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='unit_price',
+        ),
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='line_total',
+        ),
+        migrations.RenameField(
+            model_name='order',
+            old_name='total_cost_minor',
+            new_name='total_cost',
+        ),
+        migrations.RenameField(
+            model_name='orderitem',
+            old_name='unit_price_minor',
+            new_name='unit_price',
+        ),
+        migrations.RenameField(
+            model_name='orderitem',
+            old_name='line_total_minor',
+            new_name='line_total',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='total_cost',
+            field=products.fields.MoneyField(default=0, verbose_name='Итоговая сумма'),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='unit_price',
+            field=products.fields.MoneyField(verbose_name='Цена за единицу'),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='line_total',
+            field=products.fields.MoneyField(verbose_name='Сумма позиции'),
+        ),
+    ]
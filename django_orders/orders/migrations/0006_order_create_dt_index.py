@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['create_dt'], name='order_create_dt_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_create_dt_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'confirm_dt'], name='order_status_confirm_dt_idx'),
+        ),
+    ]
@@ -2,9 +2,12 @@ import datetime
 
 from django.db import models
 from django.db.models import QuerySet
-from django.db.models import Sum, F
+from django.db.models import Sum
 
+from django_orders.tracing import traced
+from products import MoneyField
 from products.models import Product
+from products.sales import record_sales
 
 
 class Order(models.Model):
@@ -12,7 +15,7 @@ class Order(models.Model):
     Represents an order with products, status, and costs.
 
     Attributes:
-    - total_cost: The total cost of the order.
+    - total_cost: The total cost of the order in minor units.
     - status: The current status of the order.
     - create_dt: The date and time the order was created.
     - confirm_dt: The date and time the order was confirmed.
@@ -24,9 +27,7 @@ class Order(models.Model):
         "CONFIRMED": "Подтвержден",
     }
 
-    total_cost = models.DecimalField(
-        max_digits=10, decimal_places=2, default=0.00, verbose_name="Итоговая сумма"
-    )
+    total_cost = MoneyField(default=0, verbose_name="Итоговая сумма")
     status = models.CharField(
         max_length=20, default=STATUS_CHOICES["PENDING"], verbose_name="Статус"
     )
@@ -52,20 +53,25 @@ class Order(models.Model):
 
     def update_total_cost(self):
         """
-        Updates the total cost of the order by summing the prices
-        of the related products and their quantities.
+        Updates the total cost of the order by summing the line totals
+        of the related order items.
+
+        Line totals are snapshotted when the items are saved, so the
+        calculation does not join products and is not affected by later
+        price changes. Inside a transaction the update is deferred to the
+        commit and done once for all changed orders, see `orders.totals`.
 
         :return: None
         """
-        cost = self.orderitem.annotate(
-            price=F("product__price") * F("quantity")
-        ).aggregate(total_price=Sum("price"))
-        self.total_cost = cost["total_price"] or 0
-        self.save()
+        from .totals import mark_dirty
+
+        mark_dirty(self, using=self._state.db or "default")
 
+    @traced("order.update_payment_status")
     def update_payment_status(self) -> None:
         """
-        Updates the status of the order to 'Paid' after payment.
+        Updates the status of the order to 'Paid' after payment and
+        records the sales of its products.
 
         :return: None
         """
@@ -73,6 +79,15 @@ class Order(models.Model):
         if total_paid["total"] == self.total_cost:
             self.status = self.STATUS_CHOICES["PAID"]
             self.save()
+            self.record_sales()
+
+    def record_sales(self) -> None:
+        """
+        Adds the items of the paid order to the product sales counters.
+
+        :return: None
+        """
+        record_sales(self.orderitem.values_list("product_id", "quantity", "line_total"))
 
     def update_confirmation_status(self) -> None:
         """
@@ -96,6 +111,11 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
+        indexes = [
+            models.Index(fields=["create_dt"], name="order_create_dt_idx"),
+            models.Index(fields=["status", "confirm_dt"], name="order_status_confirm_dt_idx"),
+            models.Index(fields=["status", "-id"], name="order_status_id_idx"),
+        ]
 
 
 class OrderItem(models.Model):
@@ -106,6 +126,9 @@ class OrderItem(models.Model):
     - order: The related order.
     - product: The product included in the order.
     - quantity: The quantity of the product in the order.
+    - unit_price: The price of the product when it was added to the order,
+      in minor units.
+    - line_total: The unit price multiplied by the quantity.
     """
 
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="orderitem")
@@ -113,7 +136,35 @@ class OrderItem(models.Model):
         Product, on_delete=models.PROTECT, related_name="product"
     )
     quantity = models.PositiveIntegerField(default=1)
+    unit_price = MoneyField(verbose_name="Цена за единицу")
+    line_total = MoneyField(verbose_name="Сумма позиции")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remembers the loaded product so that a product change can be
+        detected on save without an extra query.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_product_id = instance.__dict__.get("product_id")
+        return instance
 
+    def capture_price(self) -> None:
+        """
+        Snapshots the product price for a new item or an item whose
+        product was changed, and recalculates the line total.
+
+        :return: None
+        """
+        if self.product_id is None:
+            return
+        product_changed = getattr(self, "_loaded_product_id", None) != self.product_id
+        if self.unit_price is None or product_changed:
+            self.unit_price = self.product.price
+            self._loaded_product_id = self.product_id
+        self.line_total = self.unit_price * self.quantity
+
+    @traced("order_item.save")
     def save(
         self,
         force_insert=False,
@@ -130,6 +181,7 @@ class OrderItem(models.Model):
         :param update_fields: Fields to update.
         :return: None
         """
+        self.capture_price()
         super().save()
         self.order.update_total_cost()
 
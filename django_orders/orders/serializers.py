@@ -1,24 +1,60 @@
+from django.db import transaction
 from rest_framework import serializers
 
+from django_orders.tracing import traced
+from products.cache import cached_products
 from products.models import Product
+from products.serializers import MoneyField
 from .models import Order, OrderItem
 
 
+def product_ids_of(items: list) -> set[int]:
+    """
+    Collects the valid product IDs of the submitted order items.
+
+    :param items: The raw order items.
+    :return: The product IDs.
+    """
+    product_ids = set()
+    for item in items:
+        try:
+            product_ids.add(int(item["product"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return product_ids
+
+
+class ProductField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks products up in the batch loaded by the parent serializer, so
+    validating an order runs one product query regardless of its size.
+    """
+
+    def to_internal_value(self, data):
+        products = self.context.get("products")
+        if products is None:
+            return super().to_internal_value(data)
+        try:
+            return products[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(
-        queryset=Product.objects.all(), required=True
-    )
+    product = ProductField(queryset=Product.objects.all(), required=True)
     quantity = serializers.IntegerField(required=True)
+    unit_price = MoneyField(read_only=True)
+    line_total = MoneyField(read_only=True)
 
     class Meta:
         model = OrderItem
-        fields = ["product", "quantity"]
+        fields = ["product", "quantity", "unit_price", "line_total"]
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    total_cost = serializers.DecimalField(
-        max_digits=25, decimal_places=2, read_only=True
-    )
+    total_cost = MoneyField(read_only=True)
     create_dt = serializers.DateTimeField(read_only=True)
     confirm_dt = serializers.DateTimeField(read_only=True)
     status = serializers.CharField(read_only=True)
@@ -29,17 +65,67 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ["id", "total_cost", "status", "create_dt", "confirm_dt", "orderitem"]
 
+    @traced("order_serializer.validate")
+    def is_valid(self, *, raise_exception=False) -> bool:
+        return super().is_valid(raise_exception=raise_exception)
+
     def check_products(self, products):
         if not products:
             raise serializers.ValidationError("The order must contain at least one product.")
 
+    def to_internal_value(self, data):
+        """
+        Loads all products of the order before the items are validated,
+        from the product cache and at most one query, unless the caller
+        already passed them in the `products` context.
+        """
+        items = data.get("orderitem") if hasattr(data, "get") else None
+        if isinstance(items, list) and "products" not in self.context:
+            self.context["products"] = cached_products(product_ids_of(items))
+        return super().to_internal_value(data)
+
+    def load_prices(self, items: list[OrderItem]) -> None:
+        """
+        Reads the current prices of the ordered products in one query.
+        The products were validated against the product cache, which
+        other workers may not have invalidated yet, so the price charged
+        is always read from the database.
+
+        :param items: The new order items.
+        :return: None
+        """
+        prices = dict(
+            Product.objects.filter(pk__in={item.product_id for item in items}).values_list(
+                "id", "price"
+            )
+        )
+        for item in items:
+            if item.product_id not in prices:
+                message = ProductField.default_error_messages["does_not_exist"]
+                raise serializers.ValidationError(
+                    {"orderitem": [message.format(pk_value=item.product_id)]}
+                )
+            item.product.price = prices[item.product_id]
+
+    @traced("order_serializer.create")
+    @transaction.atomic
     def create(self, validated_data):
         products_list = validated_data.pop("orderitem")
 
         self.check_products(products_list)
-        order = Order.objects.create(**validated_data)
-        for product in products_list:
-            OrderItem.objects.create(
-                order=order, product=product["product"], quantity=product["quantity"]
-            )
+        items = [
+            OrderItem(product=product["product"], quantity=product["quantity"])
+            for product in products_list
+        ]
+        self.load_prices(items)
+        for item in items:
+            item.capture_price()
+        # The total is known before the items are written, so the order
+        # is inserted with it instead of being recomputed on commit.
+        order = Order.objects.create(
+            total_cost=sum(item.line_total for item in items), **validated_data
+        )
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
         return order
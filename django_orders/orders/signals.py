@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after the totals of orders were recomputed with a bulk UPDATE,
+# which sends no `post_save`. Arguments: `orders`, the updated orders
+# reloaded from the database, and `using`, the database alias.
+order_totals_updated = Signal()
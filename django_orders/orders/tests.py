@@ -1,12 +1,24 @@
+import csv
+import io
+import json
+
 import pytest
+from asgiref.sync import async_to_sync
 
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
 from django.db.utils import IntegrityError
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
+from analytics.models import DailyRollup
 from conftest import _not_existing as nex
 from products.models import Product
 from payments.models import Payment
 from .models import Order, OrderItem
+from .signals import order_totals_updated
 
 
 @pytest.mark.django_db
@@ -142,6 +154,25 @@ class TestOrder:
         order.save()
         assert order.status == order.STATUS_CHOICES["CONFIRMED"]
 
+    def test_update_total_cost_ignores_price_change(self):
+        """Test that recalculating the total of an order ignores later price changes."""
+        order: Order = Order.objects.get(pk=1)
+        Product.objects.filter(pk=1).update(price=999)
+        order.update_total_cost()
+        assert order.total_cost == 190000
+
+    def test_orderitem_price_snapshot(self, django_capture_on_commit_callbacks):
+        """Test that a new OrderItem captures the product price and line total."""
+        order: Order = Order.objects.get(pk=1)
+        product: Product = Product.objects.get(pk=2)
+        with django_capture_on_commit_callbacks(execute=True):
+            order_item: OrderItem = OrderItem.objects.create(
+                order=order, product=product, quantity=4
+            )
+        assert order_item.unit_price == product.price
+        assert order_item.line_total == product.price * 4
+        assert order.total_cost == 190000 + product.price * 4
+
     @pytest.mark.usefixtures("create_mock_image")
     def test_orders_relationship(self, create_mock_image):
         """
@@ -159,13 +190,13 @@ class TestOrder:
             name="new_test_product_1",
             picture=create_mock_image,
             content="test info 1",
-            price=1000,
+            price=100000,
         )
         product_2: Product = Product.objects.create(
             name="new_test_product_2",
             picture=create_mock_image,
             content="test info 2",
-            price=2500.50,
+            price=250050,
         )
 
         OrderItem.objects.create(order=new_order, product=product_1, quantity=5)
@@ -174,3 +205,361 @@ class TestOrder:
         new_order_products: Product = new_order.get_related_products()
         assert new_order_products[0].id == 4
         assert new_order_products[1].id == 5
+
+
+@pytest.mark.django_db
+class TestOrderTotals:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        """Load an order with two items."""
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+
+    def test_totals_coalesced_on_commit(self, django_capture_on_commit_callbacks):
+        """Test that item changes in a transaction update each order total once on commit."""
+        order: Order = Order.objects.get(pk=1)
+        product: Product = Product.objects.get(pk=2)
+        with CaptureQueriesContext(connection) as queries:
+            with django_capture_on_commit_callbacks() as callbacks:
+                for _ in range(3):
+                    OrderItem.objects.create(order=order, product=product, quantity=1)
+                assert order.total_cost == 190000
+            for callback in callbacks:
+                callback()
+        updates = [query for query in queries if query["sql"].startswith('UPDATE "orders_order"')]
+        assert len(updates) == 1
+        assert order.total_cost == 190000 + product.price * 3
+        assert Order.objects.get(pk=1).total_cost == order.total_cost
+
+    def test_totals_signal(self, django_capture_on_commit_callbacks):
+        """Test that the recomputed orders are sent with `order_totals_updated`."""
+        received = []
+
+        def receiver(sender, orders, **kwargs):
+            received.extend(orders)
+
+        order_totals_updated.connect(receiver)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                OrderItem.objects.get(pk=1).delete()
+        finally:
+            order_totals_updated.disconnect(receiver)
+        [order] = received
+        assert order.pk == 1
+        assert order.total_cost == Order.objects.get(pk=1).total_cost < 190000
+
+    def test_totals_after_savepoint_rollback(self, django_capture_on_commit_callbacks):
+        """Test that an order marked in a rolled back savepoint is still recomputed."""
+        order: Order = Order.objects.get(pk=1)
+        product: Product = Product.objects.get(pk=2)
+        with django_capture_on_commit_callbacks(execute=True):
+            OrderItem.objects.create(order=order, product=product, quantity=1)
+            try:
+                with transaction.atomic():
+                    OrderItem.objects.create(order=order, product=product, quantity=1)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        assert Order.objects.get(pk=1).total_cost == 190000 + product.price
+
+    def test_totals_after_rollback_dropped(self, django_capture_on_commit_callbacks):
+        """Test that orders marked in a rolled back transaction are not flushed later."""
+        product: Product = Product.objects.get(pk=2)
+        try:
+            with transaction.atomic():
+                OrderItem.objects.create(order_id=1, product=product, quantity=1)
+                raise IntegrityError
+        except IntegrityError:
+            pass
+        with django_capture_on_commit_callbacks() as callbacks:
+            OrderItem.objects.create(order_id=2, product=product, quantity=1)
+        assert [order.pk for order in callbacks[0]()] == [2]
+
+
+@pytest.mark.django_db
+class TestExportOrders:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        """Load required fixtures for export tests."""
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+
+    def export(self, *args) -> str:
+        """Run the export command and return what it wrote to stdout."""
+        stdout = io.StringIO()
+        call_command("export_orders", *args, stdout=stdout, stderr=io.StringIO())
+        return stdout.getvalue()
+
+    def test_export_csv(self):
+        """Test exporting orders as CSV with one row per order item."""
+        rows = list(csv.DictReader(io.StringIO(self.export("--format", "csv"))))
+        assert [(row["order_id"], row["product_id"]) for row in rows] == [
+            ("1", "1"),
+            ("1", "2"),
+            ("2", "1"),
+        ]
+        assert rows[1]["line_total"] == "1500.00"
+
+    def test_export_ndjson_date_range(self):
+        """Test exporting the orders of one day as NDJSON with nested items."""
+        output = self.export("--format", "ndjson", "--date-from", "2024-10-11", "--date-to", "2024-10-11")
+        [record] = [json.loads(line) for line in output.splitlines()]
+        assert record["id"] == 2
+        assert record["total_cost"] == "1000.00"
+        assert record["items"] == [
+            {"product_id": 1, "quantity": 5, "unit_price": "200.00", "line_total": "1000.00"}
+        ]
+
+    def test_export_resume_after_id(self):
+        """Test resuming an export after the last exported order."""
+        output = self.export("--format", "ndjson", "--after-id", "1")
+        assert [json.loads(line)["id"] for line in output.splitlines()] == [2]
+
+    def test_export_to_file(self, tmp_path):
+        """Test writing the export to a file."""
+        path = tmp_path / "orders.csv"
+        assert self.export("--output", str(path)) == ""
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+
+    def test_export_invalid_date_error(self):
+        """Test that an invalid date is rejected."""
+        with pytest.raises(CommandError):
+            self.export("--date-from", "2024-13-01")
+
+
+@pytest.mark.django_db
+class TestOrderExportEndpoint:
+    url = "/api/v1/export/orders/"
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        """Load required fixtures for export endpoint tests."""
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+
+    def test_stream_ndjson(self, admin_client):
+        """Test that orders are streamed as NDJSON and can be resumed by ID."""
+        response = admin_client.get(self.url, {"export_format": "ndjson", "after_id": 1})
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [2]
+
+    def test_stream_csv(self, admin_client):
+        """Test that orders are streamed as CSV with a header row."""
+        response = admin_client.get(self.url, {"date_to": "2024-10-10"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith("order_id,status")
+        assert len(lines) == 3
+
+    def test_stream_async(self, admin_user):
+        """Test that under ASGI the export is streamed block by block."""
+        client = AsyncClient()
+        client.force_login(admin_user)
+
+        async def scenario():
+            response = await client.get(self.url, {"export_format": "ndjson"})
+            chunks = [chunk async for chunk in response.streaming_content]
+            return response, chunks
+
+        response, chunks = async_to_sync(scenario)()
+        assert response.status_code == 200
+        assert response.is_async
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+    def test_invalid_params_error(self, admin_client):
+        """Test that an unknown format or a bad cursor is rejected."""
+        assert admin_client.get(self.url, {"export_format": "xml"}).status_code == 400
+        assert admin_client.get(self.url, {"after_id": "-1"}).status_code == 400
+
+    def test_export_requires_admin(self, client):
+        """Test that the export endpoint is not public."""
+        assert client.get(self.url).status_code == 403
+
+
+@pytest.mark.django_db
+class TestOrderQueryBudget:
+    url = "/api/v1/orders/"
+    sizes = (1, 10, 50)
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        """Load required fixtures for budget tests."""
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+
+    @staticmethod
+    def order_payload(size: int) -> dict:
+        return {
+            "orderitem": [
+                {"product": 1 + number % 2, "quantity": 1} for number in range(size)
+            ]
+        }
+
+    def test_create_order_budget(self, budget_client):
+        """Test that creating an order runs the same queries for any number of items."""
+        responses = budget_client.check_sizes(
+            "post",
+            self.url,
+            self.order_payload,
+            self.sizes,
+            content_type="application/json",
+        )
+        assert [response.status_code for response in responses] == [201] * 3
+        assert [len(response.json()["orderitem"]) for response in responses] == [1, 10, 50]
+        assert responses[-1].json()["total_cost"] == "17500.00"
+
+    def test_create_order_async_budget(self, budget_client):
+        """Test that the async endpoint runs the same queries for any number of items."""
+        responses = budget_client.check_sizes(
+            "post",
+            "/api/v2/orders/",
+            self.order_payload,
+            self.sizes,
+            content_type="application/json",
+        )
+        assert [response.status_code for response in responses] == [201] * 3
+        assert responses[-1].json()["total_cost"] == "17500.00"
+
+    def test_export_budget(self, admin_budget_client):
+        """Test that exporting orders stays within its budget."""
+        response = admin_budget_client.get("/api/v1/export/orders/", {"export_format": "ndjson"})
+        assert response.status_code == 200
+        assert len(b"".join(response.streaming_content).splitlines()) == 2
+
+    def test_create_order_unknown_product_error(self, client):
+        """Test that an unknown product is still rejected."""
+        response = client.post(
+            self.url,
+            {"orderitem": [{"product": nex, "quantity": 1}]},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert "orderitem" in response.json()
+
+    def test_admin_approve_budget(self, admin_budget_client, monkeypatch):
+        """Test that confirming an order in the admin stays within its budget."""
+        monkeypatch.setattr(
+            "orders.admin.OrderAdmin.request_to_external", staticmethod(lambda order: True)
+        )
+        response = admin_budget_client.get(
+            reverse("admin:approve", args=[2]), HTTP_REFERER="/admin/"
+        )
+        assert response.status_code == 302
+        assert Order.objects.get(pk=2).status == Order.STATUS_CHOICES["CONFIRMED"]
+
+    def test_admin_changelist_budget(self, admin_budget_client):
+        """Test that the order changelist stays within its budget."""
+        response = admin_budget_client.get(reverse("admin:orders_order_changelist"))
+        assert response.status_code == 200
+
+    def test_admin_changelist_filters(self, admin_client):
+        """Test that the changelist filters by status and creation date."""
+        url = reverse("admin:orders_order_changelist")
+        paid = Order.objects.filter(status=Order.STATUS_CHOICES["PAID"]).count()
+        response = admin_client.get(url, {"status": Order.STATUS_CHOICES["PAID"]})
+        assert response.status_code == 200
+        assert response.context["cl"].result_count == paid
+        response = admin_client.get(url, {"create_dt__gte": "2000-01-01 00:00:00+00:00"})
+        assert response.context["cl"].result_count == Order.objects.count()
+
+    def test_admin_changelist_shows_major_units(self, admin_client):
+        """Test that the changelist shows totals in major units."""
+        Order.objects.filter(pk=2).update(total_cost=190000)
+        response = admin_client.get(reverse("admin:orders_order_changelist"))
+        assert '<td class="field-total_cost_display">1900.00</td>' in response.content.decode()
+
+    def test_admin_change_shows_major_units(self, admin_client):
+        """Test that the order page shows the total in major units."""
+        Order.objects.filter(pk=2).update(total_cost=190000)
+        response = admin_client.get(reverse("admin:orders_order_change", args=[2]))
+        assert response.status_code == 200
+        assert "1900.00" in response.content.decode()
+        assert "190000" not in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestGenerateLoadData:
+    @staticmethod
+    def generate(*args: str) -> None:
+        call_command(
+            "generate_load_data",
+            "--products", "20",
+            "--orders", "60",
+            "--chunk-size", "25",
+            *args,
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+
+    @staticmethod
+    def snapshot() -> list[tuple]:
+        return list(
+            Order.objects.order_by("pk").values_list(
+                "total_cost", "status", "create_dt__date", "orderitem__quantity"
+            )
+        )
+
+    def test_generate(self):
+        """Test that consistent orders, items and payments are created."""
+        self.generate("--seed", "1")
+        assert Product.objects.count() == 20
+        assert Order.objects.count() == 60
+        for order in Order.objects.prefetch_related("orderitem", "payment"):
+            items = list(order.orderitem.all())
+            assert items
+            assert order.total_cost == sum(item.line_total for item in items)
+            completed = [
+                payment
+                for payment in order.payment.all()
+                if payment.status == Payment.STATUS_CHOICES["COMPLETED"]
+            ]
+            assert len(completed) == (order.status != Order.STATUS_CHOICES["PENDING"])
+        assert sum(DailyRollup.objects.values_list("orders_count", flat=True)) == 60
+
+    def test_generate_reproducible(self):
+        """Test that the same seed generates the same data."""
+        self.generate("--seed", "7", "--skip-derived")
+        first = self.snapshot()
+        Payment.objects.all().delete()
+        Order.objects.all().delete()
+        Product.objects.all().delete()
+        self.generate("--seed", "7", "--skip-derived")
+        assert self.snapshot() == first
+
+
+@pytest.mark.django_db
+class TestAsyncOrderEndpoint:
+    url = "/api/v2/orders/"
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        """Load required fixtures for the async endpoint tests."""
+        load_fixture("products")
+
+    def post(self, data, **kwargs):
+        return async_to_sync(AsyncClient().post)(
+            self.url, data, content_type="application/json", **kwargs
+        )
+
+    def test_create_order(self):
+        """Test that an order is created with price snapshots."""
+        response = self.post(
+            {"orderitem": [{"product": 1, "quantity": 2}, {"product": 2, "quantity": 1}]}
+        )
+        assert response.status_code == 201
+        body = response.json()
+        assert body["total_cost"] == "900.00"
+        assert Order.objects.get(pk=body["id"]).orderitem.count() == 2
+
+    def test_create_order_errors(self):
+        """Test that unknown products, empty orders and bad JSON are rejected."""
+        assert self.post({"orderitem": [{"product": nex, "quantity": 1}]}).status_code == 400
+        assert self.post({"orderitem": []}).status_code == 400
+        assert self.post("{").status_code == 400
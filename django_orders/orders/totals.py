@@ -0,0 +1,97 @@
+"""
+Coalesced recomputation of order totals.
+
+Saving or deleting an order item only marks its order dirty. The totals
+of all orders marked in a transaction are recomputed when it commits,
+each exactly once, with a single UPDATE, and `order_totals_updated` is
+sent for them. Outside of a transaction the total is recomputed at once.
+
+Inside the transaction the stored totals of dirty orders are stale.
+Orders marked in a rolled back transaction are dropped when the next
+order is marked, so they are not recomputed by a later transaction.
+"""
+
+from functools import partial
+
+from asgiref.local import Local
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from django_orders.tracing import traced
+from .models import Order, OrderItem
+from .signals import order_totals_updated
+
+# Dirty orders by database alias, then by ID, and the flush callbacks
+# registered for them. Scoped like the database connections: per thread,
+# or per coroutine under ASGI.
+_pending = Local()
+
+
+def mark_dirty(order: Order, using: str = "default") -> None:
+    """
+    Schedules the recomputation of an order total on commit. The total of
+    the passed instance is refreshed too.
+
+    :param order: The order whose items changed.
+    :param using: The database alias.
+    :return: None
+    """
+    if not hasattr(_pending, "orders"):
+        _pending.orders = {}
+        _pending.callbacks = {}
+    discard_rolled_back(using)
+    _pending.orders.setdefault(using, {}).setdefault(order.pk, []).append(order)
+    # One callback per mark: a callback registered in a rolled back
+    # savepoint is dropped, the flush of the others covers its order.
+    callback = partial(flush_totals, using)
+    _pending.callbacks.setdefault(using, set()).add(callback)
+    transaction.on_commit(callback, using=using)
+
+
+def discard_rolled_back(using: str) -> None:
+    """
+    Drops the dirty orders of a rolled back transaction, recognized by
+    none of their flush callbacks being registered any more.
+
+    :param using: The database alias.
+    :return: None
+    """
+    callbacks = _pending.callbacks.get(using)
+    if not callbacks:
+        return
+    registered = transaction.get_connection(using).run_on_commit
+    # The latest callback is usually ours, so the search stops early.
+    if not any(func in callbacks for _, func, _ in reversed(registered)):
+        _pending.orders.pop(using, None)
+        _pending.callbacks.pop(using, None)
+
+
+@traced("order.flush_totals")
+def flush_totals(using: str = "default") -> list[Order]:
+    """
+    Recomputes the totals of all dirty orders with one UPDATE. Later
+    callbacks of the same transaction find nothing left to do.
+
+    :param using: The database alias.
+    :return: The updated orders.
+    """
+    dirty = getattr(_pending, "orders", {}).pop(using, None)
+    if not dirty:
+        return []
+    _pending.callbacks.pop(using, None)
+    totals = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum("line_total"))
+        .values("total")
+    )
+    orders = Order.objects.using(using).filter(pk__in=list(dirty))
+    orders.update(total_cost=Coalesce(Subquery(totals), 0))
+    updated = list(orders)
+    for order in updated:
+        for instance in dirty[order.pk]:
+            instance.total_cost = order.total_cost
+    order_totals_updated.send(sender=Order, orders=updated, using=using)
+    return updated
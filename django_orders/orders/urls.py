@@ -1,5 +1,10 @@
 from django.urls import path, include
 
 from .routers import router
+from .views import OrderExportView, create_order
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("api/v2/orders/", create_order, name="order-create-async"),
+    path("api/v1/export/orders/", OrderExportView.as_view(), name="export-orders"),
+    path("", include(router.urls)),
+]
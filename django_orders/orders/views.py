@@ -1,10 +1,50 @@
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.viewsets import ModelViewSet
 
+from products.cache import acached_products
+from services.async_api import bad_request, json_response, read_json, save_serializer
+from services.exports import BaseExportView
+from services.throttling import TokenBucketThrottle, throttle
+from .exports import OrderExporter
 from .models import Order
-from .serializers import OrderSerializer
+from .serializers import OrderSerializer, product_ids_of
 
 
 class OrderViewSet(ModelViewSet):
     http_method_names = ["post"]
     queryset = Order.objects.all().order_by("create_dt").select_related("orderitem")
     serializer_class = OrderSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "orders"
+
+
+class OrderExportView(BaseExportView):
+    exporter_class = OrderExporter
+    filename = "orders"
+
+
+@csrf_exempt
+@require_POST
+@throttle("orders")
+async def create_order(request):
+    """
+    Creates an order like `OrderViewSet` without blocking the event loop
+    under ASGI. Products come from the product cache or the async ORM;
+    the order and its items are written in one transaction in a worker
+    thread.
+    """
+    try:
+        data = read_json(request)
+    except ValueError:
+        return bad_request("Invalid JSON.")
+    if not isinstance(data, dict):
+        return bad_request("Expected a JSON object.")
+    products = {}
+    if isinstance(data.get("orderitem"), list):
+        products = await acached_products(product_ids_of(data["orderitem"]))
+    serializer = OrderSerializer(data=data, context={"products": products})
+    order, body = await save_serializer(serializer)
+    if order is None:
+        return bad_request(body)
+    return json_response(body, status=201)
@@ -1,9 +1,33 @@
 from django.contrib import admin
 
+from orders.admin import StatusFilter
+from products import format_money
+from services.paginators import EstimatedCountPaginator
 from .models import Payment
 
 
+class PaymentStatusFilter(StatusFilter):
+    statuses = Payment.STATUS_CHOICES
+
+
 class PaymentAdmin(admin.ModelAdmin):
+    list_display = ("id", "order", "cost_display", "status", "payment_type")
+    list_filter = (PaymentStatusFilter,)
+    list_select_related = ("order",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    fields = ("order", "cost_display", "status", "payment_type")
+    readonly_fields = ("cost_display",)
+
+    @admin.display(description="Сумма", ordering="cost")
+    def cost_display(self, obj) -> str:
+        """
+        Shows the amount in major units instead of the stored minor units.
+        """
+        return format_money(obj.cost)
+
     def has_add_permission(self, request):
         return False
 
@@ -0,0 +1,73 @@
+import datetime
+from typing import Iterable
+
+from django.db.models import F, QuerySet
+
+from products import format_money
+from services.exports import BaseExporter
+from .models import Payment
+
+
+class PaymentExporter(BaseExporter):
+    """
+    Exports the payments of orders created in a date range, one row or
+    record per payment.
+    """
+
+    csv_header = [
+        "payment_id",
+        "order_id",
+        "order_create_dt",
+        "cost",
+        "status",
+        "payment_type",
+    ]
+
+    def __init__(
+        self,
+        export_format: str,
+        created_from: datetime.datetime | None = None,
+        created_to: datetime.datetime | None = None,
+        after_id: int | None = None,
+        chunk_size: int = 2000,
+    ) -> None:
+        """
+        Initializes the exporter.
+
+        :param export_format: "csv" or "ndjson".
+        :param created_from: Inclusive lower bound of the order creation time.
+        :param created_to: Exclusive upper bound of the order creation time.
+        :param after_id: Export only payments with a greater ID, to resume
+         an interrupted export.
+        :param chunk_size: The number of payments fetched per round trip.
+        """
+        super().__init__(export_format, chunk_size)
+        self.created_from = created_from
+        self.created_to = created_to
+        self.after_id = after_id
+
+    def get_queryset(self) -> QuerySet:
+        payments = Payment.objects.order_by("pk")
+        if self.created_from:
+            payments = payments.filter(order__create_dt__gte=self.created_from)
+        if self.created_to:
+            payments = payments.filter(order__create_dt__lt=self.created_to)
+        if self.after_id:
+            payments = payments.filter(pk__gt=self.after_id)
+        return payments.annotate(order_create_dt=F("order__create_dt")).values_list(
+            "pk", "order_id", "order_create_dt", "cost", "status", "payment_type"
+        )
+
+    def to_record(self, row: tuple) -> dict:
+        pk, order_id, order_create_dt, cost, status, payment_type = row
+        return {
+            "id": pk,
+            "order_id": order_id,
+            "order_create_dt": order_create_dt.isoformat() if order_create_dt else None,
+            "cost": format_money(cost),
+            "status": status,
+            "payment_type": payment_type,
+        }
+
+    def to_csv_rows(self, row: tuple) -> Iterable[list]:
+        yield list(self.to_record(row).values())
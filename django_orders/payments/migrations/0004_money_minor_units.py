@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+import products.fields
+
+
+def convert_to_minor_units(apps, schema_editor):
+    """
+    Copies payment amounts in major units into the new minor-unit column.
+    """
+    Payment = apps.get_model("payments", "Payment")
+    Payment.objects.update(
+        cost_minor=Cast(Round(F("cost") * 100), BigIntegerField())
+    )
+
+
+def convert_to_major_units(apps, schema_editor):
+    """
+    Copies payment amounts in minor units back into the decimal column.
+    """
+    Payment = apps.get_model("payments", "Payment")
+    # Multiplied by a decimal, as SQLite divides integers by integers
+    # with truncation.
+    Payment.objects.update(
+        cost=ExpressionWrapper(
+            F("cost_minor") * Value(Decimal("0.01")),
+            output_field=DecimalField(max_digits=25, decimal_places=2),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_alter_payment_payment_type'),
+        ('orders', '0005_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='payment',
+            options={'ordering': ['id'], 'verbose_name': 'Платеж', 'verbose_name_plural': 'Платежи'},
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='cost_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        migrations.RunPython(convert_to_minor_units, convert_to_major_units),
+        migrations.RemoveField(
+            model_name='payment',
+            name='cost',
+        ),
+        migrations.RenameField(
+            model_name='payment',
+            old_name='cost_minor',
+            new_name='cost',
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='cost',
+            field=products.fields.MoneyField(default=0, verbose_name='Сумма'),
+        ),
+    ]
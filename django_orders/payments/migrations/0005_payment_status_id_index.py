@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', '-id'], name='payment_status_id_idx'),
+        ),
+    ]
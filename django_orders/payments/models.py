@@ -1,11 +1,15 @@
+import asyncio
 import random
 import time
 
+from asgiref.sync import sync_to_async
 from django.db import models
 from django.db.models import ProtectedError, QuerySet
 from rest_framework.serializers import ValidationError
 
+from django_orders.tracing import traced
 from orders.models import Order
+from products import MoneyField
 
 
 class Payment(models.Model):
@@ -14,7 +18,7 @@ class Payment(models.Model):
 
     Attributes:
     - order: The order related to the payment.
-    - cost: The total payment amount.
+    - cost: The total payment amount in minor units.
     - status: The current status of the payment.
     - payment_type: The method used for the payment.
     """
@@ -33,9 +37,7 @@ class Payment(models.Model):
         null=True,
         verbose_name="Заказ",
     )
-    cost = models.DecimalField(
-        max_digits=25, decimal_places=2, default=0.00, verbose_name="Сумма"
-    )
+    cost = MoneyField(default=0, verbose_name="Сумма")
     status = models.CharField(
         max_length=20,
         default=STATUS_CHOICES["PENDING"],
@@ -79,6 +81,14 @@ class Payment(models.Model):
     def update_order_payment_date(self) -> None:
         self.order.update_payment_date()
 
+    @staticmethod
+    def processing_time() -> float:
+        """
+        Returns the simulated duration of payment processing in seconds.
+        """
+        return round(random.random(), 2)
+
+    @traced("payment.processing")
     def imitate_payment_processing(self) -> None:
         """
         Simulates payment processing by adding a delay and updating
@@ -88,10 +98,33 @@ class Payment(models.Model):
         after processing.
         :return: None
         """
-        processing_time = round(random.random(), 2)
-        time.sleep(processing_time)
+        time.sleep(self.processing_time())
         self.status = self.STATUS_CHOICES["COMPLETED"]
 
+    async def aprocess_payment(self) -> None:
+        """
+        Simulates payment processing without blocking the event loop and
+        completes the payment.
+
+        :return: None
+        """
+        if self.status != self.STATUS_CHOICES["PENDING"]:
+            return
+        await asyncio.sleep(self.processing_time())
+        self.status = self.STATUS_CHOICES["COMPLETED"]
+        await sync_to_async(self.complete_payment)()
+
+    @traced("payment.complete")
+    def complete_payment(self) -> None:
+        """
+        Stores the result of the processing and updates the order.
+
+        :return: None
+        """
+        super().save()
+        self.update_order_status()
+        self.update_order_payment_date()
+
     def check_if_new_payment(self) -> bool:
         if self.id is None:
             return True
@@ -104,16 +137,16 @@ class Payment(models.Model):
     def process_payment(self) -> None:
         if self.status == self.STATUS_CHOICES["PENDING"]:
             self.imitate_payment_processing()
-            super().save()
-            self.update_order_status()
-            self.update_order_payment_date()
+            self.complete_payment()
 
+    @traced("payment.save")
     def save(
         self,
         force_insert=False,
         force_update=False,
         using=None,
         update_field=None,
+        process=True,
     ) -> None:
         """
         Saves the payment and processes the payment lifecycle.
@@ -126,13 +159,16 @@ class Payment(models.Model):
         :param force_update: Whether to force an update.
         :param using: The database connection to use.
         :param update_field: Fields to update.
+        :param process: Whether to process a pending payment right away.
+         Pass False to process it later with `aprocess_payment`.
         :return: None
         """
         if self.check_if_new_payment():
             self.check_overpay()
         super().save()
         self.get_order_cost()
-        self.process_payment()
+        if process:
+            self.process_payment()
         self.check_voided()
 
     def delete(self, using=None, keep_parents=False):
@@ -147,3 +183,6 @@ class Payment(models.Model):
         verbose_name = "Платеж"
         verbose_name_plural = "Платежи"
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "-id"], name="payment_status_id_idx"),
+        ]
@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+
+from services.db_connections import release_connections
+from .models import Payment
+
+# Threads processing payments accepted by WSGI workers, which have no
+# event loop that outlives the request.
+PROCESSING_THREADS: int = 8
+
+_tasks: set[asyncio.Task] = set()
+_futures: set[Future] = set()
+_executor = ThreadPoolExecutor(
+    max_workers=PROCESSING_THREADS, thread_name_prefix="payment-processing"
+)
+
+
+def schedule_processing(payment: Payment) -> asyncio.Task:
+    """
+    Processes a pending payment in the background of the running event
+    loop. Only for ASGI workers: under WSGI the loop of an async view is
+    closed with the request, see `submit_processing`.
+
+    Payments still being processed when the worker stops stay pending.
+
+    :param payment: The saved, unprocessed payment.
+    :return: The processing task.
+    """
+    task = asyncio.get_running_loop().create_task(process(payment))
+    # The loop keeps only weak references to tasks.
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def submit_processing(payment: Payment) -> Future:
+    """
+    Processes a pending payment in a thread of the worker process, for
+    requests served by WSGI.
+
+    Payments still being processed when the worker stops stay pending.
+
+    :param payment: The saved, unprocessed payment.
+    :return: The future of the processing.
+    """
+    future = _executor.submit(process_in_thread, payment)
+    _futures.add(future)
+    future.add_done_callback(_futures.discard)
+    return future
+
+
+async def process(payment: Payment) -> None:
+    """
+    Processes a payment outside the request cycle, so the database
+    connection it used is released here rather than by the request.
+    """
+    try:
+        await payment.aprocess_payment()
+    finally:
+        await sync_to_async(release_connections)()
+
+
+def process_in_thread(payment: Payment) -> None:
+    try:
+        payment.process_payment()
+    finally:
+        release_connections()
+
+
+async def wait_for_processing() -> None:
+    """
+    Waits until all payments scheduled in this process are processed.
+    """
+    while _tasks or _futures:
+        await asyncio.gather(*_tasks, *map(asyncio.wrap_future, list(_futures)))
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
+from django_orders.tracing import traced
 from orders.models import Order
+from products.serializers import MoneyField
 from .models import Payment
 
 
@@ -8,7 +10,7 @@ class PaymentSerializer(serializers.ModelSerializer):
     order = serializers.PrimaryKeyRelatedField(
         queryset=Order.objects.all(), required=True
     )
-    cost = serializers.DecimalField(max_digits=25, decimal_places=2, read_only=True)
+    cost = MoneyField(read_only=True)
     status = serializers.CharField(read_only=True)
     payment_type = serializers.CharField(max_length=25, default="Bank Transfer")
 
@@ -16,12 +18,16 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = ["order", "cost", "status", "payment_type"]
 
+    @traced("payment_serializer.validate")
+    def is_valid(self, *, raise_exception=False) -> bool:
+        return super().is_valid(raise_exception=raise_exception)
+
+    @traced("payment_serializer.create")
     def create(self, validated_data) -> Payment:
         order = validated_data.pop("order")
-        payment = Payment.objects.create(
-            order=order,
-            cost=order.total_cost, **validated_data
-        )
+        process = validated_data.pop("process", True)
+        payment = Payment(order=order, cost=order.total_cost, **validated_data)
+        payment.save(process=process)
         return payment
 
     def update(self, instance, validated_data) -> None:
@@ -1,11 +1,19 @@
+import asyncio
+import json
+import time
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import ProtectedError
+from django.test import AsyncClient, Client
+from django.urls import reverse
 from rest_framework.exceptions import ValidationError
 
 from conftest import _not_existing as nex
-from orders.models import Order
+from orders.models import Order, OrderItem
 from .models import Payment
+from .processing import wait_for_processing
 
 
 @pytest.mark.django_db
@@ -25,6 +33,20 @@ class TestPayment:
         with pytest.raises(ObjectDoesNotExist):
             Payment.objects.get(pk=nex)
 
+    def test_admin_changelist_shows_major_units(self, admin_client):
+        """Test that the changelist shows amounts in major units."""
+        Payment.objects.filter(pk=1).update(cost=100000)
+        response = admin_client.get(reverse("admin:payments_payment_changelist"))
+        assert '<td class="field-cost_display">1000.00</td>' in response.content.decode()
+
+    def test_admin_change_shows_major_units(self, admin_client):
+        """Test that the payment page shows the amount in major units."""
+        Payment.objects.filter(pk=1).update(cost=100000)
+        response = admin_client.get(reverse("admin:payments_payment_change", args=[1]))
+        assert response.status_code == 200
+        assert "1000.00" in response.content.decode()
+        assert "100000" not in response.content.decode()
+
     def test_create_payment_ok(self):
         order: Order = Order.objects.get(pk=1)
         payment: Payment = Payment.objects.create(order=order)
@@ -55,3 +77,175 @@ class TestPayment:
         with pytest.raises(ProtectedError):
             payment: Payment = Payment.objects.get(pk=1).delete()
             assert payment.status == payment.VOIDED
+
+
+@pytest.mark.django_db
+class TestPaymentExportEndpoint:
+    url = "/api/v1/export/payments/"
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture):
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+        load_fixture("payments")
+
+    def test_stream_ndjson(self, admin_client):
+        response = admin_client.get(self.url, {"export_format": "ndjson"})
+        assert response.status_code == 200
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        [record] = [json.loads(line) for line in lines]
+        assert record["order_id"] == 2
+        assert record["cost"] == "1000.00"
+
+    def test_stream_date_range(self, admin_client):
+        response = admin_client.get(self.url, {"date_from": "2024-10-12"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines == ["payment_id,order_id,order_create_dt,cost,status,payment_type"]
+
+
+@pytest.mark.django_db
+class TestPaymentQueryBudget:
+    url = "/api/v1/pay/"
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture, monkeypatch, django_capture_on_commit_callbacks):
+        load_fixture("products")
+        monkeypatch.setattr("payments.models.time.sleep", lambda seconds: None)
+        self.on_commit = django_capture_on_commit_callbacks
+
+    def create_order(self, size: int) -> Order:
+        order = Order.objects.create()
+        with self.on_commit(execute=True):
+            for number in range(size):
+                OrderItem.objects.create(order=order, product_id=1 + number % 2, quantity=1)
+        return order
+
+    def test_create_payment_budget(self, budget_client):
+        """Test that paying an order runs the same queries for any number of items."""
+        orders = {size: self.create_order(size) for size in (1, 10, 50)}
+        responses = budget_client.check_sizes(
+            "post",
+            self.url,
+            lambda size: {"order": orders[size].pk, "payment_type": "PayPal"},
+            orders,
+            content_type="application/json",
+        )
+        assert [response.status_code for response in responses] == [201] * 3
+        assert all(
+            order.status == Order.STATUS_CHOICES["PAID"]
+            for order in Order.objects.filter(pk__in=[order.pk for order in orders.values()])
+        )
+
+    def test_create_payment_async_budget(self, budget_client, monkeypatch):
+        """Test that accepting a payment runs the same queries for any number of items."""
+        monkeypatch.setattr("payments.views.submit_processing", lambda payment: None)
+        orders = {size: self.create_order(size) for size in (1, 10, 50)}
+        responses = budget_client.check_sizes(
+            "post",
+            "/api/v2/pay/",
+            lambda size: {"order": orders[size].pk, "payment_type": "PayPal"},
+            orders,
+            content_type="application/json",
+        )
+        assert [response.status_code for response in responses] == [202] * 3
+        status = budget_client.get(responses[-1]["Location"])
+        assert status.json()["status"] == Payment.STATUS_CHOICES["PENDING"]
+
+    def test_export_budget(self, admin_budget_client):
+        """Test that exporting payments stays within its budget."""
+        for _ in range(5):
+            Payment.objects.create(order=self.create_order(1), payment_type="PayPal")
+        response = admin_budget_client.get("/api/v1/export/payments/", {"export_format": "ndjson"})
+        assert response.status_code == 200
+        assert len(b"".join(response.streaming_content).splitlines()) == 5
+
+    def test_admin_changelist_budget(self, admin_budget_client):
+        """Test that the payment changelist loads the orders of all rows at once."""
+        for _ in range(5):
+            Payment.objects.create(order=self.create_order(1), payment_type="PayPal")
+        response = admin_budget_client.get(
+            reverse("admin:payments_payment_changelist"),
+            {"status": Payment.STATUS_CHOICES["COMPLETED"]},
+        )
+        assert response.status_code == 200
+        assert response.context["cl"].result_count == 5
+
+
+@pytest.mark.django_db
+class TestAsyncPayment:
+    url = "/api/v2/pay/"
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture, monkeypatch):
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+        load_fixture("payments")
+        monkeypatch.setattr(Payment, "processing_time", staticmethod(lambda: 0))
+
+    async def post(self, order_id: int):
+        return await AsyncClient().post(
+            self.url,
+            {"order": order_id, "payment_type": "PayPal"},
+            content_type="application/json",
+        )
+
+    def test_create_and_poll(self):
+        """Test that a payment is accepted at once and completed in the background."""
+
+        async def scenario():
+            response = await self.post(1)
+            accepted = response.json()
+            await wait_for_processing()
+            status = await AsyncClient().get(response["Location"])
+            return response.status_code, accepted, status.json()
+
+        status_code, accepted, status = async_to_sync(scenario)()
+        assert status_code == 202
+        assert accepted["status"] == Payment.STATUS_CHOICES["PENDING"]
+        assert status["status"] == Payment.STATUS_CHOICES["COMPLETED"]
+        assert status["cost"] == "1900.00"
+        assert Order.objects.get(pk=1).status == Order.STATUS_CHOICES["PAID"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_create_under_wsgi(self):
+        """Test that a payment accepted by the sync handler is still processed."""
+        response = Client().post(
+            self.url, {"order": 1, "payment_type": "PayPal"}, content_type="application/json"
+        )
+        assert response.status_code == 202
+        async_to_sync(wait_for_processing)()
+        payment = Payment.objects.get(pk=response.json()["id"])
+        assert payment.status == Payment.STATUS_CHOICES["COMPLETED"]
+        assert Order.objects.get(pk=1).status == Order.STATUS_CHOICES["PAID"]
+
+    def test_overpayment_error(self):
+        """Test that paying a paid order is rejected."""
+        response = async_to_sync(self.post)(2)
+        assert response.status_code == 400
+
+    def test_unknown_payment_error(self):
+        response = async_to_sync(AsyncClient().get)(f"{self.url}{nex}/")
+        assert response.status_code == 404
+
+    def test_concurrent_processing(self, monkeypatch, django_capture_on_commit_callbacks):
+        """Test that processing delays of many payments overlap."""
+        monkeypatch.setattr(Payment, "processing_time", staticmethod(lambda: 0.2))
+        orders = [Order.objects.create() for _ in range(20)]
+        with django_capture_on_commit_callbacks(execute=True):
+            for order in orders:
+                OrderItem.objects.create(order=order, product_id=1, quantity=1)
+
+        async def scenario():
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(self.post(order.pk) for order in orders))
+            await wait_for_processing()
+            return responses, time.perf_counter() - started
+
+        responses, elapsed = async_to_sync(scenario)()
+        assert {response.status_code for response in responses} == {202}
+        assert elapsed < 2
+        assert Payment.objects.filter(
+            order__in=orders, status=Payment.STATUS_CHOICES["COMPLETED"]
+        ).count() == 20
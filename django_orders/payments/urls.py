@@ -1,5 +1,11 @@
 from django.urls import path, include
 
 from .routers import router
+from .views import PaymentExportView, create_payment, payment_status
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("api/v2/pay/", create_payment, name="payment-create-async"),
+    path("api/v2/pay/<int:pk>/", payment_status, name="payment-status"),
+    path("api/v1/export/payments/", PaymentExportView.as_view(), name="export-payments"),
+    path("", include(router.urls)),
+]
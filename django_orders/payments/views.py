@@ -1,6 +1,15 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework.viewsets import ModelViewSet
 
+from services.async_api import bad_request, json_response, read_json, save_serializer
+from services.exports import BaseExportView
+from services.throttling import TokenBucketThrottle, throttle
+from .exports import PaymentExporter
 from .models import Payment
+from .processing import schedule_processing, submit_processing
 from .serializers import PaymentSerializer
 
 
@@ -8,3 +17,48 @@ class PaymentViewSet(ModelViewSet):
     http_method_names = ["post"]
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "payments"
+
+
+class PaymentExportView(BaseExportView):
+    exporter_class = PaymentExporter
+    filename = "payments"
+
+
+@csrf_exempt
+@require_POST
+@throttle("payments")
+async def create_payment(request):
+    """
+    Registers a payment and processes it in the background of the event
+    loop, so one ASGI worker serves many payments at once. Under WSGI the
+    loop ends with the request, so the payment is processed in a thread.
+
+    Responds with 202 and the status URL in the `Location` header.
+    """
+    try:
+        data = read_json(request)
+    except ValueError:
+        return bad_request("Invalid JSON.")
+    payment, body = await save_serializer(PaymentSerializer(data=data), process=False)
+    if payment is None:
+        return bad_request(body)
+    if isinstance(request, ASGIRequest):
+        schedule_processing(payment)
+    else:
+        submit_processing(payment)
+    status_url = reverse("payment-status", args=[payment.pk])
+    return json_response({"id": payment.pk, **body}, status=202, headers={"Location": status_url})
+
+
+@require_GET
+async def payment_status(request, pk: int):
+    """
+    Returns the current state of a payment, for polling after
+    `create_payment`.
+    """
+    payment = await Payment.objects.filter(pk=pk).afirst()
+    if payment is None:
+        return json_response({"detail": "Not found."}, status=404)
+    return json_response({"id": payment.pk, **PaymentSerializer(payment).data})
@@ -1,3 +1,10 @@
-from .custom_validators import PositiveDecimalValidator
+from .custom_validators import PositiveDecimalValidator, PositiveMoneyValidator
+from .fields import MoneyField, format_money, to_minor_units
 
-__all__ = ["PositiveDecimalValidator"]
+__all__ = [
+    "PositiveDecimalValidator",
+    "PositiveMoneyValidator",
+    "MoneyField",
+    "format_money",
+    "to_minor_units",
+]
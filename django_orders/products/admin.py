@@ -1,10 +1,26 @@
 from django.contrib import admin
 
-from .models import Product
+from .models import Product, ProductPriceHistory
+
+
+class ProductPriceHistoryInline(admin.TabularInline):
+    """
+    Read-only list of the prices a product had over time.
+    """
+
+    model = ProductPriceHistory
+    fields = ("price", "valid_from")
+    readonly_fields = ("price", "valid_from")
+    ordering = ("-valid_from",)
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 class ProductAdmin(admin.ModelAdmin):
-    pass
+    inlines = (ProductPriceHistoryInline,)
 
 
 admin.site.register(Product, ProductAdmin)
@@ -0,0 +1,73 @@
+"""
+In-process cache of the product fields an order needs: name and price.
+
+Entries are dropped when a transaction that saved or deleted a product
+in this process commits, so a lookup made before the commit cannot put
+the old price back afterwards. Other processes keep their entries until
+they expire, and prices changed with `QuerySet.update()` send no signal,
+so a cached price may be stale for up to `PRODUCT_CACHE_TTL` seconds.
+The cache is therefore only used to validate the ordered products; the
+prices an order is charged are read from the database when it is
+created.
+"""
+
+from typing import Iterable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from services.lru_cache import LRUCache
+from .models import Product
+
+CACHED_FIELDS: list[str] = ["id", "name", "price"]
+
+product_cache = LRUCache(
+    "products", maxsize=settings.PRODUCT_CACHE_SIZE, ttl=settings.PRODUCT_CACHE_TTL
+)
+
+
+def split_cached(product_ids: Iterable[int]) -> tuple[dict[int, Product], list[int]]:
+    """
+    Looks products up in the cache.
+
+    :param product_ids: The IDs of the products.
+    :return: The cached products by ID and the IDs that were not cached.
+    """
+    found, missing = {}, []
+    for pk in product_ids:
+        values = product_cache.get(pk)
+        if values is None:
+            missing.append(pk)
+        else:
+            found[pk] = Product.from_db(DEFAULT_DB_ALIAS, CACHED_FIELDS, (pk, *values))
+    return found, missing
+
+
+def remember(products: dict[int, Product]) -> dict[int, Product]:
+    for pk, product in products.items():
+        product_cache.set(pk, (product.name, product.price))
+    return products
+
+
+def cached_products(product_ids: Iterable[int]) -> dict[int, Product]:
+    """
+    Returns products with their name and price, loading the ones missing
+    from the cache in one query. Other fields are deferred.
+
+    :param product_ids: The IDs of the products.
+    :return: The existing products by ID.
+    """
+    found, missing = split_cached(product_ids)
+    if missing:
+        found.update(remember(Product.objects.only(*CACHED_FIELDS).in_bulk(missing)))
+    return found
+
+
+async def acached_products(product_ids: Iterable[int]) -> dict[int, Product]:
+    """
+    Async version of `cached_products`.
+    """
+    found, missing = split_cached(product_ids)
+    if missing:
+        found.update(remember(await Product.objects.only(*CACHED_FIELDS).ain_bulk(missing)))
+    return found
@@ -3,6 +3,7 @@ from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.core.validators import DecimalValidator
+from django.utils.deconstruct import deconstructible
 
 
 class PositiveDecimalValidator(DecimalValidator):
@@ -43,3 +44,26 @@ class PositiveDecimalValidator(DecimalValidator):
         """
         if value == Decimal("0"):
             raise ValidationError(self.value_error.format("нулевым"))
+
+
+@deconstructible
+class PositiveMoneyValidator:
+    """
+    Validates that an amount in minor units is positive and not zero.
+    """
+
+    value_error: str = PositiveDecimalValidator.value_error
+
+    def __call__(self, value: int) -> None:
+        """
+        Validates the given amount for positivity and non-zero.
+
+        :param value: The amount in minor units to validate.
+        """
+        if value < 0:
+            raise ValidationError(self.value_error.format("отрицательным"))
+        if value == 0:
+            raise ValidationError(self.value_error.format("нулевым"))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PositiveMoneyValidator)
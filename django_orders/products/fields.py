@@ -0,0 +1,81 @@
+from decimal import Decimal, InvalidOperation
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+
+MINOR_UNITS_EXPONENT: int = 2
+
+
+def to_minor_units(amount: Decimal | str | int) -> int:
+    """
+    Converts an amount in major units (e.g. "12.34") into minor units
+    (e.g. 1234).
+
+    :param amount: The amount in major units.
+    :return: The amount in minor units.
+    :raises ValueError: If the amount is not a number or has more
+     decimal places than the currency allows.
+    """
+    try:
+        minor = Decimal(amount).scaleb(MINOR_UNITS_EXPONENT)
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid amount: {amount!r}") from e
+    if not minor.is_finite() or minor != minor.to_integral_value():
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return int(minor)
+
+
+def format_money(value: int) -> str:
+    """
+    Formats an amount in minor units as a string in major units, e.g.
+    1234 as "12.34".
+
+    :param value: The amount in minor units.
+    :return: The formatted amount.
+    """
+    units, fraction = divmod(abs(value), 10**MINOR_UNITS_EXPONENT)
+    sign = "-" if value < 0 else ""
+    if not MINOR_UNITS_EXPONENT:
+        return f"{sign}{units}"
+    return f"{sign}{units}.{fraction:0{MINOR_UNITS_EXPONENT}d}"
+
+
+class MoneyFormField(forms.DecimalField):
+    """
+    Form field that shows and accepts an amount in major units and cleans
+    it into minor units.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        kwargs.setdefault("decimal_places", MINOR_UNITS_EXPONENT)
+        super().__init__(**kwargs)
+
+    def prepare_value(self, value):
+        if isinstance(value, int):
+            return format_money(value)
+        return super().prepare_value(value)
+
+    def clean(self, value) -> int | None:
+        amount = super().clean(value)
+        if amount is None:
+            return None
+        try:
+            return to_minor_units(amount)
+        except ValueError as e:
+            raise ValidationError(self.error_messages["invalid"], code="invalid") from e
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Stores an amount of money as an integer number of minor units, e.g.
+    12.34 is stored as 1234.
+
+    Amounts stay integers in the database and in Python; conversion to
+    major units happens only in forms and API serializers.
+    """
+
+    description = "Amount of money in minor units"
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{"form_class": MoneyFormField, **kwargs})
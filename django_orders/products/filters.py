@@ -0,0 +1,68 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from . import to_minor_units
+
+
+class PriceRangeFilter(BaseFilterBackend):
+    """
+    Filters products by a price band given in the `price__gte` and
+    `price__lte` query parameters. Both bounds are optional.
+    """
+
+    lookups: tuple[str, ...] = ("price__gte", "price__lte")
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Applies the price bounds present in the request to the queryset.
+
+        :param request: The current request.
+        :param queryset: The queryset to filter.
+        :param view: The view being requested.
+        :return: The filtered queryset.
+        """
+        bounds = {}
+        for lookup in self.lookups:
+            value = request.query_params.get(lookup)
+            if value is not None:
+                bounds[lookup] = self.parse_price(lookup, value)
+        return queryset.filter(**bounds)
+
+    @staticmethod
+    def parse_price(lookup: str, value: str) -> int:
+        """
+        Converts a query parameter value in major units into a price bound
+        in minor units.
+
+        :param lookup: The name of the query parameter.
+        :param value: The raw query parameter value.
+        :return: The parsed price in minor units.
+        :raises ValidationError: If the value is not a valid amount.
+        """
+        try:
+            return to_minor_units(value)
+        except ValueError:
+            raise ValidationError({lookup: "Введите корректное число."})
+
+
+class KeysetOrderingFilter(OrderingFilter):
+    """
+    Ordering filter that always ends the ordering with `id` in the same
+    direction as the first field.
+
+    The tie-breaker makes the ordering unique, so pages are stable and
+    `ORDER BY price, id` can be served by the `(price, id)` index. DRF's
+    cursor holds the value of the first field only: pages seek by price,
+    and products sharing a price are skipped with an offset within that
+    price, so a page deep into one price costs as much as that offset.
+    """
+
+    tie_breaker: str = "id"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        names = {field.lstrip("-") for field in ordering}
+        if ordering and self.tie_breaker not in names:
+            descending = ordering[0].startswith("-")
+            ordering.append(f"-{self.tie_breaker}" if descending else self.tie_breaker)
+        return ordering
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from products.sales import compact_sales
+
+
+class Command(BaseCommand):
+    help = "Adds the recorded sales of paid orders to the product sales counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sales records applied per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        compacted = compact_sales(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Applied {compacted} sales records."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.snapshot import current_version, publish_snapshot
+
+
+class Command(BaseCommand):
+    help = "Publishes the static catalog snapshot, e.g. after bulk price updates."
+
+    def handle(self, *args, **options):
+        previous = current_version()
+        version = publish_snapshot()
+        if version == previous:
+            self.stdout.write(f"Catalog snapshot {version} is up to date.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Published catalog snapshot {version}."))
@@ -0,0 +1,69 @@
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from orders.models import Order, OrderItem
+from products.models import ProductSales, ProductSalesDelta
+from products.sales import lock_sales_deltas
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the product sales counters from the items of paid orders, "
+        "archived orders included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of counters inserted per query.",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # No sales may be recorded between reading the paid items and
+        # dropping the pending deltas, or they would be lost.
+        lock_sales_deltas()
+        paid_statuses = [
+            Order.STATUS_CHOICES["PAID"],
+            Order.STATUS_CHOICES["CONFIRMED"],
+        ]
+        item_models = [OrderItem]
+        if apps.is_installed("archive"):
+            from archive.models import ArchivedOrderItem
+
+            item_models.append(ArchivedOrderItem)
+        quantities: Counter = Counter()
+        revenues: Counter = Counter()
+        for model in item_models:
+            totals = (
+                model.objects.filter(order__status__in=paid_statuses)
+                .values("product_id")
+                .annotate(quantity_sum=Sum("quantity"), revenue_sum=Sum("line_total"))
+                .order_by()
+            )
+            for row in totals:
+                quantities[row["product_id"]] += row["quantity_sum"]
+                revenues[row["product_id"]] += row["revenue_sum"]
+        # The recomputed counters already include the pending sales.
+        ProductSalesDelta.objects.all().delete()
+        ProductSales.objects.all().delete()
+        counters = ProductSales.objects.bulk_create(
+            (
+                ProductSales(
+                    product_id=product_id,
+                    quantity=quantities[product_id],
+                    revenue=revenues[product_id],
+                )
+                for product_id in sorted(quantities)
+            ),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired sales counters of {len(counters)} products.")
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:46
+
+import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# The seeded prices apply to every order placed before the history
+# existed, so they are valid from a moment before any order.
+SEED_VALID_FROM = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def seed_price_history(apps, schema_editor):
+    """
+    Records the current price of every existing product as its first
+    history entry.
+    """
+    Product = apps.get_model("products", "Product")
+    ProductPriceHistory = apps.get_model("products", "ProductPriceHistory")
+    entries = (
+        ProductPriceHistory(product_id=product_id, price=price, valid_from=SEED_VALID_FROM)
+        for product_id, price in Product.objects.values_list("id", "price").iterator()
+    )
+    ProductPriceHistory.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_price_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Стоимость')),
+                ('valid_from', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Действует с')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='products.product', verbose_name='Товар')),
+            ],
+            options={
+                'verbose_name': 'История цены',
+                'verbose_name_plural': 'История цен',
+                'indexes': [models.Index(fields=['product', 'valid_from'], name='price_history_lookup_idx')],
+            },
+        ),
+        migrations.RunPython(seed_price_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+import products.custom_validators
+import products.fields
+
+
+def convert_to_minor_units(apps, schema_editor):
+    """
+    Copies prices in major units into the new minor-unit columns.
+    """
+    to_minor = Cast(Round(F("price") * 100), BigIntegerField())
+    for model_name in ("Product", "ProductPriceHistory"):
+        model = apps.get_model("products", model_name)
+        model.objects.update(price_minor=to_minor)
+
+
+def convert_to_major_units(apps, schema_editor):
+    """
+    Copies prices in minor units back into the decimal columns.
+    """
+    # Multiplied by a decimal, as SQLite divides integers by integers
+    # with truncation.
+    to_major = ExpressionWrapper(
+        F("price_minor") * Value(Decimal("0.01")),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    for model_name in ("Product", "ProductPriceHistory"):
+        model = apps.get_model("products", model_name)
+        model.objects.update(price=to_major)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_price_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='price_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        migrations.AddField(
+            model_name='productpricehistory',
+            name='price_minor',
+            field=products.fields.MoneyField(null=True),
+        ),
+        # Nullable while converting, so that reversing the migration can
+        # add the columns back before filling them.
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True, validators=[products.custom_validators.PositiveDecimalValidator(decimal_places=2, max_digits=10)], verbose_name='Стоимость'),
+        ),
+        migrations.AlterField(
+            model_name='productpricehistory',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True, verbose_name='Стоимость'),
+        ),
+        migrations.RunPython(convert_to_minor_units, convert_to_major_units),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_price_id_idx',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='price',
+        ),
+        migrations.RemoveField(
+            model_name='productpricehistory',
+            name='price',
+        ),
+        migrations.RenameField(
+            model_name='product',
+            old_name='price_minor',
+            new_name='price',
+        ),
+        migrations.RenameField(
+            model_name='productpricehistory',
+            old_name='price_minor',
+            new_name='price',
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=products.fields.MoneyField(validators=[products.custom_validators.PositiveMoneyValidator()], verbose_name='Стоимость'),
+        ),
+        migrations.AlterField(
+            model_name='productpricehistory',
+            name='price',
+            field=products.fields.MoneyField(verbose_name='Стоимость'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ),
+    ]
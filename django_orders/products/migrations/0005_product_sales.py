@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:54
+
+import django.db.models.deletion
+import products.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales', serialize=False, to='products.product', verbose_name='Товар')),
+                ('quantity', models.BigIntegerField(default=0, verbose_name='Продано, шт.')),
+                ('revenue', products.fields.MoneyField(default=0, verbose_name='Выручка')),
+            ],
+            options={
+                'verbose_name': 'Продажи товара',
+                'verbose_name_plural': 'Продажи товаров',
+                'indexes': [models.Index(fields=['-quantity', 'product'], name='product_sales_rank_idx')],
+            },
+        ),
+    ]
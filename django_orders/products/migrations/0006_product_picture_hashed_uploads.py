@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_sales'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='picture',
+            field=models.ImageField(height_field='image_height', upload_to='uploads/', verbose_name='Изображение', width_field='image_width'),
+        ),
+    ]
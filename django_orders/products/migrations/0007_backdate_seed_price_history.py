@@ -0,0 +1,38 @@
+from importlib import import_module
+
+from django.db import migrations
+from django.db.models import Min
+
+SEED_VALID_FROM = import_module("products.migrations.0003_product_price_history").SEED_VALID_FROM
+
+
+def backdate_first_prices(apps, schema_editor):
+    """
+    Moves the first history entry of every product to `SEED_VALID_FROM`.
+
+    Databases migrated before the seed was backdated got entries valid
+    from the migration time, so orders placed earlier fell back to the
+    current price.
+    """
+    ProductPriceHistory = apps.get_model("products", "ProductPriceHistory")
+    first_entries = (
+        ProductPriceHistory.objects.values("product_id")
+        .annotate(first=Min("valid_from"))
+        .filter(first__gt=SEED_VALID_FROM)
+        .order_by()
+    )
+    for row in first_entries.iterator():
+        ProductPriceHistory.objects.filter(
+            product_id=row["product_id"], valid_from=row["first"]
+        ).update(valid_from=SEED_VALID_FROM)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_product_picture_hashed_uploads"),
+    ]
+
+    operations = [
+        migrations.RunPython(backdate_first_prices, migrations.RunPython.noop),
+    ]
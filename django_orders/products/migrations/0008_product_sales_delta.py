@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-19 18:04
+
+import django.db.models.deletion
+import products.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_backdate_seed_price_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('revenue', products.fields.MoneyField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+        ),
+    ]
@@ -1,6 +1,42 @@
+import datetime
+
 from django.db import models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import MoneyField, PositiveMoneyValidator, format_money
+
 
-from . import PositiveDecimalValidator
+class ProductQuerySet(models.QuerySet):
+    """
+    QuerySet for products with point-in-time price lookups.
+    """
+
+    def with_price_at(self, moment: datetime.datetime) -> "ProductQuerySet":
+        """
+        Annotates each product with `price_at`, the price that was valid
+        at the given moment.
+
+        Products without a history entry before the moment fall back to
+        their current price.
+
+        :param moment: The point in time to resolve prices for.
+        :return: The annotated QuerySet.
+        """
+        return self.annotate(
+            price_at=Coalesce(ProductPriceHistory.objects.price_at(moment), F("price"))
+        )
+
+    def prices_at(self, moment: datetime.datetime) -> dict[int, int]:
+        """
+        Resolves the prices of all products in the QuerySet at the given
+        moment with a single query.
+
+        :param moment: The point in time to resolve prices for.
+        :return: A mapping of product ID to price in minor units.
+        """
+        return dict(self.with_price_at(moment).values_list("id", "price_at"))
 
 
 class Product(models.Model):
@@ -13,25 +49,32 @@ class Product(models.Model):
     - image_width: The width of the product image.
     - image_height: The height of the product image.
     - content: Description of the product.
-    - price: The price of the product.
+    - price: The price of the product in minor units.
     """
 
     name = models.CharField(max_length=40, verbose_name="Название")
     picture = models.ImageField(
         verbose_name="Изображение",
-        upload_to="uploads/%Y/%m/%d/",
+        upload_to="uploads/",
         width_field="image_width",
         height_field="image_height",
     )
     image_width = models.PositiveIntegerField(verbose_name="Ширина", editable=False)
     image_height = models.PositiveIntegerField(verbose_name="Высота", editable=False)
     content = models.TextField(max_length=600, verbose_name="Описание")
-    price = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        verbose_name="Стоимость",
-        validators=[PositiveDecimalValidator(max_digits=10, decimal_places=2)],
-    )
+    price = MoneyField(verbose_name="Стоимость", validators=[PositiveMoneyValidator()])
+
+    objects = ProductQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remembers the loaded price so that a price change can be detected
+        on save without an extra query.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance.__dict__.get("price")
+        return instance
 
     def __str__(self) -> str:
         """
@@ -39,7 +82,7 @@ class Product(models.Model):
 
         :return: A formatted string showing the product name and price.
         """
-        return f"Товар {self.name} стоимостью {self.price}."
+        return f"Товар {self.name} стоимостью {format_money(self.price)}."
 
     def save(
         self,
@@ -62,7 +105,142 @@ class Product(models.Model):
         """
         self.full_clean()
         super().save()
+        self.record_price_change()
+
+    def record_price_change(self) -> None:
+        """
+        Writes a price history entry if the price differs from the last
+        loaded or saved one.
+
+        Prices changed with `QuerySet.update()` bypass this method and are
+        not recorded.
+
+        :return: None
+        """
+        if getattr(self, "_loaded_price", None) == self.price:
+            return
+        ProductPriceHistory.objects.create(product=self, price=self.price)
+        self._loaded_price = self.price
 
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
+        indexes = [
+            models.Index(fields=["price"], name="product_price_idx"),
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            models.Index(fields=["name", "id"], name="product_name_id_idx"),
+        ]
+
+
+class PriceHistoryQuerySet(models.QuerySet):
+    """
+    QuerySet for product price history entries.
+    """
+
+    def price_at(self, moment, product=None) -> Subquery:
+        """
+        Builds a subquery returning the price of a product that was valid
+        at the given moment.
+
+        The subquery is served by the `(product_id, valid_from)` index and
+        can be used to annotate products or order items in bulk.
+
+        :param moment: A datetime or an expression resolving to one, e.g.
+         `OuterRef("order__create_dt")`.
+        :param product: An expression referencing the product ID.
+         Defaults to the primary key of the outer product query.
+        :return: A single-value price subquery.
+        """
+        if product is None:
+            product = OuterRef("pk")
+        entries = self.filter(product=product, valid_from__lte=moment)
+        return Subquery(entries.order_by("-valid_from").values("price")[:1])
+
+
+class ProductPriceHistory(models.Model):
+    """
+    Represents the price of a product starting from a point in time.
+
+    Attributes:
+    - product: The product the price belongs to.
+    - price: The price of the product in minor units.
+    - valid_from: The date and time the price came into effect.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_history",
+        verbose_name="Товар",
+    )
+    price = MoneyField(verbose_name="Стоимость")
+    valid_from = models.DateTimeField(
+        default=timezone.now, verbose_name="Действует с"
+    )
+
+    objects = PriceHistoryQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"Стоимость {format_money(self.price)} с {self.valid_from}."
+
+    class Meta:
+        verbose_name = "История цены"
+        verbose_name_plural = "История цен"
+        indexes = [
+            models.Index(
+                fields=["product", "valid_from"], name="price_history_lookup_idx"
+            ),
+        ]
+
+
+class ProductSales(models.Model):
+    """
+    Represents the sales counters of a product.
+
+    Sales of paid orders are recorded as `ProductSalesDelta` rows and
+    added to the counters by `compact_sales` (see `products.sales`). The
+    counters can be rebuilt with the `repair_sales_counters` command.
+
+    Attributes:
+    - product: The product the counters belong to.
+    - quantity: The number of units sold.
+    - revenue: The revenue from the sold units in minor units.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="sales",
+        verbose_name="Товар",
+    )
+    quantity = models.BigIntegerField(default=0, verbose_name="Продано, шт.")
+    revenue = MoneyField(default=0, verbose_name="Выручка")
+
+    def __str__(self) -> str:
+        return f"Продажи товара {self.product_id}: {self.quantity} шт."
+
+    class Meta:
+        verbose_name = "Продажи товара"
+        verbose_name_plural = "Продажи товаров"
+        indexes = [
+            models.Index(fields=["-quantity", "product"], name="product_sales_rank_idx"),
+        ]
+
+
+class ProductSalesDelta(models.Model):
+    """
+    Represents sales of a product not added to its counters yet.
+
+    Payment transactions only append deltas, so paid orders of a popular
+    product do not wait for each other on its counter row.
+
+    Attributes:
+    - product: The sold product.
+    - quantity: The number of units sold.
+    - revenue: The revenue from the sold units in minor units.
+    """
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    quantity = models.BigIntegerField(default=0)
+    revenue = MoneyField(default=0)
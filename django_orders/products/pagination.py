@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the product catalog.
+
+    Pages are located by the value of the first ordering field instead
+    of an offset, so deep pages cost the same as the first one. Rows that
+    share that value are paged by an offset among themselves, see
+    `KeysetOrderingFilter`.
+    """
+
+    ordering = ("id",)
+    page_size_query_param = "page_size"
+    max_page_size = 100
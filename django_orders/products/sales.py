@@ -0,0 +1,142 @@
+"""
+Buffered updates of the product sales counters.
+
+Paying an order only appends its sales, summed per product, to the
+`ProductSalesDelta` table, so payment transactions never lock the counter
+rows of popular products. Sales of a rolled back transaction are
+discarded with it. `compact_sales`, run periodically by the
+`compact_sales_counters` command, adds the deltas to the counters in
+short transactions, one UPDATE per product and batch.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+
+from .models import ProductSales, ProductSalesDelta
+
+
+def record_sales(items: Iterable[tuple[int, int, int]], using: str = "default") -> None:
+    """
+    Sums sold items per product and appends them as sales deltas.
+
+    :param items: Tuples of `(product_id, quantity, revenue)`.
+    :param using: The database alias.
+    :return: None
+    """
+    quantities: Counter = Counter()
+    revenues: Counter = Counter()
+    for product_id, quantity, revenue in items:
+        quantities[product_id] += quantity
+        revenues[product_id] += revenue
+    ProductSalesDelta.objects.using(using).bulk_create(
+        ProductSalesDelta(
+            product_id=product_id,
+            quantity=quantities[product_id],
+            revenue=revenues[product_id],
+        )
+        for product_id in sorted(quantities)
+    )
+
+
+def compact_sales(batch_size: int = 1000, using: str = "default") -> int:
+    """
+    Adds the recorded sales deltas to the counters and removes them.
+
+    Every batch is applied in its own transaction. Deltas locked by a
+    concurrent compaction are skipped, so several may run at once.
+
+    :param batch_size: The number of deltas applied per transaction.
+    :param using: The database alias.
+    :return: The number of deltas applied.
+    """
+    compacted = 0
+    while True:
+        with transaction.atomic(using=using):
+            deltas = list(
+                ProductSalesDelta.objects.using(using)
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", "product_id", "quantity", "revenue")[:batch_size]
+            )
+            quantities: Counter = Counter()
+            revenues: Counter = Counter()
+            for _, product_id, quantity, revenue in deltas:
+                quantities[product_id] += quantity
+                revenues[product_id] += revenue
+            flush_sales(
+                [
+                    (product_id, quantities[product_id], revenues[product_id])
+                    for product_id in sorted(quantities)
+                ],
+                using,
+            )
+            ProductSalesDelta.objects.using(using).filter(
+                id__in=[delta[0] for delta in deltas]
+            ).delete()
+        compacted += len(deltas)
+        if len(deltas) < batch_size:
+            return compacted
+
+
+def lock_sales_deltas(using: str = "default") -> None:
+    """
+    Blocks recording and compacting sales until the current transaction
+    ends, so that the pending deltas stay consistent with the order items
+    read afterwards. Must be called inside a transaction.
+
+    :param using: The database alias.
+    :return: None
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        table = connection.ops.quote_name(ProductSalesDelta._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+    else:
+        # SQLite locks the whole database for the first write of a
+        # transaction, even one changing no rows.
+        ProductSalesDelta.objects.using(using).filter(pk__lt=0).update(quantity=0)
+
+
+def flush_sales(batch: list[tuple[int, int, int]], using: str = "default") -> None:
+    """
+    Writes summed sales to the counters.
+
+    Products are updated in ID order so that concurrent flushes lock rows
+    in the same order and cannot deadlock.
+
+    :param batch: Tuples of `(product_id, quantity, revenue)` sorted by
+     product ID.
+    :param using: The database alias.
+    :return: None
+    """
+    with transaction.atomic(using=using):
+        for product_id, quantity, revenue in batch:
+            _increment(product_id, quantity, revenue, using)
+
+
+def _increment(product_id: int, quantity: int, revenue: int, using: str) -> None:
+    """
+    Adds to the counters of one product, creating them if needed.
+
+    :param product_id: The product ID.
+    :param quantity: The number of units to add.
+    :param revenue: The revenue to add in minor units.
+    :param using: The database alias.
+    :return: None
+    """
+    counters = ProductSales.objects.using(using).filter(product_id=product_id)
+    delta = {"quantity": F("quantity") + quantity, "revenue": F("revenue") + revenue}
+    if counters.update(**delta):
+        return
+    try:
+        with transaction.atomic(using=using):
+            ProductSales.objects.using(using).create(
+                product_id=product_id, quantity=quantity, revenue=revenue
+            )
+    except IntegrityError:
+        # Created concurrently by another flush.
+        counters.update(**delta)
@@ -1,9 +1,49 @@
 from rest_framework import serializers
 
-from .models import Product
+from . import format_money, to_minor_units
+from .models import Product, ProductSales
+
+
+class MoneyField(serializers.Field):
+    """
+    Serializer field for amounts stored in minor units.
+
+    Amounts are rendered as strings in major units (e.g. "12.34") and
+    parsed back into minor units, so the conversion happens only at the
+    API boundary.
+    """
+
+    default_error_messages = {"invalid": "Введите корректную сумму."}
+
+    def to_representation(self, value: int) -> str:
+        return format_money(value)
+
+    def to_internal_value(self, data) -> int:
+        try:
+            return to_minor_units(str(data).strip())
+        except ValueError:
+            self.fail("invalid")
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    price = MoneyField()
+
     class Meta:
         model = Product
         fields = ["name", "picture", "image_width", "image_height", "content", "price"]
+
+
+class CatalogProductSerializer(ProductSerializer):
+    class Meta(ProductSerializer.Meta):
+        fields = ["id", *ProductSerializer.Meta.fields]
+
+
+class TopProductSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="product_id", read_only=True)
+    name = serializers.CharField(source="product.name", read_only=True)
+    price = MoneyField(source="product.price", read_only=True)
+    revenue = MoneyField(read_only=True)
+
+    class Meta:
+        model = ProductSales
+        fields = ["id", "name", "price", "quantity", "revenue"]
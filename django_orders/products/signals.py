@@ -0,0 +1,29 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import product_cache
+from .models import Product
+from .snapshot import schedule_publish
+
+
+@receiver(post_save, sender=Product, dispatch_uid="products_cache_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="products_cache_deleted")
+def product_changed(sender, instance: Product, using: str, **kwargs) -> None:
+    """
+    Drops a saved or deleted product from the product cache once the
+    change commits, fixtures loaded with `loaddata` included. Dropped
+    earlier, a lookup before the commit would cache the old price again.
+    """
+    transaction.on_commit(partial(product_cache.delete, instance.pk), using=using)
+
+
+@receiver(post_save, sender=Product, dispatch_uid="products_snapshot_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="products_snapshot_deleted")
+def catalog_changed(sender, instance: Product, using: str, **kwargs) -> None:
+    """
+    Publishes a new catalog snapshot after the change commits.
+    """
+    schedule_publish(using)
@@ -0,0 +1,221 @@
+"""
+Static snapshot of the product catalog.
+
+The whole catalog is rendered to `CATALOG_SNAPSHOT_ROOT` as JSON with
+gzip and, if the brotli package is installed, brotli copies, so a web
+server can serve catalog reads without Python or database work. The
+snapshot is versioned by the hash of its content: `catalog.<version>.json`
+never changes, and `catalog.json` with its compressed copies and
+`catalog.version` are replaced atomically with every new version.
+
+After a transaction that saved or deleted products commits, a new
+snapshot is published from a background thread of the worker once
+`CATALOG_SNAPSHOT_DELAY` seconds have passed, so the committing request
+does not render the catalog and a burst of changes is published once.
+A publication pending when the worker stops is lost, and prices changed
+with `QuerySet.update()` send no signal; run `manage.py publish_catalog`
+after deploys and such changes.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from functools import partial
+from pathlib import Path
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from services.fast_json import dumps
+from .models import Product
+from .serializers import CatalogProductSerializer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+CURRENT_NAME = "catalog.json"
+VERSION_NAME = "catalog.version"
+
+logger = logging.getLogger(__name__)
+
+# Databases with product changes not published yet, per thread.
+_pending = Local()
+# Delayed publications by database, at most one per database.
+_timers: dict[str, threading.Timer] = {}
+_timers_lock = threading.Lock()
+
+
+def render_catalog(using: str = DEFAULT_DB_ALIAS) -> bytes:
+    """
+    Renders all products as the JSON body of the snapshot.
+
+    :param using: The database to read the products from.
+    :return: The encoded catalog.
+    """
+    products = Product.objects.using(using).order_by("id")
+    data = CatalogProductSerializer(products, many=True).data
+    return dumps({"count": len(data), "results": data})
+
+
+def compressed(body: bytes) -> dict[str, bytes]:
+    """
+    Returns the precompressed copies of a snapshot by file suffix.
+
+    :param body: The JSON body.
+    :return: The gzip copy and the brotli copy, if brotli is installed.
+    """
+    # A fixed mtime keeps the gzip copy identical for identical content.
+    copies = {".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies[".br"] = brotli.compress(body)
+    return copies
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    """
+    Replaces a file so that readers see either the old or the new
+    content, never a partly written file.
+
+    :param path: The file to replace.
+    :param content: The new content.
+    :return: None
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def current_version() -> str | None:
+    """
+    Returns the version of the published snapshot.
+
+    :return: The version, None if nothing was published yet.
+    """
+    try:
+        return (Path(settings.CATALOG_SNAPSHOT_ROOT) / VERSION_NAME).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(using: str = DEFAULT_DB_ALIAS) -> str:
+    """
+    Renders the catalog and publishes it as the current snapshot unless
+    its content did not change. Older versions beyond
+    `CATALOG_SNAPSHOT_KEEP` are removed.
+
+    :param using: The database to read the products from, the primary
+     by default, as replicas may not have the change yet.
+    :return: The version of the current snapshot.
+    """
+    root = Path(settings.CATALOG_SNAPSHOT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    body = render_catalog(using)
+    version = hashlib.sha256(body).hexdigest()[:16]
+    if version == current_version():
+        return version
+    files = {"": body, **compressed(body)}
+    for suffix, content in files.items():
+        write_atomic(root / f"catalog.{version}.json{suffix}", content)
+    for suffix, content in files.items():
+        write_atomic(root / f"{CURRENT_NAME}{suffix}", content)
+    write_atomic(root / VERSION_NAME, version.encode())
+    prune_versions(root, keep=settings.CATALOG_SNAPSHOT_KEEP)
+    return version
+
+
+def prune_versions(root: Path, keep: int) -> None:
+    """
+    Removes all but the newest versioned snapshots, so clients holding
+    a recent version URL can still fetch it.
+
+    :param root: The snapshot directory.
+    :param keep: The number of versions to keep.
+    :return: None
+    """
+    versions = sorted(
+        root.glob("catalog.*.json"), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    for path in versions[keep:]:
+        for stale in root.glob(f"{path.name}*"):
+            stale.unlink(missing_ok=True)
+
+
+def schedule_publish(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Publishes a new snapshot once the current transaction commits,
+    however many products it changes.
+
+    :param using: The database alias of the transaction.
+    :return: None
+    """
+    if not hasattr(_pending, "databases"):
+        _pending.databases = set()
+    _pending.databases.add(using)
+    # One callback per change: a callback registered in a rolled back
+    # savepoint is dropped, the first remaining one publishes.
+    transaction.on_commit(partial(publish_pending, using), using=using)
+
+
+def publish_pending(using: str = DEFAULT_DB_ALIAS) -> None:
+    if using not in getattr(_pending, "databases", ()):
+        return
+    _pending.databases.discard(using)
+    if settings.CATALOG_SNAPSHOT_AUTOPUBLISH:
+        publish_later(using)
+
+
+def publish_later(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Publishes a snapshot after `CATALOG_SNAPSHOT_DELAY` seconds in a
+    background thread, unless a publication is already waiting: it
+    renders the catalog when it runs and so includes this change too.
+
+    :param using: The database to read the products from.
+    :return: None
+    """
+    with _timers_lock:
+        if using in _timers:
+            return
+        timer = threading.Timer(settings.CATALOG_SNAPSHOT_DELAY, _publish_delayed, (using,))
+        timer.daemon = True
+        _timers[using] = timer
+    timer.start()
+
+
+def _publish_delayed(using: str) -> None:
+    # Dropped before rendering, so changes committed meanwhile are
+    # published by a new timer.
+    with _timers_lock:
+        _timers.pop(using, None)
+    try:
+        publish_snapshot(using)
+    except Exception:
+        logger.exception("Publishing the catalog snapshot failed.")
+    finally:
+        connections.close_all()
+
+
+def wait_for_publish() -> None:
+    """
+    Waits until the delayed publications of this process are done.
+
+    :return: None
+    """
+    with _timers_lock:
+        timers = list(_timers.values())
+    for timer in timers:
+        timer.join()
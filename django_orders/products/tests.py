@@ -1,11 +1,28 @@
+import datetime
+import gzip
+import importlib
+import io
+import json
 from decimal import Decimal
 
 import pytest
+from django.apps import apps as django_apps
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
 from conftest import _not_existing as nex
-from .models import Product
-from .custom_validators import PositiveDecimalValidator
+from .cache import cached_products, product_cache
+from .models import Product, ProductPriceHistory, ProductSales, ProductSalesDelta
+from .custom_validators import PositiveDecimalValidator, PositiveMoneyValidator
+from .fields import format_money, to_minor_units
+from .sales import compact_sales, record_sales
+from .snapshot import current_version, publish_snapshot, wait_for_publish
+from .views import catalog_snapshot
 
 
 @pytest.mark.usefixtures("create_mock_image")
@@ -37,7 +54,7 @@ class TestProduct:
             name="new_test_product",
             picture=create_mock_image,
             content="new test info",
-            price="100.00",
+            price=10000,
         )
         assert isinstance(product, Product)
 
@@ -50,7 +67,7 @@ class TestProduct:
                 name="new_test_product",
                 picture=None,
                 content="new test info",
-                price="100.00",
+                price=10000,
             )
 
     def test_get_product_ok(self):
@@ -89,6 +106,203 @@ class TestProduct:
             Product.objects.get(pk=nex).delete()
 
 
+@pytest.mark.usefixtures("create_mock_image")
+@pytest.mark.django_db
+class TestProductPriceHistory:
+    """
+    Tests for recording product prices and resolving them at a point
+    in time.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, create_mock_image):
+        """
+        Creates a product whose price is changed once.
+
+        :param create_mock_image: Mock image file for the product.
+        """
+        self.product = Product.objects.create(
+            name="history_product",
+            picture=create_mock_image,
+            content="history info",
+            price=10000,
+        )
+        self.before_change = datetime.datetime.now(tz=datetime.timezone.utc)
+        self.product.price = 15000
+        self.product.save()
+
+    def test_price_change_recorded(self):
+        """
+        Tests that creating a product and changing its price each write
+        one history entry, and that saving without a change does not.
+        """
+        self.product.save()
+        prices = self.product.price_history.order_by("valid_from")
+        assert list(prices.values_list("price", flat=True)) == [10000, 15000]
+
+    def test_loaded_product_price_change_recorded(self):
+        """
+        Tests that a price change of a product loaded from the database is
+        recorded.
+        """
+        product = Product.objects.get(pk=self.product.pk)
+        product.save()
+        assert product.price_history.count() == 2
+        product.price = 17500
+        product.save()
+        assert product.price_history.count() == 3
+
+    def test_prices_at(self):
+        """
+        Tests resolving prices at a point in time for several products in
+        a single query.
+        """
+        products = Product.objects.filter(pk=self.product.pk)
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        assert products.prices_at(self.before_change) == {self.product.pk: 10000}
+        assert products.prices_at(now) == {self.product.pk: 15000}
+
+    def test_prices_at_without_history(self):
+        """
+        Tests that a moment before the first history entry falls back to
+        the current price.
+        """
+        ProductPriceHistory.objects.filter(product=self.product).delete()
+        products = Product.objects.filter(pk=self.product.pk)
+        assert products.prices_at(self.before_change) == {self.product.pk: 15000}
+
+    @pytest.mark.parametrize(
+        "migration, function",
+        [
+            ("0003_product_price_history", "seed_price_history"),
+            ("0007_backdate_seed_price_history", "backdate_first_prices"),
+        ],
+    )
+    def test_migrated_history_covers_old_orders(self, migration, function):
+        """
+        Tests that an order placed before the price history was seeded
+        resolves the seeded price, not a later one.
+        """
+        module = importlib.import_module(f"products.migrations.{migration}")
+        if function == "seed_price_history":
+            ProductPriceHistory.objects.filter(product=self.product).delete()
+            Product.objects.filter(pk=self.product.pk).update(price=10000)
+        getattr(module, function)(django_apps, None)
+        Product.objects.filter(pk=self.product.pk).update(price=20000)
+        old_order_dt = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+        products = Product.objects.filter(pk=self.product.pk)
+        assert products.prices_at(old_order_dt) == {self.product.pk: 10000}
+
+
+@pytest.mark.django_db
+class TestProductSales:
+    """
+    Tests for the product sales counters and the top products endpoint.
+    """
+
+    url = "/api/v1/products/top/"
+
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, load_fixture, monkeypatch):
+        """
+        Loads products and orders and skips the simulated payment delay.
+
+        :param load_fixture: The fixture loading function.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        load_fixture("products")
+        load_fixture("orders")
+        load_fixture("orderitems")
+        monkeypatch.setattr("payments.models.time.sleep", lambda seconds: None)
+        self.client = APIClient()
+
+    def pay_order(self, order_id: int) -> None:
+        """
+        Pays an order in full.
+
+        :param order_id: The ID of the order to pay.
+        """
+        from orders.models import Order
+        from payments.models import Payment
+
+        Payment.objects.create(order=Order.objects.get(pk=order_id))
+
+    def test_paid_order_counted(self):
+        """
+        Tests that paying an order records its items, which are added to
+        the counters by the compaction.
+        """
+        self.pay_order(1)
+        assert not ProductSales.objects.exists()
+        assert ProductSalesDelta.objects.count() == 2
+        call_command("compact_sales_counters", stdout=io.StringIO())
+        counters = dict(ProductSales.objects.values_list("product_id", "quantity"))
+        assert counters == {1: 2, 2: 3}
+        assert ProductSales.objects.get(pk=2).revenue == 150000
+        assert not ProductSalesDelta.objects.exists()
+
+    def test_compaction_adds_to_counters(self):
+        """
+        Tests that compacted deltas are added to the existing counters,
+        also when spread over several batches.
+        """
+        ProductSales.objects.create(product_id=2, quantity=10, revenue=100)
+        record_sales([(2, 1, 500), (1, 2, 300)])
+        record_sales([(2, 3, 1500)])
+        assert compact_sales(batch_size=2) == 3
+        counters = dict(ProductSales.objects.values_list("product_id", "quantity"))
+        assert counters == {1: 2, 2: 14}
+        assert ProductSales.objects.get(pk=2).revenue == 2100
+
+    def test_top_products(self):
+        """
+        Tests that the top products endpoint ranks products by quantity.
+        """
+        self.pay_order(1)
+        compact_sales()
+        response = self.client.get(self.url, {"limit": 1})
+        assert response.status_code == 200
+        assert response.data == [
+            {"id": 2, "name": "test_product2", "price": "500.00", "quantity": 3, "revenue": "1500.00"}
+        ]
+
+    def test_top_products_limit_error(self):
+        """
+        Tests that a non-positive limit is rejected.
+        """
+        response = self.client.get(self.url, {"limit": 0})
+        assert response.status_code == 400
+
+    @pytest.mark.query_budget(1, max_seconds=0.5)
+    def test_top_products_query_budget(self):
+        """
+        Tests that the top products endpoint runs a single query.
+        """
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+
+    def test_repair_sales_counters(self):
+        """
+        Tests that the repair command rebuilds the counters from the items
+        of paid and confirmed orders.
+        """
+        ProductSales.objects.create(product_id=2, quantity=99, revenue=1)
+        call_command("repair_sales_counters")
+        counters = dict(ProductSales.objects.values_list("product_id", "quantity"))
+        assert counters == {1: 5}
+
+    def test_repair_sales_counters_locks_deltas(self):
+        """
+        Tests that the deltas are locked before the order items are read.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            call_command("repair_sales_counters", stdout=io.StringIO())
+        statements = [
+            query["sql"] for query in queries if not query["sql"].startswith("SAVEPOINT")
+        ]
+        assert statements[0].startswith('UPDATE "products_productsalesdelta"')
+
+
 @pytest.mark.parametrize("validator", (PositiveDecimalValidator(10, 2),))
 class TestCustomValidator:
     """
@@ -125,3 +339,284 @@ class TestCustomValidator:
         negative_decimal = Decimal("-13.64")
         with pytest.raises(ValidationError):
             validator(negative_decimal)
+
+
+@pytest.mark.django_db
+class TestProductCatalog:
+    """
+    Tests for filtering, ordering and keyset pagination of the product
+    list endpoint.
+    """
+
+    url = "/api/v1/products/"
+
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, load_fixture):
+        """
+        Loads fixtures for the Product model.
+
+        :param load_fixture: The fixture loading function.
+        """
+        load_fixture("products")
+        self.client = APIClient()
+
+    def test_price_range_filter(self):
+        """
+        Tests that only products inside the price band are returned.
+        """
+        response = self.client.get(self.url, {"price__gte": "300", "price__lte": "500"})
+        assert response.status_code == 200
+        assert [item["name"] for item in response.data["results"]] == ["test_product2"]
+
+    def test_price_range_filter_error(self):
+        """
+        Tests that a non-numeric price bound is rejected.
+        """
+        response = self.client.get(self.url, {"price__gte": "cheap"})
+        assert response.status_code == 400
+
+    def test_ordering_by_price_desc(self):
+        """
+        Tests ordering of the product list by descending price.
+        """
+        response = self.client.get(self.url, {"ordering": "-price"})
+        prices = [item["price"] for item in response.data["results"]]
+        assert prices == ["500.00", "200.00"]
+
+    def test_keyset_pagination(self):
+        """
+        Tests that the next page is addressed by a cursor, not an offset.
+        """
+        response = self.client.get(self.url, {"ordering": "price", "page_size": 1})
+        assert "cursor=" in response.data["next"]
+        assert "offset" not in response.data["next"]
+
+    def test_price_range_uses_index(self):
+        """
+        Tests that a price band query ordered for keyset pagination is
+        planned as an index scan.
+        """
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = (
+            Product.objects.filter(price__gte=10000, price__lte=40000)
+            .order_by("price", "id")
+            .explain()
+        )
+        assert any(
+            index in plan for index in ("product_price_idx", "product_price_id_idx")
+        )
+
+    @pytest.mark.usefixtures("create_mock_image")
+    def test_list_query_budget(self, budget_client, create_mock_image):
+        """
+        Tests that the product list runs the same queries for any page size.
+        """
+        Product.objects.bulk_create(
+            Product(name=f"bulk_{number}", picture=create_mock_image, price=10000 + number)
+            for number in range(100)
+        )
+        responses = budget_client.check_sizes(
+            "get", self.url, lambda size: {"page_size": size}, (1, 10, 100)
+        )
+        assert [len(response.json()["results"]) for response in responses] == [1, 10, 100]
+
+
+class TestMoney:
+    """
+    Tests for converting amounts between major and minor units.
+    """
+
+    @pytest.mark.parametrize(
+        "amount, expected", (("12.34", 1234), ("100", 10000), (Decimal("0.5"), 50))
+    )
+    def test_to_minor_units_ok(self, amount, expected):
+        """
+        Tests converting amounts in major units into minor units.
+
+        :param amount: The amount in major units.
+        :param expected: The expected amount in minor units.
+        """
+        assert to_minor_units(amount) == expected
+
+    @pytest.mark.parametrize("amount", ("12.345", "cheap", "inf"))
+    def test_to_minor_units_error(self, amount):
+        """
+        Tests that amounts with fractional minor units or non-numbers are
+        rejected.
+
+        :param amount: The invalid amount.
+        """
+        with pytest.raises(ValueError):
+            to_minor_units(amount)
+
+    @pytest.mark.parametrize("value, expected", ((1234, "12.34"), (5, "0.05"), (-150, "-1.50")))
+    def test_format_money(self, value, expected):
+        """
+        Tests formatting amounts in minor units as major units.
+
+        :param value: The amount in minor units.
+        :param expected: The expected formatted amount.
+        """
+        assert format_money(value) == expected
+
+    @pytest.mark.parametrize("exponent, expected", ((0, "-1234"), (3, "-1.234")))
+    def test_format_money_exponent(self, monkeypatch, exponent, expected):
+        """
+        Tests that the number of decimal places follows the currency.
+
+        :param exponent: The number of decimal places of the currency.
+        :param expected: The expected formatted amount.
+        """
+        monkeypatch.setattr("products.fields.MINOR_UNITS_EXPONENT", exponent)
+        assert format_money(-1234) == expected
+
+    def test_positive_money_validator_error(self):
+        """
+        Tests that the money validator rejects zero and negative amounts.
+        """
+        for value in (0, -1):
+            with pytest.raises(ValidationError):
+                PositiveMoneyValidator()(value)
+
+
+@pytest.mark.django_db
+class TestProductCache:
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, load_fixture):
+        load_fixture("products")
+
+    def test_cached_after_first_lookup(self, django_assert_num_queries):
+        """Test that products are read from the database once."""
+        with django_assert_num_queries(1):
+            first = cached_products([1, 2, nex])
+        with django_assert_num_queries(0):
+            second = cached_products([1, 2])
+        assert set(first) == {1, 2}
+        assert [(p.name, p.price) for p in second.values()] == [
+            (p.name, p.price) for p in first.values()
+        ]
+        assert product_cache.stats()["hit_rate"] == 0.4
+
+    def test_invalidated_on_save_and_delete(
+        self, create_mock_image, django_capture_on_commit_callbacks
+    ):
+        """Test that a changed product is not served from the cache once committed."""
+        product = Product.objects.create(
+            name="cached_product", picture=create_mock_image, content="info", price=10000
+        )
+        cached_products([product.pk])
+        with django_capture_on_commit_callbacks(execute=True):
+            product.price = 15000
+            product.save()
+            assert cached_products([product.pk])[product.pk].price == 10000
+        assert cached_products([product.pk])[product.pk].price == 15000
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.price_history.all().delete()
+            product.delete()
+        assert cached_products([product.pk]) == {}
+
+    def test_order_creation_reads_prices(self, client):
+        """
+        Test that a repeated order reads only the prices of the cached
+        products, and is charged a price changed without invalidation.
+        """
+        payload = {"orderitem": [{"product": 1, "quantity": 2}]}
+        client.post("/api/v1/orders/", payload, content_type="application/json")
+        Product.objects.filter(pk=1).update(price=12345)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post("/api/v1/orders/", payload, content_type="application/json")
+        assert response.status_code == 201
+        assert response.json()["total_cost"] == format_money(12345 * 2)
+        [select] = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT") and 'FROM "products_product"' in query["sql"]
+        ]
+        assert '"products_product"."name"' not in select
+
+    def test_order_of_deleted_product_error(self, client, create_mock_image):
+        """Test that a product deleted after it was cached cannot be ordered."""
+        product = Product.objects.create(
+            name="deleted_product", picture=create_mock_image, content="info", price=10000
+        )
+        cached_products([product.pk])
+        product.price_history.all().delete()
+        Product.objects.filter(pk=product.pk).delete()
+        payload = {"orderitem": [{"product": product.pk, "quantity": 1}]}
+        response = client.post("/api/v1/orders/", payload, content_type="application/json")
+        assert response.status_code == 400
+        assert "orderitem" in response.json()
+
+
+@pytest.mark.django_db
+class TestCatalogSnapshot:
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, load_fixture, settings, tmp_path):
+        """Load products and publish snapshots to a temporary directory."""
+        load_fixture("products")
+        settings.CATALOG_SNAPSHOT_ROOT = tmp_path
+        self.root = tmp_path
+
+    def get(self, name: str = "catalog.json", **headers):
+        return catalog_snapshot(RequestFactory().get(f"/catalog/{name}", headers=headers), name)
+
+    def test_publish_writes_files(self):
+        """Test that the snapshot and its gzip copy hold the whole catalog."""
+        version = publish_snapshot()
+        body = (self.root / "catalog.json").read_bytes()
+        assert json.loads(body)["count"] == Product.objects.count()
+        assert json.loads(body)["results"][0]["id"] == 1
+        assert gzip.decompress((self.root / "catalog.json.gz").read_bytes()) == body
+        assert (self.root / f"catalog.{version}.json").read_bytes() == body
+        assert current_version() == version
+        assert publish_snapshot() == version
+
+    def test_published_once_after_commits(
+        self, settings, monkeypatch, create_mock_image, django_capture_on_commit_callbacks
+    ):
+        """Test that products changed in a burst of transactions publish one snapshot."""
+        settings.CATALOG_SNAPSHOT_AUTOPUBLISH = True
+        settings.CATALOG_SNAPSHOT_DELAY = 0.2
+        published = []
+        monkeypatch.setattr("products.snapshot.publish_snapshot", published.append)
+        for name in ("first", "second"):
+            with django_capture_on_commit_callbacks(execute=True):
+                Product.objects.create(
+                    name=name, picture=create_mock_image, content="info", price=100
+                )
+            assert published == []
+        wait_for_publish()
+        assert published == ["default"]
+
+    def test_old_versions_pruned(self, settings):
+        """Test that only the newest versioned snapshots are kept."""
+        settings.CATALOG_SNAPSHOT_KEEP = 1
+        publish_snapshot()
+        Product.objects.filter(pk=1).update(price=12345)
+        version = publish_snapshot()
+        assert [path.name for path in self.root.glob("catalog.*.json")] == [
+            f"catalog.{version}.json"
+        ]
+
+    def test_served_with_etag(self):
+        """Test that the snapshot is served compressed with its version as ETag."""
+        version = publish_snapshot()
+        response = self.get(**{"Accept-Encoding": "gzip, deflate"})
+        assert response["ETag"] == f'"{version}"'
+        assert response["Content-Encoding"] == "gzip"
+        assert response["Cache-Control"] == "no-cache"
+        assert self.get(**{"If-None-Match": f'"{version}"'}).status_code == 304
+
+        response = self.get(f"catalog.{version}.json")
+        assert "Content-Encoding" not in response
+        assert "immutable" in response["Cache-Control"]
+
+    def test_unknown_file_not_served(self):
+        """Test that only snapshot files are served."""
+        publish_snapshot()
+        for name in ("../settings.py", "catalog.0123456789abcdef.json"):
+            with pytest.raises(Http404):
+                self.get(name)
@@ -1,10 +1,103 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from .models import Product
-from .serializers import ProductSerializer
+from services.db_router import ReplicaReadMixin
+
+from .filters import KeysetOrderingFilter, PriceRangeFilter
+from .models import Product, ProductSales
+from .pagination import ProductCursorPagination
+from .serializers import ProductSerializer, TopProductSerializer
+from .snapshot import CURRENT_NAME, current_version
+
+_SNAPSHOT_NAME = re.compile(r"^catalog(?:\.(?P<version>[0-9a-f]{16}))?\.json$")
 
 
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, ModelViewSet):
     http_method_names = ["get"]
-    queryset = Product.objects.all().order_by("id")
+    queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+    filter_backends = [KeysetOrderingFilter, PriceRangeFilter]
+    ordering_fields = ["id", "price", "name"]
+    ordering = ["id"]
+    top_limit = 10
+    max_top_limit = 100
+
+    @action(detail=False, url_path="top", filter_backends=[], pagination_class=None)
+    def top(self, request):
+        """
+        Returns the best-selling products ranked by sold quantity.
+
+        Reads the precomputed sales counters, so the ranking is an index
+        scan rather than an aggregation over order items.
+        """
+        limit = self.get_top_limit(request)
+        counters = ProductSales.objects.select_related("product").order_by(
+            "-quantity", "product"
+        )[:limit]
+        return Response(TopProductSerializer(counters, many=True).data)
+
+    def get_top_limit(self, request) -> int:
+        """
+        Reads the number of products to return from the `limit` query
+        parameter.
+
+        :param request: The current request.
+        :return: The number of products, capped at `max_top_limit`.
+        :raises ValidationError: If the limit is not a positive integer.
+        """
+        value = request.query_params.get("limit", self.top_limit)
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            limit = 0
+        if limit < 1:
+            raise ValidationError({"limit": "Введите положительное целое число."})
+        return min(limit, self.max_top_limit)
+
+
+@require_safe
+def catalog_snapshot(request, name: str = CURRENT_NAME):
+    """
+    Serves the catalog snapshot files like the web server does in
+    production: the precompressed copy the client accepts, the version as
+    a strong ETag, and versioned files as immutable. Used in DEBUG only.
+
+    :param request: The current request.
+    :param name: `catalog.json` or `catalog.<version>.json`.
+    :return: The snapshot, or 304 if the client has this version.
+    """
+    match = _SNAPSHOT_NAME.match(name)
+    version = match and (match["version"] or current_version())
+    if not version:
+        raise Http404("Каталог еще не опубликован.")
+    etag = f'"{version}"'
+    if request.headers.get("If-None-Match") == etag:
+        return HttpResponseNotModified(headers={"ETag": etag})
+    path = Path(settings.CATALOG_SNAPSHOT_ROOT) / name
+    accepted = request.headers.get("Accept-Encoding", "")
+    encodings = [("br", ".br"), ("gzip", ".gz"), (None, "")]
+    for encoding, suffix in encodings:
+        if (encoding is None or encoding in accepted) and path.with_name(name + suffix).exists():
+            break
+    else:
+        raise Http404("Каталог еще не опубликован.")
+    response = FileResponse(
+        open(path.with_name(name + suffix), "rb"), content_type="application/json"
+    )
+    if encoding is not None:
+        response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = (
+        "public, max-age=31536000, immutable" if match["version"] else "no-cache"
+    )
+    return response
@@ -0,0 +1,53 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import Serializer
+
+from .fast_json import dumps, loads
+
+
+def read_json(request: HttpRequest) -> object:
+    """
+    Parses the JSON body of a request.
+
+    :param request: The request.
+    :return: The decoded body.
+    :raises ValueError: If the body is not valid JSON.
+    """
+    return loads(request.body or b"null")
+
+
+def json_response(data, status: int = 200, **kwargs) -> HttpResponse:
+    """
+    Encodes a response body the same way as the API renderer.
+
+    :param data: The response data.
+    :param status: The status code.
+    :param kwargs: Extra arguments of `HttpResponse`, e.g. `headers`.
+    :return: The JSON response.
+    """
+    return HttpResponse(dumps(data), content_type="application/json", status=status, **kwargs)
+
+
+def bad_request(detail) -> HttpResponse:
+    if isinstance(detail, str):
+        detail = {"detail": detail}
+    return json_response(detail, status=400)
+
+
+@sync_to_async
+def save_serializer(serializer: Serializer, **save_kwargs) -> tuple[object | None, object]:
+    """
+    Validates and saves a serializer in a worker thread, as Django has no
+    async transactions, and renders the result there too.
+
+    :param serializer: The bound serializer.
+    :param save_kwargs: Extra arguments for `serializer.save`.
+    :return: The saved instance and its data, or None and the errors.
+    """
+    try:
+        serializer.is_valid(raise_exception=True)
+        instance = serializer.save(**save_kwargs)
+    except ValidationError as error:
+        return None, error.detail
+    return instance, serializer.data
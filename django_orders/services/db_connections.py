@@ -0,0 +1,48 @@
+"""
+Management of the database connections and pools of a process. The
+connection settings themselves are built by `django_orders.database`.
+"""
+
+from django.db import connections
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns the state of the connection pools opened by this process.
+
+    :return: The pool statistics of psycopg by database alias.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.settings_dict["OPTIONS"].get("pool") and connection.pool is not None:
+            stats[alias] = connection.pool.get_stats()
+    return stats
+
+
+def release_connections() -> None:
+    """
+    Releases the connections of the current thread after work done
+    outside the request cycle: expired or broken connections are closed
+    and pooled ones go back to the pool. Connections inside a transaction
+    are left alone.
+
+    :return: None
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+def close_pools() -> None:
+    """
+    Closes the connections and pools of this process, e.g. before forking
+    workers that must not share sockets with the parent.
+
+    :return: None
+    """
+    connections.close_all()
+    for alias in connections:
+        connection = connections[alias]
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            connection.close_pool()
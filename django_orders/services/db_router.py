@@ -0,0 +1,91 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_pinned: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def read_replica() -> str:
+    """
+    Picks the database for a read that tolerates replication lag.
+
+    :return: A random replica alias from `DATABASE_REPLICAS`, or the
+     primary if none is configured or the current request has written.
+    """
+    if not settings.DATABASE_REPLICAS or _pinned.get():
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """
+    Routes the ORM reads made inside the block to a replica.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def request_scope() -> Iterator[None]:
+    """
+    Starts a unit of work that is not pinned to the primary. Writes made
+    inside the block pin its remaining reads to the primary.
+    """
+    token = _pinned.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads made under `replica_reads` to the replicas and all writes
+    to the primary.
+
+    After a write, reads go to the primary until the end of the request,
+    so a request always sees its own changes. Requests that follow may
+    still read stale data from a lagging replica.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if _replica_reads.get():
+            return read_replica()
+        return None
+
+    def db_for_write(self, model, **hints) -> str:
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serves the safe methods of a DRF view from a replica.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,232 @@
+import csv
+import datetime
+import io
+import json
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from .db_router import read_replica
+
+EXPORT_FORMATS: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def day_bounds(
+    date_from: datetime.date | None, date_to: datetime.date | None
+) -> tuple[datetime.datetime | None, datetime.datetime | None]:
+    """
+    Converts an inclusive range of days into a half-open range of aware
+    datetimes that can be matched against an index.
+
+    :param date_from: The first day of the range.
+    :param date_to: The last day of the range, inclusive.
+    :return: The start of the first day and the start of the day after
+     the last one.
+    """
+
+    def start_of_day(day: datetime.date) -> datetime.datetime:
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+    start = start_of_day(date_from) if date_from else None
+    end = start_of_day(date_to + datetime.timedelta(days=1)) if date_to else None
+    return start, end
+
+
+class LineEncoder:
+    """
+    Encodes CSV rows and NDJSON records into text lines, one at a time.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+
+    def csv_line(self, values: Iterable) -> str:
+        """
+        Encodes values as one CSV line.
+
+        :param values: The values of the row.
+        :return: The encoded line including the line break.
+        """
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._csv.writerow(values)
+        return self._buffer.getvalue()
+
+    @staticmethod
+    def ndjson_line(record: dict) -> str:
+        """
+        Encodes a record as one NDJSON line.
+
+        :param record: The record to encode.
+        :return: The encoded line including the line break.
+        """
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class BaseExporter(ABC):
+    """
+    Abstract base class for exporting a model as CSV or NDJSON lines.
+
+    Objects are read with a server-side cursor in chunks, so memory use
+    does not depend on the size of the export. Subclasses describe the
+    queryset and how one object is turned into records.
+    """
+
+    csv_header: list[str] = []
+
+    def __init__(self, export_format: str, chunk_size: int = 2000) -> None:
+        """
+        Initializes the exporter.
+
+        :param export_format: One of the keys of `EXPORT_FORMATS`.
+        :param chunk_size: The number of objects fetched per round trip.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        self.export_format = export_format
+        self.chunk_size = chunk_size
+        self.encoder = LineEncoder()
+        self.using = read_replica()
+
+    @property
+    def content_type(self) -> str:
+        return EXPORT_FORMATS[self.export_format]
+
+    @abstractmethod
+    def get_queryset(self) -> QuerySet:
+        pass
+
+    @abstractmethod
+    def to_record(self, obj) -> dict:
+        """
+        Converts an object into a nested NDJSON record.
+        """
+
+    @abstractmethod
+    def to_csv_rows(self, obj) -> Iterable[list]:
+        """
+        Converts an object into one or more flat CSV rows.
+        """
+
+    def iter_objects(self) -> Iterator:
+        queryset = self.get_queryset().using(self.using)
+        return queryset.iterator(chunk_size=self.chunk_size)
+
+    def iter_chunks(self, chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Yields the export as encoded blocks of roughly `chunk_bytes`, so a
+        streamed response is not written one short line at a time.
+        """
+        block: list[str] = []
+        size = 0
+        for line in self.iter_lines():
+            block.append(line)
+            size += len(line)
+            if size >= chunk_bytes:
+                yield "".join(block).encode()
+                block.clear()
+                size = 0
+        if block:
+            yield "".join(block).encode()
+
+    async def aiter_chunks(self, chunk_bytes: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Yields the blocks of `iter_chunks` to an ASGI response, which would
+        otherwise read a sync iterator whole before sending it. Every block
+        is built in the thread of the other sync code of the request, so
+        the database cursor stays on one connection.
+        """
+        chunks = self.iter_chunks(chunk_bytes)
+        next_chunk = sync_to_async(next)
+        try:
+            while (chunk := await next_chunk(chunks, None)) is not None:
+                yield chunk
+        finally:
+            # Closes the server-side cursor if the client went away.
+            await sync_to_async(chunks.close)()
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Yields the export line by line.
+        """
+        if self.export_format == "csv":
+            yield self.encoder.csv_line(self.csv_header)
+            for obj in self.iter_objects():
+                for row in self.to_csv_rows(obj):
+                    yield self.encoder.csv_line(row)
+        else:
+            for obj in self.iter_objects():
+                yield self.encoder.ndjson_line(self.to_record(obj))
+
+
+class BaseExportView(APIView):
+    """
+    Streams an export over HTTP without buffering the response, from a
+    sync iterator under WSGI and from an async one under ASGI.
+
+    Query parameters:
+    - export_format: "csv" (default) or "ndjson".
+    - date_from, date_to: Inclusive range of order creation days.
+    - after_id: Export only objects with a greater ID. Rows are sorted by
+      ID, so an interrupted download is resumed by passing the last
+      received ID.
+    """
+
+    exporter_class: type[BaseExporter]
+    filename: str
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            choices = ", ".join(EXPORT_FORMATS)
+            raise ValidationError({"export_format": f"Выберите одно из: {choices}."})
+        created_from, created_to = day_bounds(
+            self.parse_date(request, "date_from"), self.parse_date(request, "date_to")
+        )
+        exporter = self.exporter_class(
+            export_format,
+            created_from=created_from,
+            created_to=created_to,
+            after_id=self.parse_after_id(request),
+        )
+        if isinstance(request._request, ASGIRequest):
+            chunks = exporter.aiter_chunks()
+        else:
+            chunks = exporter.iter_chunks()
+        response = StreamingHttpResponse(chunks, content_type=exporter.content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.filename}.{export_format}"'
+        )
+        return response
+
+    @staticmethod
+    def parse_date(request, param: str) -> datetime.date | None:
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({param: "Введите дату в формате ГГГГ-ММ-ДД."})
+
+    @staticmethod
+    def parse_after_id(request) -> int | None:
+        value = request.query_params.get("after_id")
+        if value is None:
+            return None
+        if not value.isdigit():
+            raise ValidationError({"after_id": "Введите целое неотрицательное число."})
+        return int(value)
@@ -4,9 +4,10 @@ import time
 from abc import ABC, abstractmethod
 
 import requests
+from django.conf import settings
 
-from django_orders import settings
 from orders.serializers import OrderSerializer
+from .metrics import track_external
 
 
 class BaseExternalRequestManager(ABC):
@@ -57,9 +58,14 @@ class OrderAdminRequest(BaseExternalRequestManager):
         Sends a POST request with order data to the external service.
         Attempts the request up to 3 times if it fails. Returns True
         if the request succeeds (i.e., status code starts with '20'),
-        otherwise returns False.
+        otherwise returns False. The call is timed as the
+        `order_webhook` external service.
         """
         order_data = self.build_json_object()
+        with track_external("order_webhook"):
+            return self._post(order_data)
+
+    def _post(self, order_data: dict) -> bool:
         # Imitation request processing
         random_request_time = round(random.random(), 2)
         time.sleep(random_request_time)
@@ -76,3 +82,4 @@ class OrderAdminRequest(BaseExternalRequestManager):
                 print(f"Request failed: {e}")
                 attempts -= 1
         return False
+
@@ -0,0 +1,84 @@
+"""
+JSON encoding and decoding of API payloads backed by orjson, if it is
+installed, with a fallback to the stdlib `json` module.
+
+Both backends encode `Decimal`, `datetime`, lazy translation strings and
+the other types DRF supports the same way as DRF's own encoder, except
+that orjson keeps the microseconds of datetimes.
+"""
+
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+ORJSON_OPTIONS: int = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+_encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(data) -> bytes:
+    """
+    Encodes data as compact UTF-8 JSON.
+
+    :param data: The data to encode.
+    :return: The JSON document.
+    """
+    if orjson is None:
+        return _encoder.encode(data).encode()
+    return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+
+
+def loads(content: bytes | str):
+    """
+    Decodes a JSON document.
+
+    :param content: The JSON document.
+    :return: The decoded data.
+    :raises ValueError: If the document is not valid JSON.
+    """
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders API responses with `dumps`. Indented output, e.g. for the
+    browsable API, is left to DRF's renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like DRF does, the line separators are invalid in JavaScript.
+        return (
+            dumps(data)
+            .replace(b"\xe2\x80\xa8", b"\\u2028")
+            .replace(b"\xe2\x80\xa9", b"\\u2029")
+        )
+
+
+class FastJSONParser(JSONParser):
+    """
+    Parses JSON request bodies with `loads`.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
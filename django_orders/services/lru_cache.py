@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+registered_caches: dict[str, "LRUCache"] = {}
+
+
+class LRUCache:
+    """
+    A thread-safe in-process cache bounded by size and entry age.
+
+    The least recently used entry is evicted when the cache is full and
+    entries expire `ttl` seconds after they were stored. Every process
+    has its own copy, so `ttl` also bounds how long another process may
+    serve an entry that was invalidated here. `None` cannot be cached,
+    it marks a miss.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        registered_caches[name] = self
+
+    def get(self, key: Hashable):
+        """
+        Returns a cached value and marks it as recently used.
+
+        :param key: The key of the entry.
+        :return: The value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns the usage of the cache since it was created or cleared.
+
+        :return: The hits, misses, evictions, current size and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
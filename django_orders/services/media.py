@@ -0,0 +1,72 @@
+"""
+Serving of uploaded media.
+
+Files named by content hash (see `services.storage`) are sent with
+`Cache-Control: immutable` and their hash as ETag. How the bytes are sent
+is set by `MEDIA_SERVING`:
+
+- "django": Django streams the file with `FileResponse`, which WSGI
+  servers that provide `wsgi.file_wrapper` (gunicorn, uWSGI) send with
+  `sendfile()`. The development server's wsgiref wrapper has no
+  `sendfile()` and copies the file in blocks through Python, which is
+  fine for development only;
+- "x-accel-redirect": nginx sends the file from the internal location
+  `MEDIA_ACCEL_PREFIX`;
+- "x-sendfile": Apache or lighttpd send the file from its path.
+"""
+
+import mimetypes
+import posixpath
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+
+from .storage import hashed_digest
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Files stored under their original name may be replaced.
+REVALIDATE = "public, max-age=3600"
+
+
+def content_type(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+@require_safe
+def serve_media(request, path: str):
+    """
+    Serves a file from `MEDIA_ROOT`. With `MEDIA_SERVING = "django"` the
+    file is sent with `sendfile()` only by servers that support it, not
+    by `runserver`.
+
+    :param request: The current request.
+    :param path: The name of the file in the storage.
+    :return: The file, a response handing it to the web server, or 304
+     if the client has this version.
+    :raises Http404: If the file does not exist.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    if not full_path.is_file():
+        raise Http404("Файл не найден.")
+    digest = hashed_digest(path)
+    etag = f'"{digest}"' if digest else None
+    if etag is not None and request.headers.get("If-None-Match") == etag:
+        return HttpResponseNotModified(headers={"ETag": etag, "Cache-Control": IMMUTABLE})
+
+    serving = settings.MEDIA_SERVING
+    if serving == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type(path))
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + path
+    elif serving == "x-sendfile":
+        response = HttpResponse(content_type=content_type(path))
+        response["X-Sendfile"] = str(full_path)
+    else:
+        response = FileResponse(full_path.open("rb"))
+    response["Cache-Control"] = IMMUTABLE if digest else REVALIDATE
+    if etag is not None:
+        response["ETag"] = etag
+    return response
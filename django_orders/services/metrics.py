@@ -0,0 +1,272 @@
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+
+from django_orders.tracing import span
+from .db_connections import pool_stats
+from .lru_cache import registered_caches
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+@dataclass
+class RequestStats:
+    """
+    Resource usage collected while a sampled request is handled.
+
+    Attributes:
+    - queries: The number of executed database queries.
+    - db_time: The time spent in the database, in seconds.
+    - external_time: The time spent in external requests, in seconds.
+    """
+
+    queries: int = 0
+    db_time: float = 0.0
+    external_time: float = 0.0
+
+
+current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """
+    A cumulative histogram with fixed upper bounds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float, weight: float = 1) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += weight
+        self.sum += value * weight
+
+    @property
+    def count(self) -> float:
+        return sum(self.counts)
+
+
+class MetricsRegistry:
+    """
+    Keeps per-process counters and histograms and renders them in the
+    Prometheus text exposition format.
+
+    Each worker process has its own registry, so the endpoint must be
+    scraped per worker.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, Histogram]] = {}
+        self._help: dict[str, str] = {}
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, labels: tuple, value: float = 1) -> None:
+        """
+        Increases a counter.
+
+        :param name: The metric name.
+        :param labels: `(label, value)` pairs of the series.
+        :param value: The amount to add.
+        :return: None
+        """
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: tuple, value: float, weight: float = 1) -> None:
+        """
+        Records a value in a histogram.
+
+        :param name: The metric name.
+        :param labels: `(label, value)` pairs of the series.
+        :param value: The observed value.
+        :param weight: The number of observations the value stands for.
+        :return: None
+        """
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value, weight)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """
+        Renders all metrics in the Prometheus text format.
+
+        :return: The exposition text.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        bucket_labels = format_labels(labels + (("le", bound),))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative:g}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{format_labels(labels)} {cumulative:g}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list[str], name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "Request latency by route.")
+registry.describe("http_requests_total", "Handled requests by route and status.")
+registry.describe("db_queries_total", "Database queries by route.")
+registry.describe("db_query_duration_seconds_total", "Time spent in the database by route.")
+registry.describe("external_request_seconds_total", "Time spent in external requests by route.")
+registry.describe("external_request_duration_seconds", "External request latency by service.")
+registry.describe(
+    "db_connections_opened_total", "Database connections opened or taken from a pool."
+)
+
+
+def count_connection(sender, connection, **kwargs) -> None:
+    registry.inc("db_connections_opened_total", (("database", connection.alias),))
+
+
+connection_created.connect(count_connection, dispatch_uid="metrics_count_connection")
+
+
+def render_pools() -> str:
+    """
+    Renders the state of the connection pools of this process as gauges,
+    e.g. `db_pool_pool_available` and `db_pool_requests_waiting`.
+
+    :return: The exposition text, empty without pooling.
+    """
+    gauges: dict[str, list[str]] = {}
+    for alias, stats in sorted(pool_stats().items()):
+        for key, value in sorted(stats.items()):
+            gauges.setdefault(f"db_pool_{key}", []).append(
+                f"db_pool_{key}{format_labels((('database', alias),))} {value}"
+            )
+    lines = []
+    for name, series in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(series)
+    return "".join(f"{line}\n" for line in lines)
+
+
+@contextmanager
+def track_external(service: str) -> Iterator[None]:
+    """
+    Measures a call to an external service. The time is recorded per
+    service and added to the stats of the current request, if sampled,
+    and to its trace as an `external.<service>` span.
+
+    :param service: The name of the external service.
+    """
+    started = time.perf_counter()
+    try:
+        with span(f"external.{service}"):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.observe("external_request_duration_seconds", (("service", service),), elapsed)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.external_time += elapsed
+
+
+def render_caches() -> str:
+    """
+    Renders the usage of the in-process caches, e.g.
+    `cache_hit_rate{cache="products"}`.
+
+    :return: The exposition text.
+    """
+    kinds = {
+        "hits": "counter",
+        "misses": "counter",
+        "evictions": "counter",
+        "size": "gauge",
+        "hit_rate": "gauge",
+    }
+    stats = {name: cache.stats() for name, cache in sorted(registered_caches.items())}
+    lines = []
+    for key, kind in kinds.items():
+        name = f"cache_{key}_total" if kind == "counter" else f"cache_{key}"
+        lines.append(f"# TYPE {name} {kind}")
+        for cache, values in stats.items():
+            lines.append(f"{name}{format_labels((('cache', cache),))} {values[key]:g}")
+    return "".join(f"{line}\n" for line in lines) if stats else ""
+
+
+def scrape_allowed(request: HttpRequest) -> bool:
+    """
+    Checks that a client may read the metrics. With `METRICS_TOKEN` set
+    the client must send it as `Authorization: Bearer <token>`, otherwise
+    its address must be listed in `METRICS_ALLOWED_IPS`. Behind a proxy
+    on the same host every client has a local address, so the token is
+    needed there.
+
+    :param request: The scrape request.
+    :return: True if the client may read the metrics.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        sent = request.headers.get("Authorization", "")
+        return hmac.compare_digest(sent.encode(), f"Bearer {token}".encode())
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Exposes the collected metrics, the connection pool state and the cache
+    usage in the Prometheus text format to the clients allowed by
+    `scrape_allowed`.
+
+    :param request: The scrape request.
+    :return: The metrics, or 403 for other clients.
+    """
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render() + render_pools() + render_caches(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,214 @@
+import logging
+import random
+import re
+import time
+import uuid
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from django_orders.tracing import Trace, current_trace, span
+from .db_router import request_scope
+from .metrics import RequestStats, current_stats, registry
+from .query_budget import normalize_sql
+
+trace_logger = logging.getLogger("tracing")
+
+# Request IDs accepted from the client or a proxy in X-Request-ID.
+_REQUEST_ID = re.compile(r"^[\w.:-]{1,128}$")
+
+
+class PrimaryPinningMiddleware:
+    """
+    Scopes the primary pinning of `ReplicaRouter` to a request: reads go
+    back to the replicas when the next request starts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_scope():
+            return await self.get_response(request)
+
+
+class TracingMiddleware:
+    """
+    Traces a sample of requests: database queries and the code marked
+    with `span()` or `traced()` are timed and the trace is logged as JSON
+    by the `tracing` logger.
+
+    The share of traced requests is set by `TRACING_SAMPLE_RATE`, 0 turns
+    tracing off. A traced request keeps the ID sent in `X-Request-ID` or
+    gets a new one, returned in the same header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        trace = Trace(self.request_id(request))
+        token = current_trace.set(trace)
+        response = None
+        try:
+            with self.wrap_connections():
+                response = self.get_response(request)
+        finally:
+            current_trace.reset(token)
+            self.finish(request, response, trace)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        trace = Trace(self.request_id(request))
+        token = current_trace.set(trace)
+        response = None
+        try:
+            with self.wrap_connections():
+                response = await self.get_response(request)
+        finally:
+            current_trace.reset(token)
+            self.finish(request, response, trace)
+        return response
+
+    @staticmethod
+    def sampled() -> bool:
+        rate = settings.TRACING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def request_id(request) -> str:
+        request_id = request.headers.get("X-Request-ID", "")
+        return request_id if _REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+    def wrap_connections(self) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self.trace_query))
+        return stack
+
+    @staticmethod
+    def trace_query(execute, sql, params, many, context):
+        # Statements are logged without their parameters.
+        with span("db.query", database=context["connection"].alias, sql=normalize_sql(sql)):
+            return execute(sql, params, many, context)
+
+    @staticmethod
+    def finish(request, response, trace: Trace) -> None:
+        match = request.resolver_match
+        fields = {
+            "method": request.method,
+            "route": match.route if match is not None else "unmatched",
+            "status": response.status_code if response is not None else 500,
+        }
+        if response is not None:
+            response["X-Request-ID"] = trace.request_id
+        trace_logger.info("trace", extra={"trace": trace.to_dict(**fields)})
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database usage and external request time per route
+    for a sample of requests.
+
+    The share of measured requests is set by `METRICS_SAMPLE_RATE`;
+    requests that are not sampled pass through untouched. Every sampled
+    request is counted as `1 / METRICS_SAMPLE_RATE` requests, so the
+    counters and histograms estimate the totals of all requests. Routes are
+    labelled by their URL pattern, so the number of series stays
+    bounded. Works in both sync and async middleware chains.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with self.wrap_connections():
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with self.wrap_connections():
+                response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def wrap_connections(self) -> ExitStack:
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self.count_query))
+        return stack
+
+    @staticmethod
+    def count_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats = current_stats.get()
+            if stats is not None:
+                stats.queries += 1
+                stats.db_time += time.perf_counter() - started
+
+    @staticmethod
+    def record(request, response, stats: RequestStats, elapsed: float) -> None:
+        match = request.resolver_match
+        route = match.route if match is not None else "unmatched"
+        labels = (("method", request.method), ("route", route))
+        weight = 1 / settings.METRICS_SAMPLE_RATE
+        registry.observe("http_request_duration_seconds", labels, elapsed, weight)
+        registry.inc("http_requests_total", labels + (("status", response.status_code),), weight)
+        registry.inc("db_queries_total", labels, stats.queries * weight)
+        registry.inc("db_query_duration_seconds_total", labels, stats.db_time * weight)
+        registry.inc("external_request_seconds_total", labels, stats.external_time * weight)
@@ -0,0 +1,252 @@
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)")
+
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    The allowed cost of one call.
+
+    Attributes:
+    - max_queries: The maximum number of database queries.
+    - max_seconds: The maximum wall time, or None for no limit.
+    """
+
+    max_queries: int
+    max_seconds: float | None = None
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Replaces literals in a statement with placeholders, so statements
+    that differ only in their parameters compare equal.
+
+    :param sql: The executed SQL.
+    :return: The statement shape.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def added_statements(baseline: Iterable[str], queries: Iterable[str]) -> list[str]:
+    """
+    Lists the statement shapes executed more often than in the baseline.
+
+    :param baseline: The SQL of the reference run.
+    :param queries: The SQL of the checked run.
+    :return: One line per added shape with the number of extra runs.
+    """
+    extra = Counter(map(normalize_sql, queries)) - Counter(map(normalize_sql, baseline))
+    return [f"+{count} x {sql}" for sql, count in extra.most_common()]
+
+
+class QueryBudget(ContextDecorator):
+    """
+    Fails when the wrapped block runs more queries, on any database,
+    or takes longer than its budget. Usable as a context manager or as
+    a decorator.
+
+    After the block, `queries` holds the executed SQL and `elapsed` the
+    wall time.
+    """
+
+    def __init__(
+        self,
+        max_queries: int,
+        max_seconds: float | None = None,
+        label: str = "",
+        baseline: Iterable[str] = (),
+    ) -> None:
+        self.budget = Budget(max_queries, max_seconds)
+        self.label = label
+        self.baseline = list(baseline)
+        self.queries: list[str] = []
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "QueryBudget":
+        self._stack = ExitStack()
+        self._captures = [
+            self._stack.enter_context(CaptureQueriesContext(connection))
+            for connection in connections.all()
+        ]
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.elapsed = time.perf_counter() - self._started
+        self._stack.close()
+        self.queries = [
+            query["sql"] for capture in self._captures for query in capture.captured_queries
+        ]
+        if exc_type is None:
+            self.check()
+
+    def check(self) -> None:
+        """
+        Raises `QueryBudgetExceeded` describing every exceeded limit.
+
+        :return: None
+        """
+        problems = []
+        if len(self.queries) > self.budget.max_queries:
+            problems.append(
+                f"{len(self.queries)} queries, budget is {self.budget.max_queries}"
+            )
+        if self.budget.max_seconds is not None and self.elapsed > self.budget.max_seconds:
+            problems.append(
+                f"{self.elapsed:.3f}s, budget is {self.budget.max_seconds}s"
+            )
+        if not problems:
+            return
+        if self.baseline:
+            details = "Added statements:\n" + "\n".join(
+                added_statements(self.baseline, self.queries)
+            )
+        else:
+            details = "Executed statements:\n" + "\n".join(
+                f"{number}. {sql}" for number, sql in enumerate(self.queries, 1)
+            )
+        label = f"{self.label}: " if self.label else ""
+        raise QueryBudgetExceeded(f"{label}{'; '.join(problems)}.\n{details}")
+
+
+def query_budget(max_queries: int, max_seconds: float | None = None, label: str = ""):
+    """
+    Creates a budget for use as a decorator or a context manager.
+
+    :param max_queries: The maximum number of database queries.
+    :param max_seconds: The maximum wall time in seconds.
+    :param label: The name of the checked call in failure messages.
+    :return: A `QueryBudget`.
+    """
+    return QueryBudget(max_queries, max_seconds, label)
+
+
+def assert_scaling_budget(
+    run: Callable[[int], object],
+    sizes: Iterable[int],
+    budget: Budget,
+    label: str = "",
+    constant: bool = True,
+) -> list[int]:
+    """
+    Runs a call for several payload sizes and checks each run against
+    the budget. Runs after the first are compared with the first one,
+    so statements repeated per item are reported as added.
+
+    :param run: Performs the call for the given payload size.
+    :param sizes: The payload sizes, smallest first.
+    :param budget: The budget every run must fit.
+    :param label: The name of the checked call in failure messages.
+    :param constant: Whether larger payloads must not run more queries
+     than the smallest one.
+    :return: The number of queries of each run.
+    """
+    counts = []
+    baseline: list[str] = []
+    for size in sizes:
+        max_queries = budget.max_queries
+        if baseline and constant:
+            max_queries = min(max_queries, len(baseline))
+        with QueryBudget(
+            max_queries,
+            budget.max_seconds,
+            label=f"{label} [size={size}]",
+            baseline=baseline,
+        ) as checked:
+            run(size)
+        if not baseline:
+            baseline = checked.queries
+        counts.append(len(checked.queries))
+    return counts
+
+
+class BudgetedClient:
+    """
+    Wraps a Django test client and checks every request against the
+    budget declared for its URL name and method.
+
+    :param client: The test client to send requests with.
+    :param budgets: Budgets keyed by `(method, url_name)`.
+    """
+
+    def __init__(self, client, budgets: dict[tuple[str, str], Budget]) -> None:
+        self.client = client
+        self.budgets = budgets
+
+    def budget_for(self, method: str, path: str) -> tuple[str, Budget]:
+        url_name = resolve(path.split("?")[0]).view_name
+        key = (method.upper(), url_name)
+        if key not in self.budgets:
+            raise QueryBudgetExceeded(f"No budget declared for {key}.")
+        return f"{key[0]} {url_name}", self.budgets[key]
+
+    def request(self, method: str, path: str, *args, **kwargs):
+        """
+        Sends a request and checks it against its budget. A streamed
+        response is read within the budget, as its queries run while it
+        is sent.
+
+        :param method: The HTTP method.
+        :param path: The requested path.
+        :return: The response.
+        """
+        label, budget = self.budget_for(method, path)
+        send = getattr(self.client, method.lower())
+        with QueryBudget(budget.max_queries, budget.max_seconds, label=label):
+            response = send(path, *args, **kwargs)
+            if response.streaming:
+                response.streaming_content = list(response.streaming_content)
+            return response
+
+    def get(self, path: str, *args, **kwargs):
+        return self.request("GET", path, *args, **kwargs)
+
+    def post(self, path: str, *args, **kwargs):
+        return self.request("POST", path, *args, **kwargs)
+
+    def check_sizes(
+        self,
+        method: str,
+        path: str,
+        make_data: Callable[[int], dict],
+        sizes: Iterable[int],
+        **kwargs,
+    ) -> list:
+        """
+        Sends one request per payload size and checks that the number of
+        queries does not grow with the payload.
+
+        :param method: The HTTP method.
+        :param path: The requested path.
+        :param make_data: Builds the request data for a payload size.
+        :param sizes: The payload sizes, smallest first.
+        :return: The responses.
+        """
+        label, budget = self.budget_for(method, path)
+        send = getattr(self.client, method.lower())
+        responses = []
+        assert_scaling_budget(
+            lambda size: responses.append(send(path, make_data(size), **kwargs)),
+            sizes,
+            budget,
+            label=label,
+        )
+        return responses
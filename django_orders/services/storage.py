@@ -0,0 +1,74 @@
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+# `<directory>/ab/cdef…(30 hex digits).<ext>`, see `ContentHashedStorage`.
+HASHED_NAME = re.compile(r"(?:^|/)(?P<digest>[0-9a-f]{2}/[0-9a-f]{30})(?:\.\w+)?$")
+
+
+def content_digest(content) -> str:
+    """
+    Hashes the content of a file in chunks.
+
+    :param content: The Django `File`.
+    :return: The first 32 hex digits of its SHA-256.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk.encode() if isinstance(chunk, str) else chunk)
+    return digest.hexdigest()[:32]
+
+
+def hashed_digest(name: str) -> str | None:
+    """
+    Returns the content hash a stored file is named after.
+
+    :param name: The name of the file in the storage.
+    :return: The hash, None for files stored under their original name.
+    """
+    match = HASHED_NAME.search(name)
+    return match["digest"].replace("/", "") if match else None
+
+
+class ContentHashedStorage(FileSystemStorage):
+    """
+    File system storage that names files after a hash of their content.
+
+    `uploads/photo.JPG` is stored as `uploads/ab/cdef….jpg`: the directory
+    and the extension are kept, the file name and any date subdirectories
+    are replaced. Identical uploads share one file, and a stored file
+    never changes, so it may be cached forever. Files are not removed when
+    a record using them is deleted, another record may use them too.
+    """
+
+    def get_available_name(self, name: str, max_length: int | None = None) -> str:
+        # An existing file with the same name has the same content.
+        return name
+
+    def _save(self, name: str, content) -> str:
+        name = self.hashed_name(name, content_digest(content))
+        if self.exists(name):
+            return name
+        # Written under a temporary name and moved into place, so a
+        # concurrent upload of the same content never sees a partial file.
+        temporary = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+    @staticmethod
+    def hashed_name(name: str, digest: str) -> str:
+        """
+        Builds the content-addressed name of a file.
+
+        :param name: The name requested by the field, e.g.
+         `uploads/2024/10/14/photo.jpg`.
+        :param digest: The content hash.
+        :return: The name in the storage, e.g. `uploads/ab/cdef….jpg`.
+        """
+        directory = name.split("/", 1)[0] if "/" in name else ""
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], digest[2:] + extension)
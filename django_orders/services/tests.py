@@ -1,7 +1,39 @@
+import datetime
+import importlib
+import io
+import json
+import logging
+import sys
+from decimal import Decimal
+
 import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.backends.signals import connection_created
 
+from django_orders.database import connection_settings
+from django_orders.tracing import JSONFormatter, Trace, current_trace, span, traced
 from orders.models import Order
 from . import OrderAdminRequest
+from .db_connections import release_connections
+from .fast_json import FastJSONParser, FastJSONRenderer, dumps, loads
+from .lru_cache import LRUCache, registered_caches
+from .paginators import EstimatedCountPaginator
+from .db_router import ReplicaRouter, replica_reads, request_scope
+from .metrics import MetricsRegistry, RequestStats, current_stats, registry, track_external
+from .query_budget import (
+    Budget,
+    QueryBudget,
+    QueryBudgetExceeded,
+    assert_scaling_budget,
+    normalize_sql,
+    query_budget,
+)
+from .storage import ContentHashedStorage, hashed_digest
+from .throttling import MemoryBucketStore, SQLiteBucketStore, bucket_store, take_token
 
 
 @pytest.mark.django_db
@@ -62,3 +94,610 @@ class TestOrderAdminRequest:
         request_handler = OrderAdminRequest(self.order_obj, url)
         result = request_handler.send_request()
         assert result is False
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, load_fixture, settings):
+        """Start every test with an empty registry and full sampling."""
+        load_fixture("products")
+        settings.METRICS_SAMPLE_RATE = 1.0
+        registry.reset()
+        yield
+        registry.reset()
+
+    def test_request_recorded_per_route(self, client):
+        """Test that latency, status and query count are recorded by URL pattern."""
+        client.get("/api/v1/products/")
+        client.get("/missing/")
+
+        text = client.get("/metrics/").content.decode()
+        list_labels = 'method="GET",route="^api/v1/products/$"'
+        assert f"http_request_duration_seconds_count{{{list_labels}}} 1" in text
+        assert f'http_requests_total{{{list_labels},status="200"}} 1' in text
+        assert "db_queries_total{" + list_labels + "} 1" in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+
+    def test_sampling_disabled(self, client, settings):
+        """Test that requests outside the sample are not recorded."""
+        settings.METRICS_SAMPLE_RATE = 0.0
+        client.get("/api/v1/products/")
+        assert "http_requests_total" not in registry.render()
+
+    def test_external_time_added_to_request(self):
+        """Test that external calls are timed per service and per request."""
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        try:
+            with track_external("webhook"):
+                pass
+        finally:
+            current_stats.reset(token)
+        assert stats.external_time > 0
+        assert 'external_request_duration_seconds_count{service="webhook"} 1' in registry.render()
+
+    def test_endpoint_is_local_only(self, client):
+        """Test that the metrics endpoint refuses non-local clients."""
+        response = client.get("/metrics/", REMOTE_ADDR="10.0.0.1")
+        assert response.status_code == 403
+
+    def test_endpoint_requires_token(self, client, settings):
+        """Test that with a token set, local clients must send it too."""
+        settings.METRICS_TOKEN = "secret"
+        assert client.get("/metrics/").status_code == 403
+        response = client.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong")
+        assert response.status_code == 403
+        response = client.get(
+            "/metrics/", REMOTE_ADDR="10.0.0.1", HTTP_AUTHORIZATION="Bearer secret"
+        )
+        assert response.status_code == 200
+
+    def test_endpoint_budget(self, client, budget_client):
+        """Test that rendering the metrics stays within its budget."""
+        client.get("/api/v1/products/")
+        response = budget_client.get("/metrics/")
+        assert response.status_code == 200
+
+    def test_sampled_requests_scaled(self, client, settings, monkeypatch):
+        """Test that a sampled request counts for the requests it stands for."""
+        settings.METRICS_SAMPLE_RATE = 0.25
+        monkeypatch.setattr("services.middleware.random.random", lambda: 0)
+        client.get("/api/v1/products/")
+        text = registry.render()
+        list_labels = 'method="GET",route="^api/v1/products/$"'
+        assert f'http_requests_total{{{list_labels},status="200"}} 4' in text
+        assert f"http_request_duration_seconds_count{{{list_labels}}} 4" in text
+        assert "db_queries_total{" + list_labels + "} 4" in text
+
+    def test_histogram_buckets_cumulative(self):
+        """Test that the rendered buckets are cumulative and end with +Inf."""
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5):
+            metrics.observe("latency", (), value)
+        text = metrics.render()
+        assert 'latency_bucket{le="0.1"} 1' in text
+        assert 'latency_bucket{le="1"} 2' in text
+        assert 'latency_bucket{le="+Inf"} 3' in text
+        assert "latency_count 3" in text
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    @staticmethod
+    def count_orders(times: int) -> None:
+        for _ in range(times):
+            Order.objects.count()
+
+    def test_within_budget(self):
+        """Test that the executed statements are kept for inspection."""
+        with QueryBudget(2) as budget:
+            self.count_orders(2)
+        assert len(budget.queries) == 2
+
+    def test_decorator_exceeded(self):
+        """Test that the decorator form fails when the budget is exceeded."""
+
+        @query_budget(1, label="count")
+        def run():
+            self.count_orders(2)
+
+        with pytest.raises(QueryBudgetExceeded, match="count: 2 queries, budget is 1"):
+            run()
+
+    def test_wall_time_exceeded(self, monkeypatch):
+        """Test that a slow block fails the time budget."""
+        ticks = iter((0.0, 5.0))
+        monkeypatch.setattr("services.query_budget.time.perf_counter", lambda: next(ticks))
+        with pytest.raises(QueryBudgetExceeded, match="5.000s, budget is 1"):
+            with QueryBudget(10, max_seconds=1):
+                pass
+
+    def test_scaling_reports_added_statements(self):
+        """Test that queries repeated per item are reported against the smallest run."""
+        with pytest.raises(QueryBudgetExceeded) as error:
+            assert_scaling_budget(self.count_orders, (1, 3), Budget(10), label="orders")
+        message = str(error.value)
+        assert "orders [size=3]: 3 queries, budget is 1" in message
+        assert '+2 x SELECT COUNT(*) AS "__count" FROM "orders_order"' in message
+
+    def test_normalize_sql(self):
+        """Test that statements differing only in literals have one shape."""
+        assert normalize_sql("SELECT 1 FROM t WHERE id IN (1, 2) AND name = 'x'") == (
+            "SELECT ? FROM t WHERE id IN (...) AND name = ?"
+        )
+
+
+@pytest.mark.django_db
+class TestReplicaRouter:
+    router = ReplicaRouter()
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, settings):
+        """Configure two replica aliases."""
+        settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+
+    @pytest.fixture
+    def picked(self, monkeypatch) -> list[str]:
+        """Record replica lookups while keeping every query on the test database."""
+        picked = []
+
+        def read_replica():
+            picked.append("replica1")
+            return "default"
+
+        monkeypatch.setattr("services.db_router.read_replica", read_replica)
+        monkeypatch.setattr("services.exports.read_replica", read_replica)
+        return picked
+
+    def test_reads_routed_only_inside_block(self):
+        """Test that only reads marked as replica-safe leave the primary."""
+        with request_scope():
+            assert self.router.db_for_read(Order) is None
+            with replica_reads():
+                assert self.router.db_for_read(Order) in ("replica1", "replica2")
+
+    def test_write_pins_request_to_primary(self):
+        """Test that reads after a write stay on the primary until the request ends."""
+        with request_scope(), replica_reads():
+            assert self.router.db_for_write(Order) == "default"
+            assert self.router.db_for_read(Order) == "default"
+        with request_scope(), replica_reads():
+            assert self.router.db_for_read(Order) != "default"
+
+    def test_without_replicas(self, settings):
+        """Test that reads stay on the primary when no replica is configured."""
+        settings.DATABASE_REPLICAS = []
+        with request_scope(), replica_reads():
+            assert self.router.db_for_read(Order) == "default"
+
+    def test_replicas_not_migrated(self):
+        """Test that migrations are applied to the primary only."""
+        assert self.router.allow_migrate("replica1", "orders") is False
+        assert self.router.allow_migrate("default", "orders") is None
+
+    def test_catalog_and_export_read_from_replica(self, admin_client, load_fixture, picked):
+        """Test that the product list and order exports use a replica."""
+        load_fixture("products")
+        assert admin_client.get("/api/v1/products/").status_code == 200
+        assert picked
+        picked.clear()
+        response = admin_client.get("/api/v1/export/orders/")
+        b"".join(response.streaming_content)
+        assert picked
+
+    def test_order_creation_uses_primary(self, client, load_fixture, picked):
+        """Test that writing endpoints do not read from a replica."""
+        load_fixture("products")
+        response = client.post(
+            "/api/v1/orders/",
+            {"orderitem": [{"product": 1, "quantity": 1}]},
+            content_type="application/json",
+        )
+        assert response.status_code == 201
+        assert not picked
+
+
+@pytest.mark.django_db
+class TestConnections:
+    pool = {"min_size": 1, "max_size": 4}
+
+    def test_persistent_connections(self):
+        """Test that connections are kept open and checked before reuse."""
+        config = connection_settings(
+            {"ENGINE": "django.db.backends.sqlite3"}, 60, True, self.pool
+        )
+        assert config["CONN_MAX_AGE"] == 60
+        assert config["CONN_HEALTH_CHECKS"] is True
+        assert "OPTIONS" not in config
+
+    def test_postgresql_pool(self):
+        """Test that pooled PostgreSQL connections are not also kept per thread."""
+        config = connection_settings(
+            {"ENGINE": "django.db.backends.postgresql", "OPTIONS": {}}, 60, True, self.pool
+        )
+        assert config["CONN_MAX_AGE"] == 0
+        assert config["OPTIONS"]["pool"] == self.pool
+
+    def test_pool_metrics(self, client, monkeypatch):
+        """Test that the pool state and opened connections are exposed."""
+        registry.reset()
+        monkeypatch.setattr(
+            "services.metrics.pool_stats",
+            lambda: {"default": {"pool_size": 4, "pool_available": 3}},
+        )
+        connection_created.send(sender=type(connection), connection=connection)
+
+        text = client.get("/metrics/").content.decode()
+        assert 'db_connections_opened_total{database="default"} 1' in text
+        assert "# TYPE db_pool_pool_available gauge" in text
+        assert 'db_pool_pool_available{database="default"} 3' in text
+        registry.reset()
+
+    def test_release_keeps_transaction(self):
+        """Test that a connection inside a transaction is not released."""
+        Order.objects.count()
+        release_connections()
+        assert connection.connection is not None
+        assert Order.objects.count() == 0
+
+
+class TestSettingsProfiles:
+    @pytest.fixture
+    def production(self, monkeypatch):
+        """Import the production profile as a separate module."""
+        monkeypatch.setenv("ALLOWED_HOSTS", "shop.example.com")
+        monkeypatch.delitem(sys.modules, "django_orders.settings.production", raising=False)
+        yield importlib.import_module("django_orders.settings.production")
+        sys.modules.pop("django_orders.settings.production", None)
+
+    def test_production_is_lean(self, production):
+        """Test that the production profile loads no debugging tools."""
+        assert production.DEBUG is False
+        assert production.ALLOWED_HOSTS == ["shop.example.com"]
+        assert "debug_toolbar" not in production.INSTALLED_APPS
+        assert not any("debug_toolbar" in path for path in production.MIDDLEWARE)
+        assert production.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] == [
+            "services.fast_json.FastJSONRenderer"
+        ]
+
+    def test_profile_selected_by_env(self, monkeypatch):
+        """Test that DJANGO_PROFILE selects the settings module."""
+        from django_orders import settings_module
+
+        monkeypatch.setenv("DJANGO_PROFILE", "production")
+        assert settings_module() == "django_orders.settings.production"
+        monkeypatch.delenv("DJANGO_PROFILE")
+        assert settings_module() == "django_orders.settings.development"
+
+
+class TestFastJSON:
+    @pytest.fixture(autouse=True, params=["orjson", "stdlib"])
+    def backend(self, request, monkeypatch):
+        """Run every test with orjson, if installed, and with the stdlib fallback."""
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr("services.fast_json.orjson", None)
+
+    def test_encodes_drf_types(self):
+        """Test that decimals, datetimes and lazy strings are encoded like DRF does."""
+        data = {
+            "cost": Decimal("12.50"),
+            "date": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "status": gettext_lazy("Оплачен"),
+            1: [None, True],
+        }
+        assert loads(dumps(data)) == {
+            "cost": 12.5,
+            "date": "2024-05-01T12:30:00Z",
+            "status": "Оплачен",
+            "1": [None, True],
+        }
+
+    def test_renderer_escapes_line_separators(self):
+        """Test that the output stays valid JavaScript."""
+        assert FastJSONRenderer().render({"name": "a\u2028b"}) == b'{"name":"a\\u2028b"}'
+
+    def test_parser(self):
+        """Test that request bodies are decoded and malformed ones rejected."""
+        parser = FastJSONParser()
+        assert parser.parse(io.BytesIO('{"name": "Товар"}'.encode())) == {"name": "Товар"}
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b"{"))
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, monkeypatch):
+        """Create five orders and count exactly up to two rows."""
+        Order.objects.bulk_create(Order() for _ in range(5))
+        monkeypatch.setattr(EstimatedCountPaginator, "exact_count_limit", 2)
+
+    def paginator(self) -> EstimatedCountPaginator:
+        return EstimatedCountPaginator(Order.objects.order_by("-id"), 2)
+
+    def test_exact_below_limit(self, monkeypatch):
+        """Test that small results are counted exactly."""
+        monkeypatch.setattr(EstimatedCountPaginator, "exact_count_limit", 10)
+        assert self.paginator().count == 5
+
+    def test_capped_without_estimate(self):
+        """Test that the count stops past the limit when no estimate is available."""
+        paginator = self.paginator()
+        assert paginator.count == 3
+        assert paginator.num_pages == 2
+
+    def test_planner_estimate(self, monkeypatch):
+        """Test that large results are counted by the planner estimate."""
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+        monkeypatch.setattr(
+            "django.db.models.QuerySet.explain",
+            lambda queryset, format: '{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 50000000}}',
+        )
+        paginator = self.paginator()
+        assert paginator.count == 50_000_000
+        assert paginator.num_pages == 25_000_000
+        assert len(paginator.page(2).object_list) == 2
+
+
+class TestLRUCache:
+    @pytest.fixture
+    def cache(self):
+        """A two-entry cache that is unregistered afterwards."""
+        yield LRUCache("test", maxsize=2, ttl=60)
+        registered_caches.pop("test")
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the entry unused for longest goes first."""
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+        assert cache.stats() == {
+            "hits": 3, "misses": 1, "evictions": 1, "size": 2, "hit_rate": 0.75,
+        }
+
+    def test_entries_expire(self, cache, monkeypatch):
+        """Test that entries are not served after their TTL."""
+        now = [1000.0]
+        monkeypatch.setattr("services.lru_cache.time.monotonic", lambda: now[0])
+        cache.set("a", 1)
+        now[0] += 59
+        assert cache.get("a") == 1
+        now[0] += 1
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_stats_exposed(self, cache, client):
+        """Test that the metrics endpoint reports the cache usage."""
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        text = client.get("/metrics/").content.decode()
+        assert 'cache_hits_total{cache="test"} 1' in text
+        assert 'cache_hit_rate{cache="test"} 0.5' in text
+        assert 'cache_size{cache="products"} 0' in text
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    @pytest.fixture(params=["memory", "sqlite"])
+    def store(self, request, tmp_path):
+        if request.param == "memory":
+            return MemoryBucketStore()
+        return SQLiteBucketStore(str(tmp_path / "throttle.sqlite3"))
+
+    def test_take_token(self):
+        """Test that a bucket allows a burst and then refills at the rate."""
+        state = None
+        for _ in range(3):
+            tokens, wait = take_token(state, 100.0, capacity=3, rate=0.5)
+            assert wait == 0
+            state = (tokens, 100.0)
+        assert take_token(state, 100.0, capacity=3, rate=0.5) == (0.0, 2.0)
+        assert take_token(state, 101.0, capacity=3, rate=0.5) == (0.5, 1.0)
+        assert take_token(state, 102.0, capacity=3, rate=0.5) == (0.0, 0.0)
+
+    def test_store_limits_per_key(self, store):
+        """Test that stores refuse a key over its limit and keep other keys apart."""
+        assert [store.take("a", 2, 0.01) for _ in range(2)] == [0, 0]
+        assert store.take("a", 2, 0.01) == pytest.approx(100, rel=0.01)
+        assert store.take("b", 2, 0.01) == 0
+        store.clear()
+        assert store.take("a", 2, 0.01) == 0
+
+    def test_sqlite_store_shared(self, tmp_path):
+        """Test that stores of different workers on one file share the buckets."""
+        path = str(tmp_path / "throttle.sqlite3")
+        first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+        assert first.take("a", 1, 0.01) == 0
+        assert second.take("a", 1, 0.01) > 0
+
+    def test_full_buckets_dropped(self, monkeypatch):
+        """Test that the memory store forgets buckets that refilled."""
+        now = [1000.0]
+        monkeypatch.setattr("services.throttling.time.monotonic", lambda: now[0])
+        store = MemoryBucketStore()
+        store.sweep_every = 2
+        store.take("a", 1, 1.0)
+        now[0] += 1
+        store.take("b", 1, 1.0)
+        assert len(store) == 1
+
+    def test_store_follows_setting(self, settings, tmp_path):
+        """Test that overriding `THROTTLE_STORE` replaces the cached store."""
+        assert isinstance(bucket_store(), MemoryBucketStore)
+        settings.THROTTLE_STORE = str(tmp_path / "throttle.sqlite3")
+        assert isinstance(bucket_store(), SQLiteBucketStore)
+
+    @pytest.mark.parametrize("url", ["/api/v1/orders/", "/api/v2/orders/"])
+    def test_endpoint_throttled(self, client, settings, url):
+        """Test that write endpoints answer 429 with `Retry-After` over the limit."""
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, "orders": "2/min"}
+        responses = [
+            client.post(url, {}, content_type="application/json") for _ in range(3)
+        ]
+        assert [response.status_code for response in responses] == [400, 400, 429]
+        assert responses[2]["Retry-After"] == "30"
+        metrics = client.get("/metrics/").content.decode()
+        assert 'throttled_requests_total{scope="orders"}' in metrics
+
+    def test_empty_rate_disables_limit(self, client, settings):
+        """Test that an empty rate turns the limit of a scope off."""
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, "orders": ""}
+        responses = [
+            client.post("/api/v1/orders/", {}, content_type="application/json")
+            for _ in range(3)
+        ]
+        assert {response.status_code for response in responses} == {400}
+
+
+@pytest.mark.django_db
+class TestTracing:
+    @pytest.fixture
+    def traces(self, settings, caplog):
+        """Traces every request and collects the logged traces."""
+        settings.TRACING_SAMPLE_RATE = 1.0
+        logger = logging.getLogger("tracing")
+        logger.addHandler(caplog.handler)
+        yield lambda: [record.trace for record in caplog.records if record.name == "tracing"]
+        logger.removeHandler(caplog.handler)
+
+    def test_spans_nested(self):
+        """Test that spans record their parent and errors."""
+        trace = Trace("test")
+        token = current_trace.set(trace)
+        try:
+            with span("outer"):
+                with pytest.raises(ValueError):
+                    with span("inner", key="value"):
+                        raise ValueError
+        finally:
+            current_trace.reset(token)
+        inner, outer = trace.spans
+        assert (outer["name"], outer["parent"]) == ("outer", None)
+        assert (inner["parent"], inner["key"], inner["error"]) == (outer["id"], "value", "ValueError")
+
+    def test_disabled_without_trace(self):
+        """Test that traced functions run untouched outside a traced request."""
+        calls = []
+        function = traced("test")(lambda value: calls.append(value) or value)
+        assert function(1) == 1
+        assert calls == [1]
+        with span("test"):
+            pass
+
+    def test_payment_traced(self, traces, client, load_fixture, monkeypatch):
+        """Test that a traced payment logs its phases under the request ID."""
+        for fixture in ("products", "orders", "orderitems"):
+            load_fixture(fixture)
+        monkeypatch.setattr("payments.models.time.sleep", lambda seconds: None)
+        response = client.post(
+            "/api/v1/pay/",
+            {"order": 1, "payment_type": "PayPal"},
+            content_type="application/json",
+            headers={"X-Request-ID": "abc-123"},
+        )
+        assert response.status_code == 201
+        assert response["X-Request-ID"] == "abc-123"
+        [trace] = traces()
+        assert (trace["request_id"], trace["status"]) == ("abc-123", 201)
+        names = {span["name"] for span in trace["spans"]}
+        assert {
+            "payment_serializer.validate",
+            "payment.save",
+            "payment.processing",
+            "order.update_payment_status",
+            "db.query",
+        } <= names
+        queries = [span["sql"] for span in trace["spans"] if span["name"] == "db.query"]
+        assert not [sql for sql in queries if "PayPal" in sql]
+
+    def test_request_id_generated(self, traces, client):
+        """Test that a traced request without an ID gets a new one."""
+        response = client.get("/api/v1/products/", headers={"X-Request-ID": "bad id"})
+        request_id = response["X-Request-ID"]
+        assert len(request_id) == 32
+        assert traces()[0]["request_id"] == request_id
+
+    def test_off_by_default(self, client, caplog):
+        """Test that requests are not traced unless enabled."""
+        response = client.get("/api/v1/products/")
+        assert "X-Request-ID" not in response
+        assert not [record for record in caplog.records if record.name == "tracing"]
+
+    def test_json_formatter(self):
+        """Test that log records are formatted as JSON with the trace fields."""
+        record = logging.LogRecord("tracing", logging.INFO, "", 0, "trace", None, None)
+        record.trace = {"request_id": "abc", "spans": []}
+        data = json.loads(JSONFormatter().format(record))
+        assert data.pop("time")
+        assert data == {
+            "level": "INFO",
+            "logger": "tracing",
+            "message": "trace",
+            "request_id": "abc",
+            "spans": [],
+        }
+
+
+class TestContentHashedStorage:
+    def test_named_by_content(self, tmp_path):
+        """Test that files are named after their content and deduplicated."""
+        storage = ContentHashedStorage(location=tmp_path)
+        first = storage.save("uploads/2024/10/14/photo.JPG", ContentFile(b"image"))
+        second = storage.save("uploads/other.jpg", ContentFile(b"image"))
+        third = storage.save("uploads/photo.jpg", ContentFile(b"another image"))
+        assert first == second != third
+        assert first.startswith("uploads/") and first.endswith(".jpg")
+        assert hashed_digest(first) is not None
+        assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 2
+        assert storage.open(first).read() == b"image"
+
+
+class TestServeMedia:
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        """Store media in a temporary directory."""
+        settings.MEDIA_ROOT = tmp_path
+        storage = ContentHashedStorage(location=tmp_path)
+        self.hashed = storage.save("uploads/photo.jpg", ContentFile(b"image"))
+        (tmp_path / "uploads" / "legacy.jpg").write_bytes(b"old image")
+
+    def test_hashed_file_immutable(self, client):
+        """Test that hashed files are cached forever and revalidated by ETag."""
+        response = client.get(f"/media/{self.hashed}")
+        assert b"".join(response.streaming_content) == b"image"
+        assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+        response = client.get(f"/media/{self.hashed}", headers={"If-None-Match": response["ETag"]})
+        assert response.status_code == 304
+
+    def test_legacy_file_revalidated(self, client):
+        """Test that files stored under their original name are not immutable."""
+        response = client.get("/media/uploads/legacy.jpg")
+        assert response["Cache-Control"] == "public, max-age=3600"
+        assert "ETag" not in response
+
+    @pytest.mark.parametrize(
+        "serving, header",
+        [("x-accel-redirect", "X-Accel-Redirect"), ("x-sendfile", "X-Sendfile")],
+    )
+    def test_handed_to_web_server(self, client, settings, tmp_path, serving, header):
+        """Test that the web server is told which file to send."""
+        settings.MEDIA_SERVING = serving
+        response = client.get(f"/media/{self.hashed}")
+        assert response.content == b""
+        assert response["Content-Type"] == "image/jpeg"
+        expected = {
+            "X-Accel-Redirect": f"/protected-media/{self.hashed}",
+            "X-Sendfile": str(tmp_path / self.hashed),
+        }
+        assert response[header] == expected[header]
+
+    def test_missing_file(self, client):
+        """Test that missing files and paths outside the media root are not served."""
+        assert client.get("/media/uploads/missing.jpg").status_code == 404
+        assert client.get("/media/../settings.py").status_code == 400
@@ -0,0 +1,287 @@
+"""
+Token bucket rate limiting of the write endpoints.
+
+Every client has a bucket per scope that holds up to N tokens and is
+refilled at the rate from `THROTTLE_RATES`: `"30/min"` gives a bucket of
+30 tokens refilled at half a token per second, so a client may send a
+burst of 30 requests and then one request every two seconds. A request
+takes a token or is refused with 429 and `Retry-After`.
+
+Buckets live in `THROTTLE_STORE`: "memory" keeps them in the process, a
+file path keeps them in a SQLite database that all workers of the host
+share, so they enforce one limit together.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import cache, wraps
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import ScopedRateThrottle
+
+from .async_api import json_response
+from .metrics import registry
+
+registry.describe("throttled_requests_total", "Requests refused by rate limiting by scope.")
+
+
+def take_token(
+    state: tuple[float, float] | None, now: float, capacity: int, rate: float
+) -> tuple[float, float]:
+    """
+    Refills a bucket for the time passed since it was last used and takes
+    a token from it.
+
+    :param state: The tokens left and the time of the last use, None for
+     a new bucket.
+    :param now: The current time in seconds.
+    :param capacity: The size of the bucket.
+    :param rate: The refill rate in tokens per second.
+    :return: The tokens left and the seconds until the next token, 0 if a
+     token was taken.
+    """
+    if state is None:
+        tokens = float(capacity)
+    else:
+        tokens = min(capacity, state[0] + max(now - state[1], 0.0) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class BucketStore(ABC):
+    """
+    Abstract base class of the bucket stores.
+
+    Buckets are dropped once they are full again, which makes them
+    indistinguishable from new ones. Stores look for them every
+    `sweep_every` takes.
+    """
+
+    sweep_every: int = 1000
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        """
+        Takes a token from a bucket.
+
+        :param key: The client and scope of the bucket.
+        :param capacity: The size of the bucket.
+        :param rate: The refill rate in tokens per second.
+        :return: 0 if the token was taken, otherwise the seconds until
+         the next token.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Drops all buckets.
+        """
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Keeps the buckets in a dict of this process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # key -> (tokens, last use, time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._takes = 0
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            state = self._buckets.get(key)
+            tokens, wait = take_token(state and state[:2], now, capacity, rate)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            self._takes += 1
+            if self._takes % self.sweep_every == 0:
+                self._buckets = {
+                    key: state for key, state in self._buckets.items() if state[2] > now
+                }
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Keeps the buckets in a SQLite database shared by the processes of one
+    host. Every take is a short write transaction; the database is not
+    synced to disk, losing the buckets on a crash only resets the limits.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated REAL NOT NULL, full_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+        return connection
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        # Wall clock time, as the monotonic clock is not shared by processes.
+        now = time.time()
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            state = connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, wait = take_token(state, now, capacity, rate)
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            self._takes += 1
+            if self._takes % self.sweep_every == 0:
+                connection.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return wait
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM buckets")
+
+
+@cache
+def bucket_store() -> BucketStore:
+    """
+    Returns the bucket store configured in `THROTTLE_STORE`.
+
+    :return: The store, created on the first call.
+    """
+    if settings.THROTTLE_STORE == "memory":
+        return MemoryBucketStore()
+    return SQLiteBucketStore(settings.THROTTLE_STORE)
+
+
+def reset_bucket_store(setting: str, **kwargs) -> None:
+    """
+    Drops the cached store when `THROTTLE_STORE` is overridden, e.g. in
+    tests, so the next request uses the new one.
+    """
+    if setting == "THROTTLE_STORE":
+        bucket_store.cache_clear()
+
+
+setting_changed.connect(reset_bucket_store, dispatch_uid="throttling_reset_bucket_store")
+
+
+def parse_rate(scope: str) -> tuple[int, float] | None:
+    """
+    Returns the bucket size and the refill rate of a scope.
+
+    :param scope: The scope of the endpoint.
+    :return: The capacity and tokens per second, None if the scope is not
+     limited.
+    :raises ImproperlyConfigured: If the scope has no rate.
+    """
+    try:
+        rate = settings.THROTTLE_RATES[scope]
+    except KeyError:
+        raise ImproperlyConfigured(f"No rate is set for the throttle scope {scope!r}.")
+    if not rate:
+        return None
+    capacity, duration = ScopedRateThrottle().parse_rate(rate)
+    return capacity, capacity / duration
+
+
+def check_rate(scope: str, ident: str) -> float:
+    """
+    Takes a token from the bucket of a client.
+
+    :param scope: The scope of the endpoint.
+    :param ident: The user ID or the address of the client.
+    :return: 0 if the request is allowed, otherwise the seconds to wait.
+    """
+    limit = parse_rate(scope)
+    if limit is None:
+        return 0.0
+    wait = bucket_store().take(f"{scope}:{ident}", *limit)
+    if wait:
+        registry.inc("throttled_requests_total", (("scope", scope),))
+    return wait
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    """
+    Limits the requests to views with a `throttle_scope`. Authenticated
+    users are limited per user, anonymous clients per address.
+    """
+
+    def allow_request(self, request, view) -> bool:
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.remaining_wait = check_rate(self.scope, self.client_ident(request))
+        return not self.remaining_wait
+
+    def client_ident(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return self.get_ident(request)
+
+    def wait(self) -> float:
+        return self.remaining_wait
+
+
+def throttle(scope: str):
+    """
+    Applies `TokenBucketThrottle` to an async view.
+
+    :param scope: The scope of the endpoint in `THROTTLE_RATES`.
+    :return: The view decorator.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if user.is_authenticated:
+                ident = f"user:{user.pk}"
+            else:
+                ident = TokenBucketThrottle().get_ident(request)
+            # The SQLite store may wait for a lock, off the event loop.
+            wait = await sync_to_async(check_rate, thread_sensitive=False)(scope, ident)
+            if wait:
+                return json_response(
+                    {"detail": str(Throttled(wait).detail)},
+                    status=429,
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator